@@ -10,6 +10,9 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QFont, QPixmap, QIcon
 
+from command_registry import MODES, merge_command_profiles, validate_profile
+from engine_ipc import ENGINE_AUTHKEY_ENV, EngineClient, new_authkey
+
 class DropZone(QFrame):
     def __init__(self, command: str, parent=None):
         super().__init__(parent)
@@ -31,7 +34,7 @@ class DropZone(QFrame):
             self.box.setToolTip("🔒 ZONA PROTEGIDA: Este comando no se puede cambiar")
         else:
             self.box.setCursor(Qt.CursorShape.PointingHandCursor)
-            self.box.setToolTip("Haz clic para limpiar la letra")
+            self.box.setToolTip("Haz clic para limpiar la letra\nClic derecho: perfil de disparo")
         
         # Estilo inicial
         base_style = """
@@ -207,6 +210,12 @@ class DropZone(QFrame):
             
             event.acceptProposedAction()
     
+    def contextMenuEvent(self, event):
+        # Clic derecho: editar el perfil de disparo del comando (también en la zona protegida)
+        main_window = self.get_main_window()
+        if main_window:
+            main_window.edit_command_profile(self.command)
+
     def get_main_window(self):
         # Buscar la ventana principal navegando por los padres
         widget = self
@@ -287,6 +296,7 @@ class MainWindow(QMainWindow):
         info = QLabel(
             "• Arrastra las letras (A-Z) de la izquierda a las zonas de comando de la derecha\n"
             "• Cada letra puede asignarse a un comando específico\n"
+            "• Clic derecho en un comando para ajustar su cooldown y repetición\n"
             "• Personaliza el control gestual usando el lenguaje de señas ASL"
         )
         info.setWordWrap(True)
@@ -514,6 +524,14 @@ class MainWindow(QMainWindow):
         """)
 
         self.setMinimumSize(1200, 800)  # Aumentamos el tamaño de la ventana para el nuevo layout
+
+        # Motor gestual residente (program.py --daemon): se lanza una vez y se controla por socket
+        self.gesture_process = None
+        self.engine_authkey = new_authkey()  # Solo la conocen esta ventana y el motor que lance
+        self.engine = EngineClient(self.engine_authkey)
+
+        # Perfiles de disparo por comando (sección 'perfiles'); se guardan con la configuración
+        self.command_profiles = merge_command_profiles()
         
         # Cargar configuración existente si existe
         self.load_existing_configuration()
@@ -627,6 +645,10 @@ class MainWindow(QMainWindow):
             # Determinar si es formato nuevo o antiguo
             if isinstance(data, dict) and 'comandos' in data:
                 config = data['comandos']  # Formato nuevo
+                try:
+                    self.command_profiles = merge_command_profiles(data.get('perfiles'))
+                except ValueError as e:
+                    print(f"⚠️ Perfiles de comandos ignorados: {e}")
             else:
                 config = data  # Formato antiguo
             
@@ -801,6 +823,7 @@ class MainWindow(QMainWindow):
         full_config = {
             "comandos": config,
             "detalles": config_details,
+            "perfiles": self.command_profiles,
             "info": {
                 "total_configurados": len(config),
                 "formato": "letra A=0, B=1, C=2, ..., Z=25",
@@ -821,8 +844,25 @@ class MainWindow(QMainWindow):
         if file_path:
             try:
                 import json
-                with open(file_path, 'w', encoding='utf-8') as f:
+                # Conservar la sección 'motor' (backend de inferencia, etc.) si ya existía
+                if os.path.exists(file_path):
+                    try:
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            previous = json.load(f)
+                        if isinstance(previous, dict) and 'motor' in previous:
+                            full_config['motor'] = previous['motor']
+                    except json.JSONDecodeError:
+                        pass
+                # Escritura atómica: el motor vigila el archivo y nunca debe leerlo a medias
+                tmp_path = file_path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
                     json.dump(full_config, f, ensure_ascii=False, indent=4)
+                os.replace(tmp_path, file_path)
+
+                # Si el motor está corriendo y este es su archivo, que recargue los mappings
+                engine_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "configuracion_gestos.json")
+                if os.path.abspath(file_path) == engine_config_path and self.engine.connected:
+                    self.engine.send("reload-config")
                 
                 QtWidgets.QMessageBox.information(
                     self,
@@ -842,6 +882,59 @@ class MainWindow(QMainWindow):
                     QtWidgets.QMessageBox.StandardButton.Ok
                 )
 
+    def edit_command_profile(self, command):
+        """Diálogo para el perfil de disparo de un comando; se aplica al guardar la configuración"""
+        profile = dict(self.command_profiles.get(command, merge_command_profiles().get(command, {})))
+
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle(f"Perfil de '{command}'")
+        form = QtWidgets.QFormLayout(dialog)
+
+        mode = QtWidgets.QComboBox()
+        mode.addItems(MODES)
+        mode.setCurrentText(profile.get("modo", MODES[0]))
+        form.addRow("Modo", mode)
+
+        cooldown = QtWidgets.QDoubleSpinBox()
+        cooldown.setRange(0.0, 60.0)
+        cooldown.setSingleStep(0.1)
+        cooldown.setSuffix(" s")
+        cooldown.setValue(profile.get("cooldown_s", 1.0))
+        form.addRow("Cooldown", cooldown)
+
+        repeat = QtWidgets.QDoubleSpinBox()
+        repeat.setRange(0.0, 10.0)
+        repeat.setSingleStep(0.05)
+        repeat.setSuffix(" s")
+        repeat.setValue(profile.get("repeticion_s", 0.0))
+        repeat.setToolTip("Solo en modo continuo: intervalo de repetición mientras se sostiene la seña")
+        form.addRow("Repetición", repeat)
+
+        idempotent = QtWidgets.QCheckBox("Repetirlo no cambia nada")
+        idempotent.setChecked(profile.get("idempotente", False))
+        form.addRow("Idempotente", idempotent)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+
+        if dialog.exec() != QtWidgets.QDialog.DialogCode.Accepted:
+            return
+        new_profile = {
+            "modo": mode.currentText(),
+            "cooldown_s": round(cooldown.value(), 2),
+            "repeticion_s": round(repeat.value(), 2),
+            "idempotente": idempotent.isChecked(),
+        }
+        errors = validate_profile(new_profile)
+        if errors:
+            QtWidgets.QMessageBox.warning(self, "Perfil no válido", "\n".join(errors))
+            return
+        self.command_profiles[command] = new_profile
+        self.statusBar().showMessage(f"⚙️ Perfil de '{command}' actualizado (se aplica al guardar)")
+
     def start_gesture_control(self):
         """Iniciar el programa de control gestual"""
         try:
@@ -851,15 +944,37 @@ class MainWindow(QMainWindow):
             self.save_btn.setEnabled(False)
             self.stop_btn.setEnabled(True)
             
+            # Si el motor ya está residente, reanudarlo es instantáneo (modelo ya cargado)
+            if self.engine_running():
+                if self.engine.send("start") is not None:
+                    self.statusBar().showMessage("▶️ Control gestual reanudado")
+                    return
+                if self.gesture_process is None:
+                    # Escucha un motor que no lanzó esta ventana y no responde: no se puede reiniciar
+                    raise RuntimeError("Hay otro motor gestual abierto que no responde. Ciérralo antes de iniciar.")
+                # Nuestro motor sigue vivo pero no responde: terminarlo antes de lanzar otro,
+                # o el nuevo no podría abrir el socket de control ni la cámara
+                self.gesture_process.terminate()
+                try:
+                    self.gesture_process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.gesture_process.kill()
+                    self.gesture_process.wait()
+                self.gesture_process = None
+                self.engine.close()
+
             # Obtener la ruta del directorio actual
             current_dir = os.path.dirname(os.path.abspath(__file__))
             program_path = os.path.join(current_dir, "program.py")
             venv_path = os.path.join(current_dir, "venv_ml2", "Scripts", "python.exe")
+            # Modo residente: arranca capturando y después se pausa/reanuda por socket
+            engine_args = [program_path, "--daemon", "--iniciar"]
+            engine_env = dict(os.environ, **{ENGINE_AUTHKEY_ENV: self.engine_authkey})
             
             # Verificar si existe el entorno virtual
             if os.path.exists(venv_path):
                 # Ejecutar con el entorno virtual
-                self.gesture_process = subprocess.Popen([venv_path, program_path], cwd=current_dir)
+                self.gesture_process = subprocess.Popen([venv_path] + engine_args, cwd=current_dir, env=engine_env)
                 
                 # Mostrar mensaje de confirmación
                 QtWidgets.QMessageBox.information(
@@ -871,14 +986,15 @@ class MainWindow(QMainWindow):
                     "• Usa tu mano derecha para control del cursor\n"
                     "• Mueve la mano derecha en el rectángulo azul\n"
                     "• Baja el dedo índice derecho para hacer clic\n"
-                    "• Presiona ESC en la ventana del programa para salir\n\n"
+                    "• Presiona ESC en la ventana del programa para pausar\n\n"
                     "⚠️ Si no ves la ventana, revisa tu barra de tareas.\n"
                     "💡 Usa el botón 'Parar Control' para terminar desde aquí.",
                     QtWidgets.QMessageBox.StandardButton.Ok
                 )
             else:
                 # Ejecutar con Python del sistema
-                self.gesture_process = subprocess.Popen([sys.executable, program_path], cwd=current_dir)
+                self.gesture_process = subprocess.Popen([sys.executable] + engine_args, cwd=current_dir,
+                                                        env=engine_env)
                 
                 QtWidgets.QMessageBox.information(
                     self,
@@ -889,7 +1005,7 @@ class MainWindow(QMainWindow):
                     "• Usa tu mano derecha para control del cursor\n"
                     "• Mueve la mano derecha en el rectángulo azul\n"
                     "• Baja el dedo índice derecho para hacer clic\n"
-                    "• Presiona ESC en la ventana del programa para salir\n\n"
+                    "• Presiona ESC en la ventana del programa para pausar\n\n"
                     "⚠️ Si hay errores, usa el entorno virtual (venv_ml2).\n"
                     "💡 Usa el botón 'Parar Control' para terminar desde aquí.",
                     QtWidgets.QMessageBox.StandardButton.Ok
@@ -913,10 +1029,18 @@ class MainWindow(QMainWindow):
                 QtWidgets.QMessageBox.StandardButton.Ok
             )
 
+    def engine_running(self):
+        """True si hay un motor residente vivo (lanzado por esta ventana o ya escuchando)."""
+        if self.gesture_process is not None and self.gesture_process.poll() is not None:
+            self.gesture_process = None
+            self.engine.close()
+        return self.gesture_process is not None or self.engine.connect()
+
     def stop_gesture_control(self):
-        """Parar el programa de control gestual"""
+        """Pausar el control gestual (el motor sigue residente con el modelo cargado)"""
         try:
-            if hasattr(self, 'gesture_process') and self.gesture_process:
+            if self.engine.send("pause") is None and self.gesture_process:
+                # El motor aún está cargando o no responde: terminarlo como antes
                 self.gesture_process.terminate()
                 self.gesture_process = None
             
@@ -926,12 +1050,7 @@ class MainWindow(QMainWindow):
             self.save_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
             
-            QtWidgets.QMessageBox.information(
-                self,
-                "Control Detenido",
-                "⏹️ El control gestual ha sido detenido correctamente.",
-                QtWidgets.QMessageBox.StandardButton.Ok
-            )
+            self.statusBar().showMessage("⏸️ Control gestual en pausa (modelo residente)")
             
         except Exception as e:
             QtWidgets.QMessageBox.warning(
@@ -942,6 +1061,18 @@ class MainWindow(QMainWindow):
                 QtWidgets.QMessageBox.StandardButton.Ok
             )
 
+    def closeEvent(self, event):
+        """Apagar el motor residente al cerrar la ventana"""
+        if self.engine.send("shutdown") is None and self.gesture_process:
+            self.gesture_process.terminate()
+        elif self.gesture_process:
+            try:
+                self.gesture_process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.gesture_process.terminate()
+        self.engine.close()
+        super().closeEvent(event)
+
 def main():
     app = QApplication(sys.argv)
     w = MainWindow()
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from inference import BACKENDS
+
+# ==========================
+# Benchmark de extremo a extremo del bucle de reconocimiento
+# ==========================
+# Reproduce cada clip grabado con el pipeline completo de program.py
+# (MediaPipe, recorte, clasificación, decisión temporal y despacho de comandos
+# con las acciones registradas en lugar de ejecutadas), sin ventanas, a máxima
+# velocidad y sin descartar frames. Por clip mide FPS sostenidos, percentiles e
+# histograma de latencia por etapa y de extremo a extremo, CPU% y RSS, y lo
+# escribe todo en un JSON. Con --comparar se contrasta con un JSON anterior y
+# el proceso termina con código 1 si algo empeora más que la tolerancia.
+
+DEFAULT_CLIPS_DIR = "benchmarks/clips"
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+MIN_COMPARABLE_MS = 0.5  # Por debajo, las diferencias de latencia son ruido
+MODEL_KEYS = {"landmarks": "modelo_landmarks", "tflite": "modelo_tflite"}  # El resto usa "modelo"
+
+
+def is_image_dir(path):
+    return os.path.isdir(path) and any(name.lower().endswith(IMAGE_EXTENSIONS) for name in os.listdir(path))
+
+
+def find_clips(paths):
+    """Clips a reproducir: videos, directorios de imágenes y .jsonl de landmarks, en orden."""
+    clips = []
+    for path in paths:
+        if os.path.isfile(path) or is_image_dir(path):
+            clips.append(path)
+        elif os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                child = os.path.join(path, name)
+                if name.lower().endswith(VIDEO_EXTENSIONS + (".jsonl",)) or is_image_dir(child):
+                    clips.append(child)
+        else:
+            print(f"⚠️  No existe {path}")
+    return clips
+
+
+def run_clip(program, path, hands, timeline, fps):
+    """Reproduce un clip en modo headless y devuelve su fila de resultados."""
+    from metrics import ProcessSampler
+    from replay import HeadlessSink, RecordedHands, open_source
+
+    recorder = program.action_recorder
+    commands_before = sum(n for name, n in recorder.counts.items() if name != "Mover cursor")
+    cap = open_source(path, fps)
+    clip_hands = RecordedHands() if path.lower().endswith(".jsonl") else hands
+    report = {}
+    sampler = ProcessSampler()
+    sampler.start()
+    try:
+        program.run_session(cap, clip_hands, timeline, sink=HeadlessSink(), report=report)
+        program.command_dispatcher.drain()
+    finally:
+        sampler.stop()
+        cap.release()
+    commands = sum(n for name, n in recorder.counts.items() if name != "Mover cursor") - commands_before
+    return dict({"clip": os.path.basename(os.path.normpath(path)), "ruta": path, "comandos": commands},
+                **report, **sampler.summary())
+
+
+def relative_change(new, old):
+    return (new - old) / old if old else 0.0
+
+
+def compare(results, baseline, tolerance):
+    """Devuelve (regresiones, avisos) de `results` frente a `baseline` (mismo formato)."""
+    previous = {(row["clip"], row.get("repeticion", 1)): row for row in baseline.get("clips", [])}
+    regressions, warnings = [], []
+    for row in results:
+        old = previous.get((row["clip"], row["repeticion"]))
+        if old is None:
+            warnings.append(f"{row['clip']}: sin referencia")
+            continue
+        if old.get("fps") and relative_change(row["fps"], old["fps"]) < -tolerance:
+            regressions.append(f"{row['clip']}: FPS {old['fps']:.1f} → {row['fps']:.1f}")
+        latencies = [("extremo a extremo", row["extremo_a_extremo"], old.get("extremo_a_extremo", {}))]
+        latencies += [(f"etapa {name}", stats, old.get("etapas", {}).get(name, {}))
+                      for name, stats in row["etapas"].items()]
+        for label, new_stats, old_stats in latencies:
+            for key in ("p50_ms", "p99_ms"):
+                new_ms, old_ms = new_stats.get(key), old_stats.get(key)
+                if new_ms is None or old_ms is None or max(new_ms, old_ms) < MIN_COMPARABLE_MS:
+                    continue
+                if relative_change(new_ms, old_ms) > tolerance:
+                    regressions.append(f"{row['clip']}: {label} {key} {old_ms:.2f} → {new_ms:.2f} ms")
+        if row["comandos"] != old.get("comandos"):
+            warnings.append(f"{row['clip']}: comandos {old.get('comandos')} → {row['comandos']}")
+    return regressions, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo del pipeline de program.py")
+    parser.add_argument("clips", nargs="*", default=[DEFAULT_CLIPS_DIR],
+                        help="Videos, directorios de imágenes, .jsonl de landmarks o directorios que los contengan")
+    parser.add_argument("--backend", default=None, choices=BACKENDS,
+                        help="Backend de inferencia (por defecto el de la sección 'motor')")
+    parser.add_argument("--modelo", default=None, help="Modelo a usar con ese backend")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS del stream para directorios de imágenes")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Veces que se reproduce cada clip")
+    parser.add_argument("--sin-calentamiento", action="store_true",
+                        help="No reproducir el primer clip una vez sin medir antes de empezar")
+    parser.add_argument("--salida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Empeoramiento relativo permitido antes de marcar regresión (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    clips = find_clips(args.clips)
+    if not clips:
+        parser.error("no hay clips que reproducir")
+
+    import program
+    from dispatcher import CommandDispatcher
+    from metrics import StartupTimeline
+
+    if args.backend or args.modelo:
+        overrides = {}
+        if args.backend:
+            overrides["backend"] = args.backend
+        if args.modelo:
+            backend = args.backend or program.engine_config["backend"]
+            overrides[MODEL_KEYS.get(backend, "modelo")] = args.modelo
+        program.engine_config = dict(program.engine_config, **overrides)
+
+    # Mismo arranque que program.py --headless, pero sin fuente: cada clip abre la suya
+    program.enable_action_recording()
+    program.command_dispatcher = CommandDispatcher(program.COMMAND_WORKERS, program.COMMAND_QUEUE_SIZE,
+                                                   program.COMMAND_TIMEOUT).start()
+    timeline = StartupTimeline()
+    only_landmarks = all(clip.lower().endswith(".jsonl") for clip in clips)
+    _, hands = program.startup(timeline, open_cap=None, recorded_hands=only_landmarks)
+
+    results = []
+    with hands:
+        if not args.sin_calentamiento:
+            print(f"🔥 Calentamiento con {clips[0]}")
+            run_clip(program, clips[0], hands, timeline, args.fps)
+        for clip in clips:
+            for repetition in range(args.repeticiones):
+                print(f"▶️  {clip} ({repetition + 1}/{args.repeticiones})")
+                row = run_clip(program, clip, hands, timeline, args.fps)
+                row["repeticion"] = repetition + 1
+                results.append(row)
+    program.command_dispatcher.stop()
+
+    backend = program.engine_config["backend"]
+    total_frames = sum(row["frames"] for row in results)
+    total_seconds = sum(row["segundos"] for row in results)
+    output = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "backend": backend,
+        "modelo": program.engine_config[MODEL_KEYS.get(backend, "modelo")],
+        "plataforma": {
+            "sistema": platform.platform(),
+            "procesador": platform.processor(),
+            "nucleos": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "clips": results,
+        "total": {"frames": total_frames, "segundos": round(total_seconds, 3),
+                  "fps": round(total_frames / total_seconds, 2) if total_seconds else None},
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=4)
+
+    print(f"\n{'Clip':<28}{'frames':>8}{'FPS':>8}{'e2e p50':>10}{'e2e p99':>10}{'CPU %':>8}{'RSS MB':>9}")
+    for row in results:
+        e2e = row["extremo_a_extremo"]
+        cpu, rss = row["cpu_pct"]["media"], row["rss_mb"]["max"]
+        print(f"{row['clip'][:27]:<28}{row['frames']:>8}{row['fps']:>8.1f}"
+              f"{e2e['p50_ms'] or 0:>10.1f}{e2e['p99_ms'] or 0:>10.1f}"
+              f"{cpu if cpu is not None else 0:>8.0f}{rss if rss is not None else 0:>9.0f}")
+    print(f"\n📄 Resultados escritos en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions, warnings = compare(results, baseline, args.tolerancia)
+        for warning in warnings:
+            print(f"⚠️  {warning}")
+        if regressions:
+            print(f"❌ {len(regressions)} regresiones frente a {args.comparar} (tolerancia {args.tolerancia:.0%}):")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"✅ Sin regresiones frente a {args.comparar} (tolerancia {args.tolerancia:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import copy
+
+# --- Registro de comandos: perfil de disparo por acción ---
+# Cada acción tiene un perfil con:
+#   modo          "unico": se dispara una vez por gesto; "continuo": se repite mientras se sostiene
+#   cooldown_s    segundos mínimos entre dos disparos de la misma acción
+#   repeticion_s  con modo continuo, intervalo de auto-repetición (0.1 = 10 Hz)
+#   idempotente   repetirla no cambia nada: si ya hay una igual en cola, no se encola otra
+# Los valores por defecto se pueden sobrescribir en la sección 'perfiles' de
+# configuracion_gestos.json (app.py la edita). Sin dependencias pesadas: app.py lo importa tal cual.
+
+MODES = ("unico", "continuo")
+EPSILON_S = 1e-6  # Margen para restas de tiempos en coma flotante (16/30 - 15/30 < 1/30)
+DEFAULT_PROFILE = {"modo": "unico", "cooldown_s": 1.0, "repeticion_s": 0.0, "idempotente": False}
+
+
+def _one_shot(cooldown, idempotent=False):
+    return {"modo": "unico", "cooldown_s": cooldown, "repeticion_s": 0.0, "idempotente": idempotent}
+
+
+def _continuous(interval):
+    return {"modo": "continuo", "cooldown_s": 0.0, "repeticion_s": interval, "idempotente": False}
+
+
+COMMAND_PROFILES = {
+    "Copiar": _one_shot(0.5, idempotent=True),
+    "Pegar": _one_shot(1.0),
+    "Desahacer": _one_shot(0.75),
+    "Rehacer": _one_shot(0.75),
+    "Screenshot": _one_shot(2.0),
+    "Screenshot Portapeles": _one_shot(1.0, idempotent=True),
+    "Cambiar Ventana": _one_shot(1.0),
+    "Buscar": _one_shot(1.0, idempotent=True),
+    "Nueva Pestaña": _one_shot(1.5),
+    "Cerrar Pestaña": _one_shot(2.0),
+    "Subir Volumen": _continuous(0.1),
+    "Bajar Volumen": _continuous(0.1),
+    "Silenciar": _one_shot(1.5),
+    "Abrir Bloc": _one_shot(3.0),
+    "Abrir Calculadora": _one_shot(3.0),
+    "Abrir Explorador": _one_shot(3.0),
+    "Escribir Texto": _one_shot(2.0),
+    "Refrescar": _one_shot(1.5, idempotent=True),
+    "Borrar": _one_shot(1.0),
+    "Scroll Arriba": _continuous(0.1),
+    "Scroll Abajo": _continuous(0.1),
+    "Abrir Chrome": _one_shot(3.0),
+    "Abrir Excel": _one_shot(3.0),
+    "Presionar ESC": _one_shot(0.5, idempotent=True),
+    "Abrir Word": _one_shot(3.0),
+}
+
+
+def validate_profile(profile):
+    """Devuelve la lista de problemas de un perfil (vacía si es válido)."""
+    errors = []
+    if profile.get("modo") not in MODES:
+        errors.append(f"modo '{profile.get('modo')}' no es {' ni '.join(MODES)}")
+    for key in ("cooldown_s", "repeticion_s"):
+        value = profile.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            errors.append(f"{key} debe ser un número >= 0")
+    if profile.get("modo") == "continuo" and not profile.get("repeticion_s"):
+        errors.append("un comando continuo necesita repeticion_s > 0")
+    if not isinstance(profile.get("idempotente"), bool):
+        errors.append("idempotente debe ser true o false")
+    return errors
+
+
+def merge_command_profiles(overrides=None, known_actions=None):
+    """Perfiles por defecto con los de `overrides` encima. Lanza ValueError si alguno no es válido."""
+    profiles = copy.deepcopy(COMMAND_PROFILES)
+    if not overrides:
+        return profiles
+    if not isinstance(overrides, dict):
+        raise ValueError("la sección 'perfiles' no es un objeto")
+    errors = []
+    for action, override in overrides.items():
+        if known_actions is not None and action not in known_actions:
+            errors.append(f"acción desconocida '{action}'")
+            continue
+        if not isinstance(override, dict):
+            errors.append(f"el perfil de '{action}' no es un objeto")
+            continue
+        profile = dict(profiles.get(action, DEFAULT_PROFILE))
+        profile.update(override)
+        errors.extend(f"{action}: {e}" for e in validate_profile(profile))
+        profiles[action] = profile
+    if errors:
+        raise ValueError("; ".join(errors))
+    return profiles
+
+
+class CommandGate:
+    """Decide si un comando se dispara según su perfil (cooldown y auto-repetición)."""
+
+    def __init__(self):
+        self.blocked = 0        # Disparos evitados por cooldown
+        self._last = {}         # acción → instante del último disparo
+
+    def press(self, action, profile, timestamp):
+        """Gesto recién estabilizado: se dispara salvo que la acción esté en cooldown."""
+        last = self._last.get(action)
+        if last is not None and timestamp - last < profile["cooldown_s"] - EPSILON_S:
+            self.blocked += 1
+            return False
+        self._last[action] = timestamp
+        return True
+
+    def hold(self, action, profile, timestamp):
+        """Gesto aún sostenido: solo los comandos continuos se repiten, a su intervalo."""
+        if profile["modo"] != "continuo":
+            return False
+        last = self._last.get(action)
+        interval = max(profile["repeticion_s"], profile["cooldown_s"])
+        if last is None or timestamp - last < interval - EPSILON_S:
+            return False
+        # Se avanza un intervalo exacto para que el jitter de los frames no retrase las
+        # repeticiones siguientes; solo si se ha perdido más de uno se reancla al instante actual
+        if timestamp - last > 2 * interval:
+            self._last[action] = timestamp
+        else:
+            self._last[action] = last + interval
+        return True
@@ -0,0 +1,51 @@
+import os
+import threading
+
+# --- Vigilancia de configuracion_gestos.json ---
+# Un hilo propio consulta el mtime del archivo cada `interval` segundos, fuera
+# del bucle de frames, y llama a `on_change(path)` cuando cambia. La lectura,
+# validación e intercambio de la configuración son cosa del callback.
+
+
+class ConfigWatcher(threading.Thread):
+    """Llama a `on_change(path)` cuando cambia el mtime del archivo o se pide con `trigger()`."""
+
+    def __init__(self, path, on_change, interval=1.0):
+        super().__init__(name="config-watcher", daemon=True)
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.reloads = 0
+        self._mtime = self._read_mtime()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def _read_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def trigger(self):
+        """Fuerza una recarga en el hilo del watcher aunque el archivo no haya cambiado."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            forced = self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            mtime = self._read_mtime()
+            if not forced and (mtime is None or mtime == self._mtime):
+                continue  # sin cambios (o el archivo está siendo reemplazado)
+            self._mtime = mtime
+            try:
+                self.on_change(self.path)
+                self.reloads += 1
+            except Exception as e:
+                print(f"⚠️  Recarga de {self.path} descartada: {e}")
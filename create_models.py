@@ -1,63 +1,264 @@
+import argparse
+import gc
+import os
+import time
+
 import tensorflow as tf
 from tensorflow.keras.utils import image_dataset_from_directory
 from tensorflow.keras.applications import EfficientNetB5, ResNet50, InceptionV3
-from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D, Rescaling
+from tensorflow.keras.layers import (
+    Dense, Dropout, GlobalAveragePooling2D, Rescaling, RandomContrast, RandomRotation, RandomZoom
+)
 from tensorflow.keras.models import Sequential
-from sklearn.metrics import classification_report
+from sklearn.metrics import classification_report, confusion_matrix
 import numpy as np
 
+from metrics import ProcessSampler
+
 # ==========================
 # 1. Cargar dataset
 # ==========================
 path = '/kaggle/input/asl-data/asl_alphabet_structured'
 
-train_val_ds = image_dataset_from_directory(
-    path,
-    validation_split=0.2,  
-    subset="training",
-    seed=123,
-    image_size=(128, 128),
-    batch_size=64
-)
 
-test_ds = image_dataset_from_directory(
-    path,
-    validation_split=0.2,  
-    subset="validation",
-    seed=123,
-    image_size=(128, 128),
-    batch_size=64,
-)
+def load_datasets(dataset_path: str = path, cache_dir: str | None = None):
+    """
+    Carga los splits train/valid/test.
+
+    Args:
+        dataset_path (str): Carpeta del dataset con una subcarpeta por clase.
+        cache_dir (str | None): Caché creada con dataset_cache.py. Si se indica,
+            las imágenes se leen ya decodificadas y redimensionadas desde los
+            shards .npy en vez de volver a decodificar los JPEG.
+
+    Returns:
+        tuple: (train_ds, val_ds, test_ds, class_names)
+    """
+    if cache_dir:
+        from dataset_cache import RESIZE_METHOD, SPLIT_SCHEME, load_cached_split, load_index
+        print(f"Leyendo dataset desde la caché: {cache_dir}")
+        index = load_index(cache_dir)
+        if index.get("reparto") != SPLIT_SCHEME or index.get("seed") != 123:
+            print("⚠️  La caché no usa el reparto de image_dataset_from_directory (seed=123): sus "
+                  "resultados no son comparables con los de sin caché. Recréala con dataset_cache.py")
+        if index.get("redimensionado") != RESIZE_METHOD:
+            print("⚠️  La caché no redimensiona como image_dataset_from_directory (bilineal): el modelo "
+                  "verá píxeles distintos de los de sin caché y de program.py. Recréala con dataset_cache.py")
+        train_ds = load_cached_split(cache_dir, "train", batch_size=64, shuffle=True)
+        val_ds = load_cached_split(cache_dir, "val", batch_size=64)
+        test_ds = load_cached_split(cache_dir, "test", batch_size=64)
+        return train_ds, val_ds, test_ds, index["class_names"]
+
+    train_val_ds = image_dataset_from_directory(
+        dataset_path,
+        validation_split=0.2,  
+        subset="training",
+        seed=123,
+        image_size=(128, 128),
+        batch_size=64
+    )
+
+    test_ds = image_dataset_from_directory(
+        dataset_path,
+        validation_split=0.2,  
+        subset="validation",
+        seed=123,
+        image_size=(128, 128),
+        batch_size=64,
+    )
 
-# Dividir train en train (70%) y valid (10%)
-val_size = int(0.125 * tf.data.experimental.cardinality(train_val_ds).numpy())
-val_ds = train_val_ds.take(val_size)
-train_ds = train_val_ds.skip(val_size)
+    # Dividir train en train (70%) y valid (10%)
+    val_size = int(0.125 * tf.data.experimental.cardinality(train_val_ds).numpy())
+    val_ds = train_val_ds.take(val_size)
+    train_ds = train_val_ds.skip(val_size)
 
-class_names = train_val_ds.class_names
-num_classes = len(class_names)
+    return train_ds, val_ds, test_ds, train_val_ds.class_names
+
+
+# ==========================
+# 1.1 Pipeline de entrada (tf.data)
+# ==========================
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def build_input_pipeline(
+    ds: tf.data.Dataset,
+    split: str,
+    training: bool = False,
+    cache: str | None = None,
+    augment: bool = False,
+    deterministic: bool = True
+) -> tf.data.Dataset:
+    """
+    Envuelve un dataset (ya en batches) con cache, augmentación paralela y prefetch.
+
+    Args:
+        ds (tf.data.Dataset): Dataset de (imágenes, etiquetas) en batches.
+        split (str): Nombre del split, usado para el archivo de caché en disco.
+        training (bool): Si es el split de entrenamiento (solo ahí se augmenta y baraja).
+        cache (str | None): None (sin caché), "memoria" (RAM) o un directorio
+            donde tf.data guarda la caché en disco entre ejecuciones.
+        augment (bool): Aplica rotación/zoom/contraste aleatorios con map paralelo.
+        deterministic (bool): Si es False, el orden de salida de los map paralelos
+            puede variar a cambio de no esperar al elemento más lento.
+
+    Returns:
+        tf.data.Dataset: Dataset listo para model.fit / model.evaluate.
+    """
+    if cache == "memoria":
+        ds = ds.cache()
+    elif cache:
+        os.makedirs(cache, exist_ok=True)
+        ds = ds.cache(os.path.join(cache, split))
+
+    if training and cache:
+        # La caché congela el orden de la primera época; barajar a nivel de batch
+        ds = ds.shuffle(32, reshuffle_each_iteration=True)
+
+    if training and augment:
+        augmentation = Sequential([
+            RandomRotation(0.05),
+            RandomZoom(0.1),
+            RandomContrast(0.1)
+        ])
+        ds = ds.map(lambda x, y: (augmentation(x, training=True), y), num_parallel_calls=AUTOTUNE)
+
+    options = tf.data.Options()
+    options.deterministic = deterministic
+    return ds.with_options(options).prefetch(AUTOTUNE)
+
+
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    """Mide pasos/seg e imágenes/seg durante el entrenamiento (ignora los primeros pasos)."""
+
+    def __init__(self, batch_size: int, warmup_steps: int = 5):
+        super().__init__()
+        self.batch_size = batch_size
+        self.warmup_steps = warmup_steps
+        self.steps = 0
+        self.elapsed = 0.0
+        self._start = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        if batch >= self.warmup_steps and self._start is not None:
+            self.steps += 1
+            self.elapsed += time.perf_counter() - self._start
+
+    @property
+    def steps_per_sec(self) -> float:
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def images_per_sec(self) -> float:
+        return self.steps_per_sec * self.batch_size
+
+
+def measure_input_throughput(ds: tf.data.Dataset, steps: int = 50) -> float:
+    """Pasos/seg que el pipeline de entrada puede producir por sí solo (sin modelo)."""
+    iterator = iter(ds)
+    next(iterator)  # Descontar el arranque del pipeline
+    start = time.perf_counter()
+    produced = 0
+    for _ in range(steps):
+        try:
+            next(iterator)
+        except StopIteration:
+            break
+        produced += 1
+    elapsed = time.perf_counter() - start
+    return produced / elapsed if elapsed > 0 else 0.0
+
+
+def print_input_diagnostics(name: str, input_steps_per_sec: float, train_steps_per_sec: float) -> None:
+    """Compara la capacidad del pipeline de entrada con la velocidad real de entrenamiento."""
+    print(f"\n📊 Diagnóstico de entrada para {name}:")
+    print(f"   Entrada sola: {input_steps_per_sec:.1f} pasos/s | Entrenamiento: {train_steps_per_sec:.1f} pasos/s")
+    if train_steps_per_sec <= 0:
+        return
+    ratio = input_steps_per_sec / train_steps_per_sec
+    if ratio < 1.2:
+        print(f"   ⚠️  Limitado por la ENTRADA (margen x{ratio:.2f}): usar --cache-tfdata, --no-determinista "
+              "o la caché de dataset_cache.py")
+    else:
+        print(f"   ✅ Limitado por el CÓMPUTO (la entrada produce x{ratio:.2f} más rápido de lo que se consume)")
 
 
 # ==========================
 # 2. Función para construir modelos 
 # ==========================
-def build_model(base_model, num_classes):
+def build_model(base_model, num_classes, jit_compile="auto", dropout=0.5, dense_units=128, learning_rate=0.0001):
     model = Sequential([
         Rescaling(1./255),
         base_model,
         GlobalAveragePooling2D(),
-        Dropout(0.5),
-        Dense(128, activation="relu"),
+        Dropout(dropout),
+        Dense(dense_units, activation="relu"),
         Dropout(0.3),
-        Dense(num_classes, activation="softmax")
+        # Softmax siempre en float32 para que sea estable con mixed precision
+        Dense(num_classes, activation="softmax", dtype="float32")
     ])
     model.compile(
-        optimizer=tf.keras.optimizers.Adam(learning_rate=0.0001),
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
         loss="sparse_categorical_crossentropy",
-        metrics=["accuracy"]
+        metrics=["accuracy"],
+        jit_compile=jit_compile
     )
     return model
 
+
+PRECISIONS = ("float32", "mixed_float16", "mixed_bfloat16")
+
+
+def configure_precision(policy: str) -> None:
+    """
+    Fija la política de precisión global de Keras antes de construir los modelos.
+
+    Args:
+        policy (str): "float32", "mixed_float16" (GPU) o "mixed_bfloat16" (CPU/TPU).
+    """
+    if policy == "mixed_float16" and not tf.config.list_physical_devices("GPU"):
+        print("⚠️  mixed_float16 sin GPU suele ser más lento; en CPU usa mixed_bfloat16")
+    tf.keras.mixed_precision.set_global_policy(policy)
+    print(f"Precisión de entrenamiento: {policy}")
+
+
+_memory_sampler = None  # ProcessSampler del backbone en curso (solo en CPU)
+
+
+def reset_peak_memory() -> None:
+    """Empieza a medir el pico del backbone actual: contador de la GPU o muestreo del RSS en CPU."""
+    global _memory_sampler
+    if tf.config.list_physical_devices("GPU"):
+        tf.config.experimental.reset_memory_stats("GPU:0")
+        return
+    if _memory_sampler is not None:
+        _memory_sampler.stop()
+    _memory_sampler = ProcessSampler(interval=0.25)
+    _memory_sampler.start()
+
+
+def peak_memory_mb() -> float | None:
+    """
+    Pico de memoria en MB desde reset_peak_memory(): de la GPU si hay una, si no el RSS
+    máximo muestreado. No se usa ru_maxrss: es el pico de todo el proceso y nunca baja,
+    así que repetiría el del backbone más grande en todos los siguientes.
+
+    Returns:
+        float | None: MB, o None si la plataforma no lo expone.
+    """
+    global _memory_sampler
+    if tf.config.list_physical_devices("GPU"):
+        return tf.config.experimental.get_memory_info("GPU:0")["peak"] / 1e6
+    if _memory_sampler is None:
+        return None
+    _memory_sampler.stop()
+    peak = _memory_sampler.summary()["rss_mb"]["max"]
+    _memory_sampler = None
+    return peak
+
 # ==========================
 # 3. Función de entrenamiento y evaluación
 # ==========================
@@ -67,8 +268,10 @@ def train_and_evaluate(
     train_ds: tf.data.Dataset,
     val_ds: tf.data.Dataset,
     test_ds: tf.data.Dataset,
-    class_names: list[str]
-) -> None:
+    class_names: list[str],
+    input_options: dict | None = None,
+    diagnose_input: bool = False
+) -> dict:
     """
     Entrena y evalúa un modelo de clasificación de imágenes.
 
@@ -79,54 +282,264 @@ def train_and_evaluate(
         val_ds (tf.data.Dataset): Dataset de validación.
         test_ds (tf.data.Dataset): Dataset de prueba.
         class_names (list[str]): Lista de nombres de clases.
+        input_options (dict | None): Argumentos de build_input_pipeline
+            (cache, augment, deterministic). Por defecto solo prefetch.
+        diagnose_input (bool): Imprime pasos/seg y si el entrenamiento está
+            limitado por la entrada o por el cómputo.
 
     Returns:
-        None
+        dict: Métricas de la ejecución (accuracy, loss, imágenes/seg, pico de memoria).
     """
+    input_options = input_options or {}
+    train_ds = build_input_pipeline(train_ds, "train", training=True, **input_options)
+    val_ds = build_input_pipeline(val_ds, "val", **input_options)
+    test_ds = build_input_pipeline(test_ds, "test", **input_options)
+
+    input_steps_per_sec = measure_input_throughput(train_ds) if diagnose_input else 0.0
+    throughput = ThroughputCallback(batch_size=64)
+    reset_peak_memory()
 
     print(f"\nEntrenando {name}...")
     history = model.fit(
         train_ds,
         epochs=1,
         validation_data=val_ds,
+        callbacks=[throughput],
         verbose=1
     )
     print("Entrenamiento completado.")
+    print(f"{name} - {throughput.steps_per_sec:.2f} pasos/s | {throughput.images_per_sec:.1f} imágenes/s")
+    if diagnose_input:
+        print_input_diagnostics(name, input_steps_per_sec, throughput.steps_per_sec)
 
-    # Evaluación en test
+    # Evaluación en test (una sola pasada: probabilidades, etiquetas, loss y accuracy)
     print(f"\nEvaluando {name} en el conjunto de test...")
-    loss, acc = model.evaluate(test_ds, verbose=1)
-    print(f"{name} - Test Loss: {loss:.4f} | Test Accuracy: {acc:.4f}")
-
-    # Predicciones
-    y_true = []
-    y_pred_classes = []
+    results = evaluate_single_pass(model, test_ds)
+    print(f"{name} - Test Loss: {results['loss']:.4f} | Test Accuracy: {results['accuracy']:.4f}")
 
-    for x_batch, y_batch in test_ds:
-        preds = model.predict(x_batch, verbose=0)
-        y_true.append(y_batch.numpy())
-        y_pred_classes.append(np.argmax(preds, axis=1))
-
-    y_true = np.concatenate(y_true, axis=0)
-    y_pred_classes = np.concatenate(y_pred_classes, axis=0)
+    # Guardar predicciones para regenerar reportes sin volver a ejecutar el modelo
+    predictions_path = f"{name}_test_predictions.npz"
+    save_predictions(predictions_path, results, class_names)
 
     # Reporte de clasificación
     print(f"\nReporte de clasificación para {name}:\n")
-    print(classification_report(y_true, y_pred_classes, target_names=class_names))
+    print_reports(results["probs"], results["labels"], class_names)
 
     # Guardar modelo
-    model.save(f"{name}_gesture_classifier.keras")
+    model_file = f"{name}_gesture_classifier.keras"
+    model.save(model_file)
+
+    return {
+        "modelo": name,
+        "archivo": model_file,
+        "precision": tf.keras.mixed_precision.global_policy().name,
+        "jit_compile": bool(getattr(model, "jit_compile", False)),
+        "accuracy": results["accuracy"],
+        "loss": results["loss"],
+        "imagenes_por_seg": throughput.images_per_sec,
+        "pico_memoria_mb": peak_memory_mb(),
+    }
+
+
+def print_benchmark_table(rows: list[dict]) -> None:
+    """Tabla comparativa de velocidad, memoria y accuracy por backbone."""
+    print("\n📋 Comparativa de backbones:")
+    print(f"{'Modelo':<16}{'Precisión':<16}{'XLA':<6}{'img/s':>10}{'Pico MB':>10}{'Accuracy':>10}")
+    for row in rows:
+        memory = f"{row['pico_memoria_mb']:.0f}" if row["pico_memoria_mb"] is not None else "n/d"
+        print(f"{row['modelo']:<16}{row['precision']:<16}{'sí' if row['jit_compile'] else 'no':<6}"
+              f"{row['imagenes_por_seg']:>10.1f}{memory:>10}{row['accuracy']:>10.4f}")
 
 # ==========================
-# 4. Definir arquitecturas
+# 3.1 Evaluación en una sola pasada
 # ==========================
-models_to_test = {
-    "EfficientNetB5": EfficientNetB5(weights="imagenet", include_top=False, input_shape=(128,128,3)),
-    "ResNet50": ResNet50(weights="imagenet", include_top=False, input_shape=(128,128,3)),
-    "InceptionV3": InceptionV3(weights="imagenet", include_top=False, input_shape=(128,128,3))
-}
+def evaluate_single_pass(model: tf.keras.Model, test_ds: tf.data.Dataset) -> dict:
+    """
+    Recorre el test una sola vez y acumula probabilidades, etiquetas, loss y accuracy.
+
+    Sustituye a model.evaluate + un segundo bucle de model.predict por batch.
+
+    Args:
+        model (tf.keras.Model): Modelo entrenado (salida softmax).
+        test_ds (tf.data.Dataset): Dataset de prueba en batches.
+
+    Returns:
+        dict: probs (N, C), labels (N,), loss y accuracy.
+    """
+    predict_step = tf.function(lambda x: model(x, training=False), reduce_retracing=True)
+
+    probs, labels = [], []
+    for x_batch, y_batch in test_ds:
+        probs.append(predict_step(x_batch).numpy().astype(np.float32))
+        labels.append(y_batch.numpy())
+
+    probs = np.concatenate(probs, axis=0)
+    labels = np.concatenate(labels, axis=0).astype(np.int64)
+    return {
+        "probs": probs,
+        "labels": labels,
+        "loss": sparse_crossentropy(probs, labels),
+        "accuracy": float(np.mean(np.argmax(probs, axis=1) == labels)),
+    }
+
+
+def sparse_crossentropy(probs: np.ndarray, labels: np.ndarray) -> float:
+    """Entropía cruzada media, igual a la loss de compilación del modelo."""
+    eps = 1e-7
+    picked = np.clip(probs[np.arange(len(labels)), labels], eps, 1.0)
+    return float(-np.mean(np.log(picked)))
+
+
+def save_predictions(file_path: str, results: dict, class_names: list[str]) -> None:
+    """Guarda probabilidades y etiquetas del test en un .npz."""
+    np.savez_compressed(
+        file_path,
+        probs=results["probs"],
+        labels=results["labels"],
+        class_names=np.array(class_names)
+    )
+    print(f"💾 Predicciones de test guardadas en {file_path}")
+
+
+def expected_calibration_error(probs: np.ndarray, labels: np.ndarray, bins: int = 15) -> float:
+    """ECE: diferencia media entre confianza y acierto por intervalos de confianza."""
+    confidences = probs.max(axis=1)
+    correct = np.argmax(probs, axis=1) == labels
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    ece = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidences > low) & (confidences <= high)
+        if in_bin.any():
+            ece += in_bin.mean() * abs(correct[in_bin].mean() - confidences[in_bin].mean())
+    return float(ece)
+
+
+def print_reports(probs: np.ndarray, labels: np.ndarray, class_names: list[str]) -> None:
+    """Reporte de clasificación, matriz de confusión y calibración a partir de predicciones guardadas."""
+    y_pred_classes = np.argmax(probs, axis=1)
+    all_labels = list(range(len(class_names)))
+    print(classification_report(labels, y_pred_classes, labels=all_labels, target_names=class_names))
+
+    print("Matriz de confusión (filas = real, columnas = predicción):")
+    matrix = confusion_matrix(labels, y_pred_classes, labels=all_labels)
+    print("     " + " ".join(f"{c[:3]:>4}" for c in class_names))
+    for class_name, row in zip(class_names, matrix):
+        print(f"{class_name[:4]:>4} " + " ".join(f"{v:>4}" for v in row))
+
+    print(f"\nCalibración: ECE = {expected_calibration_error(probs, labels):.4f} | "
+          f"confianza media = {probs.max(axis=1).mean():.4f}")
+
+
+def report_from_predictions(file_path: str) -> None:
+    """Regenera los reportes desde un .npz de save_predictions sin cargar el modelo."""
+    data = np.load(file_path)
+    class_names = [str(c) for c in data["class_names"]]
+    print(f"\nReporte desde {file_path}:\n")
+    print_reports(data["probs"], data["labels"], class_names)
+
+
 # ==========================
-# 5. Entrenar y evaluar
+# 4. Definir arquitecturas
 # ==========================
-for name, base_model in models_to_test.items():
-    model = build_model(base_model, num_classes)
\ No newline at end of file
+# Registro de fábricas: cada backbone se construye solo cuando le toca entrenar,
+# así en memoria hay un único conjunto de pesos ImageNet a la vez.
+BACKBONES = {
+    "EfficientNetB5": lambda: EfficientNetB5(weights="imagenet", include_top=False, input_shape=(128,128,3)),
+    "ResNet50": lambda: ResNet50(weights="imagenet", include_top=False, input_shape=(128,128,3)),
+    "InceptionV3": lambda: InceptionV3(weights="imagenet", include_top=False, input_shape=(128,128,3))
+}
+
+
+def run_backbone(
+    name: str,
+    datasets: tuple,
+    class_names: list[str],
+    jit_compile: bool | str = "auto",
+    input_options: dict | None = None,
+    diagnose_input: bool = False,
+    hyperparams: dict | None = None,
+    run_name: str | None = None,
+    precision: str | None = None
+) -> dict:
+    """
+    Construye, entrena, guarda y libera un backbone del registro.
+
+    Args:
+        name (str): Clave de BACKBONES.
+        datasets (tuple): (train_ds, val_ds, test_ds).
+        class_names (list[str]): Lista de nombres de clases.
+        jit_compile (bool | str): Valor de jit_compile para model.compile.
+        input_options (dict | None): Opciones de build_input_pipeline.
+        diagnose_input (bool): Diagnóstico de entrada (ver train_and_evaluate).
+        hyperparams (dict | None): dropout, dense_units y/o learning_rate para build_model.
+        run_name (str | None): Nombre del modelo guardado (por defecto `name`).
+        precision (str | None): Política de precisión (ver configure_precision). Se fija aquí
+            y no una sola vez porque clear_session() la devuelve a float32 tras cada backbone.
+
+    Returns:
+        dict: Métricas devueltas por train_and_evaluate.
+    """
+    if precision is not None:
+        configure_precision(precision)
+    train_ds, val_ds, test_ds = datasets
+    base_model = BACKBONES[name]()
+    model = build_model(base_model, len(class_names), jit_compile=jit_compile, **(hyperparams or {}))
+    result = train_and_evaluate(model, run_name or name, train_ds, val_ds, test_ds, class_names,
+                                input_options, diagnose_input)
+
+    # Liberar pesos y grafos antes de construir el siguiente backbone
+    del model, base_model
+    tf.keras.backend.clear_session()
+    gc.collect()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena y compara backbones para el clasificador ASL")
+    parser.add_argument("--dataset", default=path)
+    parser.add_argument("--modelos", nargs="+", choices=list(BACKBONES), default=list(BACKBONES),
+                        help="Subconjunto de backbones a entrenar (por defecto todos)")
+    parser.add_argument("--cache", default=None, help="Directorio creado con dataset_cache.py")
+    parser.add_argument("--cache-tfdata", default=None,
+                        help="Caché de tf.data: 'memoria' o un directorio para cachear en disco")
+    parser.add_argument("--augment", action="store_true", help="Augmentación aleatoria en paralelo")
+    parser.add_argument("--no-determinista", action="store_true",
+                        help="Permite que los map paralelos entreguen elementos fuera de orden")
+    parser.add_argument("--diagnostico-entrada", action="store_true",
+                        help="Imprime pasos/seg y si el entrenamiento está limitado por la entrada")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float32",
+                        help="Política de precisión de Keras (mixed_bfloat16 en CPU)")
+    parser.add_argument("--jit", action="store_true", help="Compila el paso de entrenamiento con XLA")
+    parser.add_argument("--reporte", default=None, metavar="NPZ",
+                        help="Solo regenera los reportes desde un *_test_predictions.npz y termina")
+    args = parser.parse_args()
+
+    if args.reporte:
+        report_from_predictions(args.reporte)
+        return
+
+    input_options = {
+        "cache": args.cache_tfdata,
+        "augment": args.augment,
+        "deterministic": not args.no_determinista,
+    }
+
+    train_ds, val_ds, test_ds, class_names = load_datasets(args.dataset, args.cache)
+
+    # ==========================
+    # 5. Entrenar y evaluar (un backbone en memoria a la vez)
+    # ==========================
+    benchmark_rows = []
+    for name in args.modelos:
+        benchmark_rows.append(run_backbone(
+            name, (train_ds, val_ds, test_ds), class_names,
+            jit_compile=True if args.jit else "auto",
+            input_options=input_options,
+            diagnose_input=args.diagnostico_entrada,
+            precision=args.precision
+        ))
+    print_benchmark_table(benchmark_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import collections
+import math
+import threading
+import time
+
+import numpy as np
+
+from metrics import LatencyStats
+
+# --- Control del cursor con la mano derecha ---
+# El bucle de frames solo entrega a CursorController la posición objetivo en
+# pantalla y si el índice está abajo. Un hilo propio mueve el cursor a
+# `rate_hz`, interpolando entre las dos últimas muestras filtradas (va un frame
+# por detrás a cambio de un movimiento continuo entre frames de la cámara).
+# La interpolación usa el instante en que cada muestra llega a `update()`, no
+# el de captura: las muestras llegan tras todo el retardo del pipeline y con el
+# reloj de captura ya estarían "en el pasado" y el cursor saltaría.
+# La posición se suaviza con un filtro One-Euro: casi sin suavizado a alta
+# velocidad (poco retardo) y mucho en reposo (sin temblor). El click se dispara
+# en el flanco de bajada del índice, tras `debounce_frames` frames estables.
+#
+# No importa pyautogui: `move_fn(x, y)` y `click_fn()` se inyectan.
+
+
+class OneEuroFilter:
+    """Filtro One-Euro (Casiez et al., 2012) sobre un vector; el corte sube con la velocidad."""
+
+    def __init__(self, min_cutoff=1.0, beta=0.005, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # Hz en reposo: menos = más suave y más retardo
+        self.beta = beta              # Cuánto sube el corte por unidad de velocidad
+        self.d_cutoff = d_cutoff      # Hz del filtro de la derivada
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, timestamp):
+        x = np.asarray(x, dtype=np.float64)
+        if self._x is None:
+            self._x, self._dx, self._t = x, np.zeros_like(x), timestamp
+            return x
+        dt = timestamp - self._t
+        if dt <= 0:
+            return self._x
+        self._t = timestamp
+        dx = (x - self._x) / dt
+        self._dx = self._dx + self._alpha(dt, self.d_cutoff) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * float(np.linalg.norm(self._dx))
+        self._x = self._x + self._alpha(dt, cutoff) * (x - self._x)
+        return self._x
+
+
+class CursorController:
+    """Hilo que mueve el cursor y hace click; `update()` se llama una vez por frame."""
+
+    def __init__(self, move_fn, click_fn, screen_size, rate_hz=120, min_cutoff=1.0, beta=0.005,
+                 debounce_frames=2, min_click_interval=0.3):
+        self.move_fn = move_fn
+        self.click_fn = click_fn
+        self.screen_size = screen_size          # (ancho, alto), se consulta una sola vez
+        self.rate_hz = rate_hz
+        self.filter = OneEuroFilter(min_cutoff, beta)
+        self.debounce_frames = debounce_frames  # Frames seguidos necesarios para cambiar de estado
+        self.min_click_interval = min_click_interval
+        self.latency = LatencyStats("cursor")   # Captura del frame → cursor en esa posición
+        self.clicks = 0
+        self.moves = 0
+        self._samples = collections.deque(maxlen=2)  # (t_llegada, t_captura, x, y) filtradas
+        self._frame_interval = 1 / 30
+        self._pending_clicks = 0
+        self._reached = True        # La última muestra ya se alcanzó (latencia registrada)
+        self._pressed = False
+        self._down_frames = 0
+        self._up_frames = 0
+        self._last_click = -math.inf
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cursor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(timeout=1.0)
+
+    def update(self, x, y, timestamp, finger_down):
+        """Nueva posición objetivo en píxeles de pantalla (sin filtrar) y estado del índice.
+
+        `timestamp` es el instante de captura (perf_counter): filtra la posición
+        y mide la latencia; la interpolación usa el de llegada.
+        """
+        arrival = time.perf_counter()
+        fx, fy = self.filter((x, y), timestamp)
+        with self._lock:
+            if self._samples:
+                # Intervalo real entre llegadas, para saber cuánto ir por detrás al interpolar
+                dt = arrival - self._samples[-1][0]
+                if 0 < dt < 0.5:
+                    self._frame_interval += 0.2 * (dt - self._frame_interval)
+            self._samples.append((arrival, timestamp, fx, fy))
+            self._reached = False
+            self._update_click(finger_down, timestamp)
+
+    def _update_click(self, finger_down, timestamp):
+        if finger_down:
+            self._down_frames, self._up_frames = self._down_frames + 1, 0
+        else:
+            self._up_frames, self._down_frames = self._up_frames + 1, 0
+        if not self._pressed and self._down_frames >= self.debounce_frames:
+            self._pressed = True
+            # Un click por pulsación (flanco), no uno por frame con el dedo abajo
+            if timestamp - self._last_click >= self.min_click_interval:
+                self._last_click = timestamp
+                self._pending_clicks += 1
+        elif self._pressed and self._up_frames >= self.debounce_frames:
+            self._pressed = False
+
+    def release(self):
+        """La mano derecha salió del frame: olvidar muestras y estado del click."""
+        with self._lock:
+            self._samples.clear()
+            self.filter.reset()
+            self._pressed = False
+            self._down_frames = self._up_frames = 0
+
+    def _target(self, now):
+        """Posición interpolada un frame por detrás entre las dos últimas muestras."""
+        if not self._samples:
+            return None
+        if len(self._samples) == 1:
+            _, _, x1, y1 = self._samples[-1]
+            return x1, y1, True
+        (t0, _, x0, y0), (t1, _, x1, y1) = self._samples
+        span = t1 - t0
+        progress = 1.0 if span <= 0 else min(1.0, (now - self._frame_interval - t0) / span)
+        progress = max(progress, 0.0)
+        return x0 + (x1 - x0) * progress, y0 + (y1 - y0) * progress, progress >= 1.0
+
+    def _run(self):
+        last_position = None
+        while not self._stopped.is_set():
+            tick = time.perf_counter()
+            with self._lock:
+                clicks, self._pending_clicks = self._pending_clicks, 0
+                if clicks and len(self._samples) > 1:
+                    # El click va donde está el dedo ahora: saltar a la última muestra sin interpolar
+                    self._samples.popleft()
+                target = self._target(tick)
+                reached_sample = None
+                if target is not None and target[2] and not self._reached:
+                    self._reached = True
+                    reached_sample = self._samples[-1][1]
+
+            if target is not None:
+                position = (int(round(target[0])), int(round(target[1])))
+                if position != last_position:
+                    try:
+                        self.move_fn(*position)
+                        self.moves += 1
+                    except Exception as e:
+                        print(f"⚠️  Error moviendo el cursor: {e}")
+                    last_position = position
+                if reached_sample is not None:
+                    self.latency.record(time.perf_counter() - reached_sample)
+            for _ in range(clicks):
+                try:
+                    self.click_fn()
+                    self.clicks += 1
+                except Exception as e:
+                    print(f"⚠️  Error haciendo click: {e}")
+
+            remaining = 1.0 / self.rate_hz - (time.perf_counter() - tick)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def format_stats(self):
+        return f"{self.latency.format()} | {self.moves} movimientos, {self.clicks} clicks"
@@ -0,0 +1,243 @@
+import argparse
+import json
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+# ==========================
+# Caché offline del dataset ASL
+# ==========================
+# Decodifica y redimensiona cada JPEG una sola vez (y opcionalmente extrae los
+# landmarks de MediaPipe) y lo guarda en shards .npy que se leen con mmap.
+# create_models.py y train_landmark_model.py pueden leer desde aquí en lugar
+# de volver a decodificar el dataset en cada época y en cada arquitectura.
+#
+# Estructura:
+#   <cache>/index.json
+#   <cache>/<split>/images_00000.npy     (N, 128, 128, 3) uint8 RGB
+#   <cache>/<split>/labels_00000.npy     (N,) int32
+#   <cache>/<split>/landmarks_00000.npy  (N, 63) float32, NaN si no hay mano
+
+DATASET_PATH = '/kaggle/input/asl-data/asl_alphabet_structured'
+IMAGE_SIZE = 128
+# Los mismos formatos que image_dataset_from_directory: el barajado depende del número de archivos
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+INDEX_FILE = "index.json"
+# Mismo reparto que create_models.py sin caché: image_dataset_from_directory con
+# validation_split=0.2 y seed=123 (su subset "validation" es el test) y, del resto,
+# un 12.5% para validación (10% del total)
+TEST_SPLIT = 0.2
+VAL_FRACTION = 0.125
+SPLIT_SCHEME = "image_dataset_from_directory"  # Se guarda en index.json para detectar cachés antiguas
+RESIZE_METHOD = "bilinear"  # El de image_dataset_from_directory; también se guarda en index.json
+
+
+def list_dataset(dataset_path):
+    """Lista (ruta, clase) con las clases en orden alfabético, como image_dataset_from_directory."""
+    class_names = sorted(d for d in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, d)))
+    files = []
+    for class_idx, class_name in enumerate(class_names):
+        class_dir = os.path.join(dataset_path, class_name)
+        for file_name in sorted(os.listdir(class_dir)):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                files.append((os.path.join(class_dir, file_name), class_idx))
+    return files, class_names
+
+
+def split_indices(num_files, seed=123):
+    """Índices de train/val/test con el mismo barajado y corte que image_dataset_from_directory.
+
+    Keras baraja la lista de archivos con np.random.RandomState(seed).shuffle y
+    toma los últimos `validation_split` como subset "validation": así el test
+    cacheado es exactamente el mismo que el del camino sin caché. La validación
+    sin caché sale de lotes de un dataset que se rebaraja cada época, así que
+    no se puede reproducir; aquí son las primeras muestras del resto.
+    """
+    order = list(range(num_files))
+    np.random.RandomState(seed).shuffle(order)
+    num_test = int(TEST_SPLIT * num_files)
+    train_val, test = order[:num_files - num_test], order[num_files - num_test:]
+    num_val = int(VAL_FRACTION * len(train_val))
+    return {"train": train_val[num_val:], "val": train_val[:num_val], "test": test}
+
+
+class ShardWriter:
+    """Acumula muestras de un split y las vuelca en shards .npy de tamaño fijo."""
+
+    def __init__(self, cache_dir, split, shard_size, with_landmarks):
+        self.cache_dir = cache_dir
+        self.split = split
+        self.shard_size = shard_size
+        self.with_landmarks = with_landmarks
+        self.shards = []
+        os.makedirs(os.path.join(cache_dir, split), exist_ok=True)
+        self._images = np.empty((shard_size, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)
+        self._labels = np.empty((shard_size,), dtype=np.int32)
+        self._landmarks = np.empty((shard_size, 63), dtype=np.float32) if with_landmarks else None
+        self._count = 0
+
+    def add(self, image_rgb, label, landmarks=None):
+        self._images[self._count] = image_rgb
+        self._labels[self._count] = label
+        if self.with_landmarks:
+            self._landmarks[self._count] = np.nan if landmarks is None else landmarks
+        self._count += 1
+        if self._count == self.shard_size:
+            self._flush()
+
+    def _flush(self):
+        if self._count == 0:
+            return
+        n = len(self.shards)
+        shard = {
+            "images": f"{self.split}/images_{n:05d}.npy",
+            "labels": f"{self.split}/labels_{n:05d}.npy",
+            "muestras": self._count,
+        }
+        np.save(os.path.join(self.cache_dir, shard["images"]), self._images[:self._count])
+        np.save(os.path.join(self.cache_dir, shard["labels"]), self._labels[:self._count])
+        if self.with_landmarks:
+            shard["landmarks"] = f"{self.split}/landmarks_{n:05d}.npy"
+            np.save(os.path.join(self.cache_dir, shard["landmarks"]), self._landmarks[:self._count])
+        self.shards.append(shard)
+        self._count = 0
+
+    def close(self):
+        self._flush()
+        return {"muestras": sum(s["muestras"] for s in self.shards), "shards": self.shards}
+
+
+def resize_like_keras(image, tf):
+    """BGR de cv2 → RGB uint8 de IMAGE_SIZE redimensionado como image_dataset_from_directory.
+
+    Keras usa tf.image.resize bilineal sin antialias; INTER_AREA de cv2 daría píxeles
+    distintos de los del camino sin caché (y de los de program.py, que usa bilineal).
+    La única diferencia que queda es el redondeo a uint8 (±0.5).
+    """
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    resized = tf.image.resize(rgb, (IMAGE_SIZE, IMAGE_SIZE), method="bilinear")
+    return np.clip(np.round(resized.numpy()), 0, 255).astype(np.uint8)
+
+
+def build_cache(dataset_path, cache_dir, shard_size=4096, with_landmarks=False, seed=123):
+    """Decodifica, redimensiona a 128×128 y reparte el dataset en splits cacheados."""
+    import tensorflow as tf
+
+    files, class_names = list_dataset(dataset_path)
+    splits = split_indices(len(files), seed)
+
+    hands = None
+    if with_landmarks:
+        import mediapipe as mp
+        from train_landmark_model import image_to_features
+        hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index = {
+        "dataset": os.path.abspath(dataset_path),
+        "class_names": class_names,
+        "image_size": IMAGE_SIZE,
+        "seed": seed,
+        "reparto": SPLIT_SCHEME,
+        "redimensionado": RESIZE_METHOD,
+        "landmarks": with_landmarks,
+        "fecha_creacion": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "splits": {},
+    }
+
+    start_time = time.time()
+    skipped = 0
+    for split, indices in splits.items():
+        writer = ShardWriter(cache_dir, split, shard_size, with_landmarks)
+        for i in indices:
+            path, label = files[i]
+            image = cv2.imread(path)
+            if image is None:
+                skipped += 1
+                continue
+            landmarks = image_to_features(hands, image) if hands is not None else None
+            writer.add(resize_like_keras(image, tf), label, landmarks)
+        index["splits"][split] = writer.close()
+        print(f"   📦 {split}: {index['splits'][split]['muestras']} muestras en {len(writer.shards)} shards")
+
+    if hands is not None:
+        hands.close()
+
+    with open(os.path.join(cache_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=4)
+    print(f"✅ Caché creada en {cache_dir} ({time.time() - start_time:.0f}s, {skipped} imágenes ilegibles)")
+    return index
+
+
+# ==========================
+# Lectura de la caché
+# ==========================
+def load_index(cache_dir):
+    with open(os.path.join(cache_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_cached_split(cache_dir, split, batch_size=64, shuffle=False, chunk=256):
+    """tf.data.Dataset de (imagen float32 0-255, etiqueta int32) leído con mmap desde los shards.
+
+    Produce lo mismo que image_dataset_from_directory (mismo reparto y mismo
+    redimensionado bilineal, salvo el redondeo a uint8), así que el resto del
+    entrenamiento no cambia. Con `shuffle` se baraja el orden de los shards en
+    cada época y las muestras dentro de un buffer.
+    """
+    import tensorflow as tf
+
+    index = load_index(cache_dir)
+    shards = index["splits"][split]["shards"]
+    size = index["image_size"]
+
+    def generator():
+        shard_order = np.random.permutation(len(shards)) if shuffle else range(len(shards))
+        for i in shard_order:
+            images = np.load(os.path.join(cache_dir, shards[i]["images"]), mmap_mode="r")
+            labels = np.load(os.path.join(cache_dir, shards[i]["labels"]), mmap_mode="r")
+            for start in range(0, len(labels), chunk):
+                yield np.asarray(images[start:start + chunk]), np.asarray(labels[start:start + chunk])
+
+    ds = tf.data.Dataset.from_generator(generator, output_signature=(
+        tf.TensorSpec((None, size, size, 3), tf.uint8),
+        tf.TensorSpec((None,), tf.int32),
+    )).unbatch()
+    if shuffle:
+        ds = ds.shuffle(4 * chunk)
+    ds = ds.batch(batch_size).map(lambda x, y: (tf.cast(x, tf.float32), y))
+    num_batches = math.ceil(index["splits"][split]["muestras"] / batch_size)
+    return ds.apply(tf.data.experimental.assert_cardinality(num_batches))
+
+
+def load_cached_landmarks(cache_dir, splits=("train", "val", "test")):
+    """Devuelve (X, y, class_names) con los landmarks cacheados, sin las muestras sin mano."""
+    index = load_index(cache_dir)
+    if not index.get("landmarks"):
+        raise ValueError(f"La caché {cache_dir} no incluye landmarks (crear con --landmarks)")
+    X, y = [], []
+    for split in splits:
+        for shard in index["splits"][split]["shards"]:
+            X.append(np.load(os.path.join(cache_dir, shard["landmarks"])))
+            y.append(np.load(os.path.join(cache_dir, shard["labels"])))
+    X, y = np.concatenate(X), np.concatenate(y)
+    valid = ~np.isnan(X).any(axis=1)
+    return X[valid], y[valid], index["class_names"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocesa el dataset ASL una sola vez en shards .npy")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--salida", default="cache/asl_128", help="Directorio de la caché")
+    parser.add_argument("--shard", type=int, default=4096, help="Muestras por shard")
+    parser.add_argument("--landmarks", action="store_true", help="Extraer también landmarks de MediaPipe")
+    parser.add_argument("--seed", type=int, default=123)
+    args = parser.parse_args()
+    build_cache(args.dataset, args.salida, args.shard, args.landmarks, args.seed)
+
+
+if __name__ == "__main__":
+    main()
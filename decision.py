@@ -0,0 +1,134 @@
+import collections
+
+import numpy as np
+
+from landmarks import landmark_displacement
+
+# --- Capa de decisión temporal ---
+# Convierte la secuencia ruidosa de predicciones del clasificador en gestos
+# estables: media exponencial de las probabilidades (ponderada por el tiempo
+# transcurrido, así no depende de cuántos frames se clasifican), votación en
+# una ventana de las últimas N predicciones, confianza mínima, tiempo sostenido
+# e histéresis. Un gesto se emite UNA vez al estabilizarse y no vuelve a
+# emitirse hasta que se suelta (la confianza cae por debajo del umbral de
+# liberación o la mano desaparece).
+#
+# MotionGate decide antes de la inferencia si hace falta clasificar: mientras
+# la mano no se mueva se reutiliza la última predicción.
+
+
+class GestureStabilizer:
+    """Estabilizador de una mano. `update()` devuelve la clase emitida o None."""
+
+    def __init__(self, window=8, time_constant=0.25, min_confidence=0.7, min_votes=0.6,
+                 hold_time=0.4, release_confidence=0.45, max_gap=0.5):
+        self.window = window
+        self.time_constant = time_constant        # Segundos: constante de tiempo de la media exponencial
+        self.min_confidence = min_confidence      # Confianza suavizada necesaria para candidatear
+        self.min_votes = min_votes                # Fracción de la ventana que debe coincidir
+        self.hold_time = hold_time                # Segundos que el candidato debe mantenerse
+        self.release_confidence = release_confidence  # Histéresis: por debajo se suelta el gesto
+        self.max_gap = max_gap                    # Segundos sin predicciones tras los que se reinicia
+        self.emitted = 0
+        self.reset()
+
+    def reset(self):
+        self._votes = collections.deque(maxlen=self.window)
+        self._ema = None
+        self._last_t = None
+        self._candidate = None
+        self._candidate_since = None
+        self.active = None          # Gesto emitido y aún sostenido
+
+    @property
+    def smoothed(self):
+        """(clase, confianza) de la media suavizada actual, o (None, None)."""
+        if self._ema is None:
+            return None, None
+        class_idx = int(np.argmax(self._ema))
+        return class_idx, float(self._ema[class_idx])
+
+    def hold_progress(self, timestamp):
+        """Fracción (0-1) del tiempo sostenido que lleva el candidato actual."""
+        if self._candidate is None or self.active is not None or self.hold_time <= 0:
+            return 0.0
+        return min(1.0, (timestamp - self._candidate_since) / self.hold_time)
+
+    def expire(self, timestamp):
+        """Reinicia si hace más de `max_gap` segundos que no llega una predicción (mano fuera)."""
+        if self._last_t is not None and timestamp - self._last_t > self.max_gap:
+            self.reset()
+
+    def update(self, probs, timestamp):
+        probs = np.asarray(probs, dtype=np.float32).ravel()
+        self.expire(timestamp)
+        if self._ema is None:
+            self._ema = probs.copy()
+        else:
+            # alpha según el tiempo real entre predicciones, no por frame
+            alpha = 1.0 - np.exp(-(timestamp - self._last_t) / self.time_constant)
+            self._ema += alpha * (probs - self._ema)
+        self._last_t = timestamp
+        self._votes.append(int(np.argmax(probs)))
+
+        class_idx, confidence = self.smoothed
+
+        # Histéresis: el gesto activo se mantiene mientras no baje de la confianza de liberación
+        if self.active is not None:
+            if self._ema[self.active] >= self.release_confidence:
+                return None
+            self.active = None
+
+        votes = self._votes.count(class_idx) / len(self._votes)
+        if confidence < self.min_confidence or votes < self.min_votes:
+            self._candidate = None
+            return None
+
+        if class_idx != self._candidate:
+            self._candidate = class_idx
+            self._candidate_since = timestamp
+        if timestamp - self._candidate_since >= self.hold_time:
+            self.active = class_idx
+            self._candidate = None
+            self.emitted += 1
+            return class_idx
+        return None
+
+
+class MotionGate:
+    """Reutiliza la última predicción mientras la mano siga quieta y no haya caducado."""
+
+    def __init__(self, threshold=0.03, max_age=0.5):
+        self.threshold = threshold  # Desplazamiento medio (fracción del tamaño de la mano)
+        self.max_age = max_age      # Segundos tras los que se reclasifica aunque no haya movimiento
+        self.inferences = 0
+        self.reused = 0
+        self.reset()
+
+    def reset(self):
+        self._points = None
+        self._probs = None
+        self._t = None
+
+    def check(self, points, timestamp, aspect=1.0):
+        """Probabilidades a reutilizar, o None si hay que clasificar este frame."""
+        if self._probs is None or timestamp - self._t > self.max_age:
+            return None
+        # Se compara con los landmarks de la última clasificación, no del frame anterior,
+        # para que un movimiento lento también acabe disparando la reclasificación
+        if landmark_displacement(points, self._points, aspect) > self.threshold:
+            return None
+        self.reused += 1
+        return self._probs
+
+    def record(self, points, probs, timestamp):
+        """Registra una clasificación real como nueva referencia."""
+        self._points = points
+        self._probs = probs
+        self._t = timestamp
+        self.inferences += 1
+
+    @property
+    def saved_ratio(self):
+        total = self.inferences + self.reused
+        return self.reused / total if total else 0.0
@@ -0,0 +1,157 @@
+import collections
+import threading
+import time
+
+# --- Despacho asíncrono de comandos ---
+# executive_command solo encola la acción; unos hilos la ejecutan fuera del
+# bucle de frames. Hay dos colas:
+#   serie  teclado y ratón: un único worker, en el orden en que se encolaron
+#          (Copiar antes que Pegar; las teclas de typewrite no se mezclan)
+#   pool   acciones independientes entre sí, como lanzar programas
+# Cada cola está acotada (si se llena, la acción nueva se descarta) y las
+# acciones repetibles (volumen, scroll) se fusionan: si ya hay una igual
+# pendiente, solo se incrementa su número de repeticiones. Las idempotentes
+# (repetirlas no cambia nada) no se encolan si ya hay una igual pendiente. En la
+# cola en serie solo cuenta la última pendiente, para no adelantar a otras.
+#
+# Un hilo de Python no se puede interrumpir, así que el timeout por acción
+# abandona al worker bloqueado (su resultado se ignora) y arranca otro en su
+# lugar: el pool no pierde capacidad aunque una acción se quede colgada.
+
+
+class _Action:
+    __slots__ = ("name", "fn", "repeat", "timeout", "serial", "queued_at")
+
+    def __init__(self, name, fn, timeout, serial):
+        self.name = name
+        self.fn = fn
+        self.repeat = 1
+        self.timeout = timeout
+        self.serial = serial
+        self.queued_at = time.perf_counter()
+
+
+class CommandDispatcher:
+    """Un worker en serie más un pool de hilos, con colas acotadas. `submit()` nunca bloquea."""
+
+    def __init__(self, workers=2, max_pending=8, timeout=5.0):
+        self.workers = workers          # Hilos del pool (el worker en serie va aparte)
+        self.max_pending = max_pending
+        self.timeout = timeout          # Segundos por acción antes de abandonar al worker
+        self.executed = 0
+        self.failed = 0
+        self.dropped = 0                # Descartadas por cola llena
+        self.coalesced = 0              # Fusionadas con una pendiente igual
+        self.timeouts = 0
+        self._pending = collections.deque()   # Pool
+        self._serial = collections.deque()    # Worker en serie
+        self._running = {}              # worker → (acción, inicio)
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._next_id = 0
+        self._watchdog = threading.Thread(target=self._watch, name="comandos-watchdog", daemon=True)
+
+    def start(self):
+        self._spawn_worker(serial=True)
+        for _ in range(self.workers):
+            self._spawn_worker(serial=False)
+        self._watchdog.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._serial.clear()
+            self._cond.notify_all()
+
+    def drain(self, timeout=5.0):
+        """Espera a que se ejecuten las acciones pendientes. Devuelve False si vence el timeout."""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while self._pending or self._serial or self._running:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.1))
+        return True
+
+    def _spawn_worker(self, serial):
+        self._next_id += 1
+        name = "comandos-serie" if serial else f"comandos-{self._next_id}"
+        worker = threading.Thread(target=self._work, args=(serial,), name=name, daemon=True)
+        worker.start()
+
+    def submit(self, name, fn, coalesce=False, dedupe=False, timeout=None, serial=True):
+        """Encola una acción (en serie salvo `serial=False`). Devuelve False si se descartó por cola llena."""
+        with self._cond:
+            queue = self._serial if serial else self._pending
+            if coalesce or dedupe:
+                # En serie solo la última pendiente: fusionar con una anterior la adelantaría
+                candidates = queue if not serial else list(queue)[-1:]
+                for pending in candidates:
+                    if pending.name == name:
+                        if coalesce:
+                            pending.repeat += 1
+                        self.coalesced += 1
+                        return True
+            if len(queue) >= self.max_pending:
+                self.dropped += 1
+                print(f"⚠️  Cola de comandos llena: '{name}' descartado")
+                return False
+            queue.append(_Action(name, fn, self.timeout if timeout is None else timeout, serial))
+            # Los workers de las dos colas esperan en la misma condición
+            self._cond.notify_all()
+            return True
+
+    def _work(self, serial):
+        me = threading.current_thread()
+        queue = self._serial if serial else self._pending
+        while True:
+            with self._cond:
+                while not queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                action = queue.popleft()
+                self._running[me] = (action, time.perf_counter())
+
+            error = None
+            try:
+                for _ in range(action.repeat):
+                    action.fn()
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                if self._running.pop(me, None) is None:
+                    return  # El watchdog abandonó este worker por timeout y ya hay otro en su lugar
+                if error is None:
+                    self.executed += 1
+                else:
+                    self.failed += 1
+            if error is not None:
+                # Los éxitos ya los anunció quien encoló la acción: aquí solo los errores
+                print(f"❌ ERROR ejecutando '{action.name}': {error}")
+
+    def _watch(self):
+        while True:
+            time.sleep(0.25)
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.perf_counter()
+                for worker, (action, started) in list(self._running.items()):
+                    if now - started > action.timeout:
+                        del self._running[worker]
+                        self.timeouts += 1
+                        print(f"⏱️  '{action.name}' superó {action.timeout:.1f} s: se abandona y se repone el worker")
+                        self._spawn_worker(action.serial)
+
+    @property
+    def pending(self):
+        return len(self._pending) + len(self._serial)
+
+    def format_stats(self):
+        return (f"comandos: {self.executed} ejecutados, {self.failed} con error, "
+                f"{self.coalesced} fusionados, {self.dropped} descartados, {self.timeouts} por timeout")
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+
+import tensorflow as tf
+from tensorflow.keras import layers, ops
+from tensorflow.keras.applications import MobileNetV3Small
+from tensorflow.keras.models import Sequential
+
+import create_models
+from inference import benchmark_backend, create_backend
+
+# ==========================
+# Destilación: EfficientNetB5 (profesor) → estudiante compacto
+# ==========================
+# El estudiante aprende de las etiquetas reales y de las probabilidades
+# suavizadas (temperatura T) del profesor ya entrenado. Al final se exporta
+# con softmax en el mismo formato .keras que carga program.py.
+
+TEACHER_PATH = 'models/EfficientNetB5_gesture_classifier.keras'
+
+
+# ==========================
+# 1. Estudiantes
+# ==========================
+def build_mobilenet_student(num_classes):
+    """MobileNetV3-Small preentrenado; incluye su propio reescalado de 0-255."""
+    base = MobileNetV3Small(weights="imagenet", include_top=False, input_shape=(128, 128, 3))
+    return Sequential([
+        base,
+        layers.GlobalAveragePooling2D(),
+        layers.Dropout(0.2),
+        layers.Dense(num_classes, dtype="float32")  # logits
+    ], name="mobilenetv3_student")
+
+
+def build_small_cnn_student(num_classes):
+    """CNN pequeña desde cero (~100k parámetros)."""
+    def block(filters):
+        return [
+            layers.Conv2D(filters, 3, padding="same", use_bias=False),
+            layers.BatchNormalization(),
+            layers.ReLU(),
+            layers.MaxPooling2D(),
+        ]
+
+    return Sequential([
+        layers.Input(shape=(128, 128, 3)),
+        layers.Rescaling(1./255),
+        *block(32), *block(64), *block(96), *block(128),
+        layers.GlobalAveragePooling2D(),
+        layers.Dropout(0.2),
+        layers.Dense(num_classes, dtype="float32")  # logits
+    ], name="small_cnn_student")
+
+
+STUDENTS = {
+    "MobileNetV3Small": build_mobilenet_student,
+    "SmallCNN": build_small_cnn_student,
+}
+
+
+# ==========================
+# 2. Distiller
+# ==========================
+class Distiller(tf.keras.Model):
+    """Entrena al estudiante con alpha * CE(etiquetas) + (1 - alpha) * KL(profesor_T || estudiante_T) * T²."""
+
+    def __init__(self, student, teacher):
+        super().__init__()
+        self.student = student
+        self.teacher = teacher
+        self.teacher.trainable = False
+
+    def compile(self, optimizer, metrics, alpha=0.1, temperature=4.0):
+        super().compile(optimizer=optimizer, metrics=metrics)
+        self.alpha = alpha
+        self.temperature = temperature
+        self.student_loss_fn = tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True)
+        self.distillation_loss_fn = tf.keras.losses.KLDivergence()
+
+    def call(self, x, training=False):
+        return self.student(x, training=training)
+
+    def compute_loss(self, x=None, y=None, y_pred=None, sample_weight=None, training=True):
+        # El profesor devuelve probabilidades: log(p) son sus logits salvo una constante
+        teacher_probs = self.teacher(x, training=False)
+        teacher_logits = ops.log(ops.clip(teacher_probs, 1e-7, 1.0))
+
+        student_loss = self.student_loss_fn(y, y_pred)
+        distillation_loss = self.distillation_loss_fn(
+            ops.softmax(teacher_logits / self.temperature, axis=1),
+            ops.softmax(y_pred / self.temperature, axis=1),
+        ) * (self.temperature ** 2)
+        return self.alpha * student_loss + (1 - self.alpha) * distillation_loss
+
+
+def export_student(student, file_path):
+    """Añade softmax al estudiante y lo guarda como el resto de clasificadores."""
+    exported = Sequential([student, layers.Softmax(dtype="float32")])
+    exported.build((None, 128, 128, 3))
+    exported.save(file_path)
+    print(f"💾 Estudiante exportado: {file_path}")
+    return file_path
+
+
+# ==========================
+# 3. Comparativa
+# ==========================
+def compare(models, test_ds, class_names):
+    """Accuracy en test y latencia de un frame (backend tf_function) para cada modelo."""
+    rows = []
+    for name, file_path in models.items():
+        model = tf.keras.models.load_model(file_path)
+        results = create_models.evaluate_single_pass(model, test_ds)
+        latency = benchmark_backend(create_backend("tf_function", file_path), iterations=100)
+        rows.append({
+            "modelo": name,
+            "archivo": file_path,
+            "accuracy": results["accuracy"],
+            "parametros": int(model.count_params()),
+            "tamano_mb": round(os.path.getsize(file_path) / 1e6, 2),
+            "latencia": latency,
+        })
+        del model
+        tf.keras.backend.clear_session()
+
+    print(f"\n{'Modelo':<28}{'Accuracy':>10}{'Parámetros':>14}{'MB':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['modelo']:<28}{row['accuracy']:>10.4f}{row['parametros']:>14,}{row['tamano_mb']:>8.1f}"
+              f"{row['latencia']['p50_ms']:>9.2f}{row['latencia']['p99_ms']:>9.2f}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Destila el clasificador EfficientNetB5 en un estudiante pequeño")
+    parser.add_argument("--dataset", default=create_models.path)
+    parser.add_argument("--cache", default=None, help="Directorio creado con dataset_cache.py")
+    parser.add_argument("--profesor", default=TEACHER_PATH)
+    parser.add_argument("--estudiante", choices=list(STUDENTS), default="MobileNetV3Small")
+    parser.add_argument("--epocas", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.1, help="Peso de la loss con etiquetas reales")
+    parser.add_argument("--temperatura", type=float, default=4.0)
+    parser.add_argument("--reporte", default="distill_report.json")
+    args = parser.parse_args()
+
+    train_ds, val_ds, test_ds, class_names = create_models.load_datasets(args.dataset, args.cache)
+    train_ds = create_models.build_input_pipeline(train_ds, "train", training=True)
+    val_ds = create_models.build_input_pipeline(val_ds, "val")
+    test_ds = create_models.build_input_pipeline(test_ds, "test")
+
+    teacher = tf.keras.models.load_model(args.profesor)
+    student = STUDENTS[args.estudiante](len(class_names))
+
+    distiller = Distiller(student, teacher)
+    distiller.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        metrics=["accuracy"],
+        alpha=args.alpha,
+        temperature=args.temperatura
+    )
+    print(f"\nDestilando {os.path.basename(args.profesor)} → {args.estudiante} "
+          f"(alpha={args.alpha}, T={args.temperatura})...")
+    distiller.fit(train_ds, epochs=args.epocas, validation_data=val_ds, verbose=1)
+
+    os.makedirs("models", exist_ok=True)
+    student_path = export_student(student, f"models/{args.estudiante}_student_gesture_classifier.keras")
+    del distiller, teacher, student
+    tf.keras.backend.clear_session()
+
+    rows = compare({"Profesor (EfficientNetB5)": args.profesor,
+                    f"Estudiante ({args.estudiante})": student_path}, test_ds, class_names)
+    with open(args.reporte, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=4)
+    print(f"\n📄 Reporte guardado en {args.reporte}")
+    print(f"💡 Para usarlo en program.py: \"modelo\": \"{student_path}\" en la sección 'motor'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import queue
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# --- Canal de control entre app.py y el motor gestual (program.py --daemon) ---
+# El motor queda residente (TensorFlow, modelo y MediaPipe cargados) y app.py
+# le envía órdenes por un socket local en lugar de lanzar y matar el proceso.
+# Cada mensaje es un dict {"cmd": <orden>}; la respuesta incluye el estado
+# actual del motor. Este módulo no importa nada pesado: app.py lo usa tal cual.
+#
+# Las conexiones de multiprocessing intercambian pickles, así que la authkey es
+# lo único que impide que otro proceso local ejecute código en el motor: app.py
+# genera una aleatoria en cada arranque y se la pasa al motor por la variable de
+# entorno ENGINE_AUTHKEY_ENV (nunca por argumentos, visibles para todos).
+
+ENGINE_ADDRESS = ("127.0.0.1", 50515)
+ENGINE_AUTHKEY_ENV = "CONTROL_GESTUAL_AUTHKEY"
+COMMANDS = ("start", "pause", "resume", "reload-config", "shutdown", "status")
+
+
+def new_authkey():
+    """Authkey aleatoria para un arranque del motor (hex, para poder pasarla por el entorno)."""
+    return secrets.token_hex(32)
+
+
+def authkey_from_env():
+    """Authkey que app.py dejó en el entorno, o None si el motor no lo lanzó app.py."""
+    key = os.environ.get(ENGINE_AUTHKEY_ENV)
+    return key.encode() if key else None
+
+
+class EngineServer:
+    """Escucha órdenes en un hilo de fondo y las deja en `commands` para el hilo principal."""
+
+    def __init__(self, authkey, address=ENGINE_ADDRESS):
+        if not authkey:
+            raise ValueError(f"El canal de control necesita una authkey (variable {ENGINE_AUTHKEY_ENV})")
+        self.commands = queue.Queue()
+        self.state = "cargando"
+        self._listener = Listener(address, authkey=authkey)
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, name="ipc-motor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        print(f"🔌 Motor escuchando órdenes en {self._listener.address}")
+        return self
+
+    def set_state(self, state):
+        self.state = state
+
+    def next_command(self, timeout=None):
+        """Siguiente orden recibida, o None si no llega ninguna en `timeout` segundos."""
+        try:
+            if timeout == 0:
+                return self.commands.get_nowait()
+            return self.commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _serve(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._closed:
+                    return  # listener cerrado
+                # Cliente con authkey incorrecta o conexión cortada en el handshake
+                # (ConnectionResetError, BrokenPipeError...): se sigue aceptando
+                print(f"⚠️  Conexión de control rechazada: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), name="ipc-cliente", daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                cmd = message.get("cmd") if isinstance(message, dict) else None
+                if cmd not in COMMANDS:
+                    conn.send({"ok": False, "error": f"Orden desconocida: {cmd}", "estado": self.state})
+                    continue
+                if cmd != "status":
+                    self.commands.put(cmd)
+                conn.send({"ok": True, "cmd": cmd, "estado": self.state})
+
+    def close(self):
+        self._closed = True
+        self._listener.close()
+
+
+class EngineClient:
+    """Conexión de app.py al motor. `connect()` devuelve False si no hay motor escuchando."""
+
+    def __init__(self, authkey, address=ENGINE_ADDRESS):
+        self.address = address
+        self.authkey = authkey.encode() if isinstance(authkey, str) else authkey
+        self._conn = None
+
+    @property
+    def connected(self):
+        return self._conn is not None
+
+    def connect(self):
+        if self._conn is not None:
+            return True
+        try:
+            self._conn = Client(self.address, authkey=self.authkey)
+            return True
+        except (ConnectionRefusedError, OSError, AuthenticationError):
+            # Sin motor, o uno lanzado por otra ventana con otra authkey
+            self._conn = None
+            return False
+
+    def send(self, cmd, timeout=2.0):
+        """Envía una orden y devuelve la respuesta del motor, o None si no hay conexión."""
+        if not self.connect():
+            return None
+        try:
+            self._conn.send({"cmd": cmd})
+            if not self._conn.poll(timeout):
+                # Sin respuesta a tiempo: descartar la conexión para no leer respuestas desfasadas
+                self.close()
+                return None
+            return self._conn.recv()
+        except (EOFError, OSError):
+            # El motor terminó: la próxima orden intentará reconectar
+            self.close()
+            return None
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
@@ -0,0 +1,154 @@
+import time
+
+import cv2
+import numpy as np
+
+from landmarks import landmarks_to_array
+from metrics import LatencyStats
+
+# --- Detección de manos con resolución reducida y ROI seguida ---
+# MediaPipe no necesita el frame completo: se le pasa una copia reducida
+# (`detection_width` px de ancho) y, si en el frame anterior había manos, solo
+# un recorte cuadrado alrededor de ellas. Los landmarks se devuelven siempre
+# como arrays (21, 3) en coordenadas normalizadas del frame COMPLETO, así el
+# resto de program.py no sabe qué región se procesó.
+#
+# El recorte se centra en la mano en cada frame, de modo que dentro del
+# recorte la mano se mueve poco y el seguimiento interno de MediaPipe
+# (static_image_mode=False) sigue funcionando. Si la mano se pierde en el
+# recorte, se repite la detección en el frame completo en ese mismo frame.
+#
+# Recortes y frames completos van a instancias de `Hands` distintas: el
+# seguimiento de MediaPipe guarda la región del frame anterior normalizada a
+# esa imagen, y alternar imágenes en una sola instancia la dejaría en otras
+# coordenadas. `create_hands()` crea cada instancia (la de ROI, al usarla).
+
+
+class HandDetector:
+    """Envuelve `mp.solutions.hands.Hands`; `process(frame_bgr)` devuelve [(etiqueta, puntos)]."""
+
+    def __init__(self, create_hands, detection_width=320, track_roi=True, roi_margin=0.6,
+                 roi_min_size=96, redetect_every=15):
+        self.create_hands = create_hands
+        self.full_hands = create_hands()        # Siempre recibe el frame completo
+        self.roi_hands = None                   # Siempre recibe recortes; se crea al primer uso
+        self.detection_width = detection_width  # None o 0: sin reducir
+        self.track_roi = track_roi
+        self.roi_margin = roi_margin            # Margen del recorte, en tamaños de mano por lado
+        self.roi_min_size = roi_min_size        # Lado mínimo del recorte en px del frame
+        self.redetect_every = redetect_every    # Cada N frames, detección completa (manos nuevas)
+        self.full_latency = LatencyStats("completo")
+        self.roi_latency = LatencyStats("roi")
+        self.latency = LatencyStats("detección")  # Total por frame (ROI + completo si se pierde)
+        self.roi_lost = 0
+        self._roi = None
+        self._buffers = {}   # Buffers de reducción y RGB reutilizados, por forma
+        self._frames_since_full = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.full_hands.close()
+        if self.roi_hands is not None:
+            self.roi_hands.close()
+
+    def reset(self):
+        self._roi = None
+
+    def _buffer(self, name, shape):
+        key = (name, shape)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def process(self, frame_bgr):
+        frame_start = time.perf_counter()
+        height, width = frame_bgr.shape[:2]
+        if self._roi is not None and self._frames_since_full < self.redetect_every:
+            if self.roi_hands is None:
+                self.roi_hands = self.create_hands()
+            start = time.perf_counter()
+            found = self._detect(self.roi_hands, frame_bgr, self._roi)
+            self.roi_latency.record(time.perf_counter() - start)
+            if found:
+                self._frames_since_full += 1
+                self._update_roi(found, width, height)
+                self.latency.record(time.perf_counter() - frame_start)
+                return found
+            self.roi_lost += 1
+
+        start = time.perf_counter()
+        found = self._detect(self.full_hands, frame_bgr, (0, 0, width, height))
+        self.full_latency.record(time.perf_counter() - start)
+        self._frames_since_full = 0
+        self._update_roi(found, width, height)
+        self.latency.record(time.perf_counter() - frame_start)
+        return found
+
+    def _detect(self, hands, frame_bgr, roi):
+        height, width = frame_bgr.shape[:2]
+        x0, y0, x1, y1 = roi
+        crop = frame_bgr[y0:y1, x0:x1]
+        crop_w, crop_h = x1 - x0, y1 - y0
+
+        # Reducir antes de convertir a RGB: ambas operaciones sobre menos píxeles,
+        # escribiendo en buffers reutilizados en lugar de reservar uno por frame
+        if self.detection_width and crop_w > self.detection_width:
+            scale = self.detection_width / crop_w
+            size = (self.detection_width, max(1, int(round(crop_h * scale))))
+            crop = cv2.resize(crop, size, dst=self._buffer("reducido", (size[1], size[0], 3)),
+                              interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", crop.shape))
+        results = hands.process(rgb)
+
+        found = []
+        if results.multi_hand_landmarks:
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                points = landmarks_to_array(hand_landmarks)
+                # Normalizadas al recorte → normalizadas al frame completo (z escala con el ancho)
+                points[:, 0] = (points[:, 0] * crop_w + x0) / width
+                points[:, 1] = (points[:, 1] * crop_h + y0) / height
+                points[:, 2] *= crop_w / width
+                found.append((handedness.classification[0].label, points))
+        return found
+
+    def _update_roi(self, found, width, height):
+        if not self.track_roi or not found:
+            self._roi = None
+            return
+        xy = np.concatenate([points[:, :2] for _, points in found]) * (width, height)
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        center = (lo + hi) / 2
+        side = max(float((hi - lo).max()) * (1 + 2 * self.roi_margin), self.roi_min_size)
+        # Lado en múltiplos de 32 px: pocas formas distintas de recorte (y de buffers)
+        side = min(int(np.ceil(side / 32.0)) * 32, width, height)
+        # Recorte cuadrado dentro del frame (se desplaza en vez de encogerse en los bordes)
+        x0 = int(np.clip(center[0] - side / 2, 0, width - side))
+        y0 = int(np.clip(center[1] - side / 2, 0, height - side))
+        self._roi = (x0, y0, x0 + int(side), y0 + int(side))
+
+    def format_stats(self):
+        """Comparativa de coste: detección en el frame completo frente a la ROI.
+
+        La media por frame incluye los frames en que la ROI pierde la mano y se
+        repite en el frame completo (dos pasadas).
+        """
+        full, roi, frame = self.full_latency.summary(), self.roi_latency.summary(), self.latency.summary()
+        total = frame["llamadas"]
+        if total == 0:
+            return "detección: sin frames"
+        line = (f"detección: {frame['media_ms']:.1f} ms/frame, "
+                f"{(roi['llamadas'] - self.roi_lost) / total:.0%} de los frames solo en ROI "
+                f"({self.roi_lost} pérdidas con doble pasada)")
+        if full["media_ms"] is not None:
+            line += f" | completo {full['media_ms']:.1f} ms"
+        if roi["media_ms"] is not None:
+            line += f" | ROI {roi['media_ms']:.1f} ms"
+            if full["media_ms"]:
+                line += f" ({1 - roi['media_ms'] / full['media_ms']:.0%} menos)"
+        return line
@@ -0,0 +1,275 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from landmarks import FEATURE_SIZE
+from metrics import LatencyStats
+
+# --- Backends de inferencia para el clasificador de gestos ---
+# Todos exponen `predict(batch)` con la misma semántica que `model.predict`,
+# de modo que program.py puede cambiar de backend solo por configuración.
+# TensorFlow se importa dentro de cada backend para no pagar su carga
+# cuando no hace falta.
+
+INPUT_SHAPE = (1, 128, 128, 3)
+BATCH_SIZES = (1, 2, 4)   # Firmas trazadas de tf_function; un batch se rellena hasta la siguiente
+DEFAULT_MODEL_PATH = 'models/EfficientNetB5_gesture_classifier.keras'
+DEFAULT_LANDMARK_MODEL_PATH = 'models/landmark_mlp.npz'
+
+
+class InferenceBackend:
+    """Interfaz común: mide la latencia de cada llamada a `predict`."""
+
+    name = "base"
+    input_kind = "imagen"   # "imagen" (recorte 128×128) o "landmarks" (vector de 63 floats)
+
+    def __init__(self):
+        self.latency = LatencyStats(self.name)
+
+    def predict(self, batch, verbose=0):
+        start = time.perf_counter()
+        preds = self._predict(batch)
+        self.latency.record(time.perf_counter() - start)
+        return preds
+
+    def _predict(self, batch):
+        raise NotImplementedError
+
+
+class KerasBackend(InferenceBackend):
+    """`model.predict` de Keras (referencia; la opción más lenta para batch de 1)."""
+
+    name = "keras"
+
+    def __init__(self, model_path):
+        super().__init__()
+        import tensorflow as tf
+        self.model = tf.keras.models.load_model(model_path)
+
+    def _predict(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+def trace_model(model, input_shape=INPUT_SHAPE, jit_compile=False):
+    """Envuelve el modelo en un tf.function con firma de entrada fija."""
+    import tensorflow as tf
+    return tf.function(
+        lambda x: model(x, training=False),
+        input_signature=[tf.TensorSpec(input_shape, tf.float32)],
+        jit_compile=jit_compile,
+    )
+
+
+class TFFunctionBackend(InferenceBackend):
+    """Llamada directa al grafo trazado, sin el data adapter ni los callbacks de `predict`.
+
+    Hay una firma fija por tamaño de `batch_sizes` (trazada la primera vez que
+    se usa); un batch de N se rellena con ceros hasta la firma siguiente para
+    no retrazar con cada número de manos.
+    """
+
+    name = "tf_function"
+
+    def __init__(self, model_path, jit_compile=False, batch_sizes=BATCH_SIZES):
+        super().__init__()
+        import tensorflow as tf
+        self._tf = tf
+        self.model = tf.keras.models.load_model(model_path)
+        self.jit_compile = jit_compile
+        self.batch_sizes = tuple(sorted(batch_sizes))
+        self._calls = {}
+
+    def _call_for(self, size):
+        if size not in self._calls:
+            self._calls[size] = trace_model(self.model, (size,) + INPUT_SHAPE[1:], self.jit_compile)
+        return self._calls[size]
+
+    def _predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        n = batch.shape[0]
+        max_size = self.batch_sizes[-1]
+        if n > max_size:
+            return np.concatenate([self._predict(batch[i:i + max_size]) for i in range(0, n, max_size)])
+        size = next(s for s in self.batch_sizes if s >= n)
+        if size > n:
+            batch = np.concatenate([batch, np.zeros((size - n,) + batch.shape[1:], dtype=np.float32)])
+        return self._call_for(size)(self._tf.convert_to_tensor(batch)).numpy()[:n]
+
+
+def export_tflite(model_path, tflite_path):
+    """Convierte el modelo .keras a TFLite (float32) con la firma 1×128×128×3."""
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path)
+    concrete = trace_model(model).get_concrete_function()
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+    tflite_model = converter.convert()
+    with open(tflite_path, "wb") as f:
+        f.write(tflite_model)
+    print(f"📦 Modelo exportado a TFLite: {tflite_path} ({len(tflite_model) / 1e6:.1f} MB)")
+    return tflite_path
+
+
+class TFLiteBackend(InferenceBackend):
+    """Intérprete TFLite en CPU. XNNPACK se aplica por defecto a los modelos float.
+
+    Si se pasa `tflite_path` se usa ese artefacto tal cual (p. ej. el int8 de
+    optimize_model.py); si no, se exporta el .keras a float32 junto a él.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path=None, tflite_path=None, num_threads=None):
+        super().__init__()
+        import tensorflow as tf
+
+        if tflite_path is None:
+            tflite_path = os.path.splitext(model_path)[0] + ".tflite"
+            # Re-exportar solo si no existe o el .keras es más nuevo
+            if not os.path.exists(tflite_path) or (
+                    os.path.exists(model_path) and os.path.getmtime(model_path) > os.path.getmtime(tflite_path)):
+                export_tflite(model_path, tflite_path)
+
+        self._tf = tf
+        self.tflite_path = tflite_path
+        self.num_threads = num_threads
+        # Un intérprete ya reservado por tamaño de batch: pasar de 1 a 2 manos y
+        # volver es frecuente, y resize_tensor_input + allocate_tensors cuesta
+        self._interpreters = {}
+        interpreter, self._input, self._output = self._interpreter_for(None)
+        self.interpreter = interpreter  # El de la firma original del artefacto
+        self.quantized = np.issubdtype(self._input["dtype"], np.integer)
+
+    def _interpreter_for(self, n):
+        """Intérprete para un batch de N (None = el del artefacto), creado la primera vez."""
+        entry = self._interpreters.get(n)
+        if entry is None:
+            interpreter = self._tf.lite.Interpreter(model_path=self.tflite_path, num_threads=self.num_threads)
+            if n is not None:
+                details = interpreter.get_input_details()[0]
+                shape = list(details["shape"])
+                shape[0] = n
+                interpreter.resize_tensor_input(details["index"], shape)
+            interpreter.allocate_tensors()
+            entry = (interpreter, interpreter.get_input_details()[0], interpreter.get_output_details()[0])
+            self._interpreters[n] = entry
+            if n is None:
+                self._interpreters[int(entry[1]["shape"][0])] = entry
+        return entry
+
+    def _predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        interpreter, input_details, output_details = self._interpreter_for(batch.shape[0])
+        if self.quantized:
+            # Modelo full-integer: cuantizar la entrada con la escala del tensor
+            scale, zero_point = input_details["quantization"]
+            info = np.iinfo(input_details["dtype"])
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+        interpreter.set_tensor(input_details["index"], batch.astype(input_details["dtype"]))
+        interpreter.invoke()
+        preds = interpreter.get_tensor(output_details["index"])
+        if np.issubdtype(preds.dtype, np.integer):
+            scale, zero_point = output_details["quantization"]
+            preds = (preds.astype(np.float32) - zero_point) * scale
+        return preds
+
+
+class LandmarkMLPBackend(InferenceBackend):
+    """MLP sobre los 63 floats normalizados de los landmarks, ejecutado en NumPy.
+
+    Los pesos vienen del .npz que exporta train_landmark_model.py, así que este
+    camino no necesita TensorFlow en tiempo de ejecución.
+    """
+
+    name = "landmarks"
+    input_kind = "landmarks"
+
+    def __init__(self, model_path):
+        super().__init__()
+        data = np.load(model_path)
+        num_layers = sum(1 for key in data.files if key.startswith("W"))
+        self.layers = [(data[f"W{i}"], data[f"b{i}"]) for i in range(num_layers)]
+        self.class_names = [str(c) for c in data["class_names"]] if "class_names" in data.files else None
+
+    def _predict(self, batch):
+        x = np.asarray(batch, dtype=np.float32)
+        for i, (weights, bias) in enumerate(self.layers):
+            x = x @ weights + bias
+            if i < len(self.layers) - 1:
+                np.maximum(x, 0, out=x)  # ReLU
+        # Softmax numéricamente estable
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+        return x
+
+
+BACKENDS = ("keras", "tf_function", "tflite", "landmarks")
+
+
+def create_backend(name, model_path=DEFAULT_MODEL_PATH, num_threads=None, tflite_path=None):
+    """Crea el backend indicado por nombre (ver BACKENDS).
+
+    Para "landmarks", `model_path` es el .npz de pesos del MLP. Para "tflite",
+    `tflite_path` permite cargar un artefacto ya optimizado (int8, podado).
+    """
+    if name == "keras":
+        return KerasBackend(model_path)
+    if name == "tf_function":
+        return TFFunctionBackend(model_path)
+    if name == "tflite":
+        return TFLiteBackend(model_path, tflite_path=tflite_path, num_threads=num_threads)
+    if name == "landmarks":
+        return LandmarkMLPBackend(model_path)
+    raise ValueError(f"Backend desconocido: '{name}'. Opciones: {', '.join(BACKENDS)}")
+
+
+def warm_up(backend, iterations=1, batch_sizes=(1,)):
+    """Inferencia con ceros para que la primera predicción real no pague el trazado ni las cachés."""
+    shape = (FEATURE_SIZE,) if backend.input_kind == "landmarks" else INPUT_SHAPE[1:]
+    # Cada tamaño traza su firma (tf_function) o reserva su intérprete (TFLite)
+    for size in sorted(batch_sizes, reverse=True):
+        batch = np.zeros((size,) + shape, dtype="float32")
+        for _ in range(iterations):
+            backend.predict(batch)
+    backend.latency.reset()
+
+
+def benchmark_backend(backend, iterations=200, warmup=10, batch_size=1):
+    """Mide p50/p99 por llamada con una entrada aleatoria del tipo que espera el backend."""
+    if backend.input_kind == "landmarks":
+        batch = np.random.uniform(-1, 1, (batch_size, FEATURE_SIZE)).astype("float32")
+    else:
+        batch = np.random.uniform(0, 255, (batch_size,) + INPUT_SHAPE[1:]).astype("float32")
+    for _ in range(warmup):
+        backend.predict(batch)
+    backend.latency.reset()
+    for _ in range(iterations):
+        backend.predict(batch)
+    return backend.latency.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la latencia por llamada de cada backend de inferencia")
+    parser.add_argument("--modelo", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--modelo-landmarks", default=DEFAULT_LANDMARK_MODEL_PATH)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--iteraciones", type=int, default=200)
+    parser.add_argument("--hilos", type=int, default=None, help="Hilos del intérprete TFLite")
+    parser.add_argument("--batch", type=int, default=1, help="Manos por llamada (p. ej. 2 para dos manos)")
+    args = parser.parse_args()
+
+    print(f"{'Backend':<14}{'p50 (ms)':>10}{'p99 (ms)':>10}{'media (ms)':>12}")
+    for name in args.backends:
+        model_path = args.modelo_landmarks if name == "landmarks" else args.modelo
+        if not os.path.exists(model_path):
+            print(f"{name:<14}(omitido: no existe {model_path})")
+            continue
+        backend = create_backend(name, model_path, num_threads=args.hilos)
+        s = benchmark_backend(backend, args.iteraciones, batch_size=args.batch)
+        print(f"{name:<14}{s['p50_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['media_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
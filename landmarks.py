@@ -0,0 +1,47 @@
+import numpy as np
+
+# --- Utilidades de landmarks de MediaPipe ---
+# El vector de características del clasificador de landmarks es el mismo en
+# entrenamiento (train_landmark_model.py) y en tiempo real (program.py).
+
+NUM_LANDMARKS = 21
+FEATURE_SIZE = NUM_LANDMARKS * 3
+
+
+def landmarks_to_array(hand_landmarks):
+    """Convierte los landmarks de MediaPipe en un array (21, 3) de x, y, z normalizados."""
+    return np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+def normalize_landmarks(points, aspect=1.0, mirror=False):
+    """Vector de 63 floats invariante a posición y escala.
+
+    - Traslación: todos los puntos relativos a la muñeca (landmark 0).
+    - Escala: dividido por la distancia máxima a la muñeca en el plano x, y.
+    - `aspect` (ancho / alto del frame) corrige que x e y vienen normalizados
+      por dimensiones distintas.
+    - `mirror` refleja el eje x para llevar una mano izquierda a la forma de
+      una derecha (se aplica cuando MediaPipe etiqueta la mano como 'Left').
+    """
+    pts = np.array(points, dtype=np.float32).reshape(NUM_LANDMARKS, 3)
+    pts -= pts[0]
+    pts[:, 0] *= aspect
+    if mirror:
+        pts[:, 0] = -pts[:, 0]
+    scale = float(np.max(np.linalg.norm(pts[:, :2], axis=1)))
+    if scale > 1e-6:
+        pts /= scale
+    return pts.reshape(-1)
+
+
+def landmark_displacement(points_a, points_b, aspect=1.0):
+    """Desplazamiento medio (x, y) entre dos juegos de landmarks, relativo al tamaño de la mano.
+
+    Devuelve una fracción del lado mayor del bounding box de `points_b`, así el
+    mismo umbral sirve con la mano cerca o lejos de la cámara.
+    """
+    scale = np.array([aspect, 1.0], dtype=np.float32)
+    a = np.asarray(points_a, dtype=np.float32)[:, :2] * scale
+    b = np.asarray(points_b, dtype=np.float32)[:, :2] * scale
+    size = max(float(np.ptp(b, axis=0).max()), 1e-6)
+    return float(np.linalg.norm(a - b, axis=1).mean() / size)
@@ -0,0 +1,203 @@
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# Límites (ms) de los histogramas de latencia; el último cubo recoge todo lo que supera 1 s
+HISTOGRAM_EDGES_MS = (0, 1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 250, 500, 1000)
+LATENCY_WINDOW = 2000  # Muestras que guarda LatencyStats por defecto (~1 min a 30 FPS)
+
+
+class LatencyStats:
+    """Latencia por llamada con percentiles sobre las últimas `max_samples` muestras (None = todas)."""
+
+    def __init__(self, name, max_samples=LATENCY_WINDOW):
+        self.name = name
+        self.calls = 0
+        self._samples = collections.deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.calls += 1
+            self._samples.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self._samples.clear()
+
+    def summary(self):
+        """Devuelve llamadas, media, p50 y p99 en milisegundos."""
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64) * 1000.0
+            calls = self.calls
+        if samples.size == 0:
+            return {"llamadas": calls, "media_ms": None, "p50_ms": None, "p99_ms": None}
+        return {
+            "llamadas": calls,
+            "media_ms": round(float(samples.mean()), 3),
+            "p50_ms": round(float(np.percentile(samples, 50)), 3),
+            "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        }
+
+    def histogram(self, edges_ms=HISTOGRAM_EDGES_MS):
+        """Conteos por cubo [edges[i], edges[i+1]) en ms, más un cubo final para >= edges[-1]."""
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64) * 1000.0
+        bins = np.append(np.asarray(edges_ms, dtype=np.float64), np.inf)
+        counts, _ = np.histogram(samples, bins=bins)
+        return {"limites_ms": list(edges_ms), "conteos": counts.tolist()}
+
+    def format(self):
+        s = self.summary()
+        if s["p50_ms"] is None:
+            return f"{self.name}: sin muestras"
+        return f"{self.name}: p50 {s['p50_ms']:.2f} ms | p99 {s['p99_ms']:.2f} ms ({s['llamadas']} llamadas)"
+
+
+class StartupTimeline:
+    """Marcas de tiempo del arranque (ms desde `t0`), seguras entre hilos."""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.events = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Registra el evento la primera vez que ocurre y lo imprime."""
+        elapsed_ms = (time.perf_counter() - self.t0) * 1000.0
+        with self._lock:
+            if name in self.events:
+                return
+            self.events[name] = round(elapsed_ms, 1)
+        print(f"⏱️  [{elapsed_ms:8.0f} ms] {name}")
+
+    def has(self, name):
+        with self._lock:
+            return name in self.events
+
+    def save(self, file_path):
+        """Añade el timeline como una línea JSON para seguir el arranque en frío entre versiones."""
+        with self._lock:
+            record = {"fecha": time.strftime("%Y-%m-%d %H:%M:%S"), "eventos_ms": dict(self.events)}
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class AllocationMeter:
+    """Memoria reservada por frame medida con tracemalloc (todos los hilos).
+
+    Entre `begin()` y `end()` registra el pico de memoria por encima de la del
+    inicio (bytes que se reservaron y liberaron durante el frame) y lo que quedó
+    retenido. tracemalloc ralentiza el proceso: solo para perfilar.
+    """
+
+    def __init__(self, max_samples=2000):
+        self._transient = collections.deque(maxlen=max_samples)
+        self._retained = collections.deque(maxlen=max_samples)
+        self._base = 0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return self
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def begin(self):
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+
+    def end(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self._transient.append(peak - self._base)
+        self._retained.append(current - self._base)
+
+    def summary(self):
+        """KB por frame: media y p99 de lo reservado, y media de lo retenido."""
+        if not self._transient:
+            return {"frames": 0, "media_kb": None, "p99_kb": None, "retenido_kb": None}
+        transient = np.array(self._transient, dtype=np.float64) / 1024.0
+        retained = np.array(self._retained, dtype=np.float64) / 1024.0
+        return {
+            "frames": int(transient.size),
+            "media_kb": round(float(transient.mean()), 1),
+            "p99_kb": round(float(np.percentile(transient, 99)), 1),
+            "retenido_kb": round(float(retained.mean()), 2),
+        }
+
+    def format(self):
+        s = self.summary()
+        if s["frames"] == 0:
+            return "memoria por frame: sin muestras"
+        return (f"memoria por frame: {s['media_kb']:.1f} KB reservados (p99 {s['p99_kb']:.1f} KB), "
+                f"{s['retenido_kb']:.2f} KB retenidos ({s['frames']} frames)")
+
+
+def current_rss_mb():
+    """RSS actual del proceso en MB: psutil si está instalado, si no /proc (Linux) o el máximo de resource."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows sin psutil
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return max_rss / 1e6 if sys.platform == "darwin" else max_rss / 1e3
+
+
+class ProcessSampler(threading.Thread):
+    """Muestrea CPU% (todos los hilos del proceso; 100% = un núcleo) y RSS cada `interval` segundos."""
+
+    def __init__(self, interval=0.5):
+        super().__init__(name="muestreo-proceso", daemon=True)
+        self.interval = interval
+        self.cpu = []
+        self.rss = []
+        self._stopped = threading.Event()
+
+    def run(self):
+        self._last = (time.perf_counter(), time.process_time())
+        while not self._stopped.wait(self.interval):
+            self._sample()
+        # Muestra final: sin ella, lo que dura menos de `interval` no tendría ninguna
+        self._sample()
+
+    def _sample(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        last_wall, last_cpu = self._last
+        if wall > last_wall:
+            self.cpu.append(100.0 * (cpu - last_cpu) / (wall - last_wall))
+        self._last = (wall, cpu)
+        rss = current_rss_mb()
+        if rss is not None:
+            self.rss.append(rss)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def summary(self):
+        def stats(values, digits):
+            if not values:
+                return {"media": None, "max": None}
+            return {"media": round(float(np.mean(values)), digits), "max": round(float(np.max(values)), digits)}
+        return {"cpu_pct": stats(self.cpu, 1), "rss_mb": stats(self.rss, 1)}
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import zipfile
+
+import numpy as np
+import tensorflow as tf
+
+import create_models
+from inference import TFLiteBackend, trace_model
+
+# ==========================
+# Optimización post-entrenamiento del clasificador
+# ==========================
+# Entre create_models.py (que guarda el .keras) y program.py (que lo carga):
+#   1. Cuantización full-integer (int8) con un dataset representativo sacado
+#      del split de entrenamiento.
+#   2. Poda por magnitud de los kernels (con fine-tune opcional que mantiene
+#      las máscaras) y su versión int8.
+#   3. Validación de cada variante contra el modelo float en el split de test.
+# El .tflite int8 se usa en program.py con backend "tflite" y "modelo_tflite".
+
+MODEL_PATH = 'models/EfficientNetB5_gesture_classifier.keras'
+
+
+# ==========================
+# 1. Cuantización int8
+# ==========================
+def representative_dataset(train_ds, num_samples=200):
+    """Generador de muestras reales (1×128×128×3 float32) para calibrar los rangos."""
+    def generator():
+        produced = 0
+        for x_batch, _ in train_ds:
+            for image in x_batch.numpy():
+                yield [image[np.newaxis].astype(np.float32)]
+                produced += 1
+                if produced >= num_samples:
+                    return
+    return generator
+
+
+def export_int8(model, file_path, rep_dataset):
+    """Convierte a TFLite con pesos y activaciones int8; entrada y salida uint8."""
+    concrete = trace_model(model).get_concrete_function()
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = rep_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # Los píxeles ya son 0-255, así que la entrada uint8 queda casi sin pérdida
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    tflite_model = converter.convert()
+    with open(file_path, "wb") as f:
+        f.write(tflite_model)
+    print(f"📦 Modelo int8 exportado: {file_path} ({len(tflite_model) / 1e6:.1f} MB)")
+    return file_path
+
+
+# ==========================
+# 2. Poda por magnitud
+# ==========================
+def prunable_layers(model):
+    """Capas con kernel (Conv2D, DepthwiseConv2D, Dense), recorriendo modelos anidados."""
+    found = []
+    for layer in model.layers:
+        if hasattr(layer, "layers"):
+            found.extend(prunable_layers(layer))
+        elif isinstance(layer, (tf.keras.layers.Conv2D, tf.keras.layers.DepthwiseConv2D, tf.keras.layers.Dense)):
+            found.append(layer)
+    return found
+
+
+def magnitude_prune(model, sparsity=0.5):
+    """Pone a cero el `sparsity` de los pesos más pequeños de cada kernel. Devuelve las máscaras."""
+    masks = []
+    for layer in prunable_layers(model):
+        kernel_var = layer.kernel  # En Keras 3 también DepthwiseConv2D guarda su peso en `kernel`
+        kernel = kernel_var.numpy()
+        threshold = np.percentile(np.abs(kernel), sparsity * 100)
+        mask = (np.abs(kernel) >= threshold).astype(kernel.dtype)
+        kernel_var.assign(kernel * mask)
+        masks.append((kernel_var, mask))
+    print(f"✂️  Poda por magnitud: {len(masks)} capas al {sparsity:.0%} de dispersión")
+    return masks
+
+
+class KeepPruningMasks(tf.keras.callbacks.Callback):
+    """Durante el fine-tune vuelve a aplicar las máscaras para que los pesos podados sigan en cero.
+
+    Solo a los kernels entrenables: los congelados no los toca el optimizador
+    y siguen en cero sin reasignarlos en cada batch.
+    """
+
+    def __init__(self, masks):
+        super().__init__()
+        self.masks = masks
+
+    def on_train_begin(self, logs=None):
+        # Se filtra aquí y no en __init__: compile/fit pueden cambiar qué capas son entrenables
+        self._active = [(kernel_var, tf.constant(mask)) for kernel_var, mask in self.masks if kernel_var.trainable]
+
+    def on_train_batch_end(self, batch, logs=None):
+        for kernel_var, mask in self._active:
+            kernel_var.assign(kernel_var * mask)
+
+
+def zipped_size_mb(file_path):
+    """Tamaño comprimido: es donde se nota la poda (los ceros comprimen)."""
+    zip_path = file_path + ".zip"
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.write(file_path, arcname=os.path.basename(file_path))
+    size = os.path.getsize(zip_path) / 1e6
+    os.remove(zip_path)
+    return round(size, 2)
+
+
+# ==========================
+# 3. Validación
+# ==========================
+def tflite_accuracy(tflite_path, test_ds, max_samples=None):
+    """Accuracy del .tflite muestra a muestra (la firma es de batch 1)."""
+    backend = TFLiteBackend(tflite_path=tflite_path)
+    correct, total = 0, 0
+    for x_batch, y_batch in test_ds:
+        for image, label in zip(x_batch.numpy(), y_batch.numpy()):
+            preds = backend.predict(image[np.newaxis])
+            correct += int(np.argmax(preds) == label)
+            total += 1
+            if max_samples and total >= max_samples:
+                return correct / total, backend.latency.summary()
+    return correct / max(total, 1), backend.latency.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cuantización int8 y poda del clasificador de gestos")
+    parser.add_argument("--modelo", default=MODEL_PATH)
+    parser.add_argument("--dataset", default=create_models.path)
+    parser.add_argument("--cache", default=None, help="Directorio creado con dataset_cache.py")
+    parser.add_argument("--muestras-representativas", type=int, default=200)
+    parser.add_argument("--dispersion", type=float, default=0.5, help="Fracción de pesos podados por capa")
+    parser.add_argument("--epocas-poda", type=int, default=1, help="Fine-tune tras podar (0 = sin fine-tune)")
+    parser.add_argument("--max-test", type=int, default=None, help="Limitar muestras al validar los .tflite")
+    parser.add_argument("--reporte", default="optimize_report.json")
+    args = parser.parse_args()
+
+    train_ds, _, test_ds, class_names = create_models.load_datasets(args.dataset, args.cache)
+    test_ds = create_models.build_input_pipeline(test_ds, "test")
+    base_name = os.path.splitext(args.modelo)[0]
+    rows = []
+
+    # --- Referencia float ---
+    model = tf.keras.models.load_model(args.modelo)
+    float_results = create_models.evaluate_single_pass(model, test_ds)
+    rows.append({"variante": "float32 (.keras)", "archivo": args.modelo,
+                 "accuracy": float_results["accuracy"],
+                 "tamano_mb": round(os.path.getsize(args.modelo) / 1e6, 2),
+                 "tamano_zip_mb": zipped_size_mb(args.modelo)})
+
+    # --- int8 ---
+    rep = representative_dataset(train_ds, args.muestras_representativas)
+    int8_path = export_int8(model, f"{base_name}_int8.tflite", rep)
+    acc, latency = tflite_accuracy(int8_path, test_ds, args.max_test)
+    rows.append({"variante": "int8 (.tflite)", "archivo": int8_path, "accuracy": acc,
+                 "tamano_mb": round(os.path.getsize(int8_path) / 1e6, 2),
+                 "tamano_zip_mb": zipped_size_mb(int8_path), "latencia": latency})
+
+    # --- Poda por magnitud (+ fine-tune) ---
+    masks = magnitude_prune(model, args.dispersion)
+    if args.epocas_poda > 0:
+        model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=1e-5),
+                      loss="sparse_categorical_crossentropy", metrics=["accuracy"])
+        model.fit(create_models.build_input_pipeline(train_ds, "train", training=True),
+                  epochs=args.epocas_poda, callbacks=[KeepPruningMasks(masks)], verbose=1)
+    pruned_path = f"{base_name}_pruned.keras"
+    model.save(pruned_path)
+    pruned_results = create_models.evaluate_single_pass(model, test_ds)
+    rows.append({"variante": f"podado {args.dispersion:.0%} (.keras)", "archivo": pruned_path,
+                 "accuracy": pruned_results["accuracy"],
+                 "tamano_mb": round(os.path.getsize(pruned_path) / 1e6, 2),
+                 "tamano_zip_mb": zipped_size_mb(pruned_path)})
+
+    pruned_int8_path = export_int8(model, f"{base_name}_pruned_int8.tflite", rep)
+    acc, latency = tflite_accuracy(pruned_int8_path, test_ds, args.max_test)
+    rows.append({"variante": f"podado {args.dispersion:.0%} + int8 (.tflite)", "archivo": pruned_int8_path,
+                 "accuracy": acc, "tamano_mb": round(os.path.getsize(pruned_int8_path) / 1e6, 2),
+                 "tamano_zip_mb": zipped_size_mb(pruned_int8_path), "latencia": latency})
+
+    # --- Reporte ---
+    reference = rows[0]["accuracy"]
+    print(f"\n{'Variante':<32}{'Accuracy':>10}{'Δ vs float':>12}{'MB':>8}{'MB zip':>8}")
+    for row in rows:
+        row["delta_accuracy"] = row["accuracy"] - reference
+        print(f"{row['variante']:<32}{row['accuracy']:>10.4f}{row['delta_accuracy']:>+12.4f}"
+              f"{row['tamano_mb']:>8.1f}{row['tamano_zip_mb']:>8.1f}")
+    with open(args.reporte, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=4)
+    print(f"\n📄 Reporte guardado en {args.reporte}")
+    print(f"💡 Para usarlo en program.py: \"backend\": \"tflite\", \"modelo_tflite\": \"{int8_path}\"")
+
+
+if __name__ == "__main__":
+    main()
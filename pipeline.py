@@ -0,0 +1,291 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+from metrics import LATENCY_WINDOW, LatencyStats
+
+# --- Pipeline por etapas: captura → landmarks → clasificador → render ---
+# Cada etapa corre en su propio hilo y se comunica con la siguiente mediante
+# colas acotadas que descartan el elemento más antiguo cuando se llenan, de
+# modo que una etapa lenta (el clasificador) nunca frena a las rápidas
+# (captura, cursor y render).
+#
+# En modo sin pérdidas (reproducción de archivos a máxima velocidad) las colas
+# bloquean al productor en lugar de descartar: se procesan todos los frames.
+# Cuando la fuente se agota, cada etapa vacía su cola de entrada y cierra las
+# de salida, así el fin del stream se propaga en cadena.
+
+
+class DropOldestQueue:
+    """Cola acotada que descarta el elemento más antiguo cuando está llena.
+
+    Con `lossless=True`, `put()` espera a que haya hueco en lugar de descartar.
+    """
+
+    def __init__(self, name, maxsize=2, lossless=False):
+        self.name = name
+        self.maxsize = maxsize
+        self.lossless = lossless
+        self.dropped = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        with self._cond:
+            if self.lossless:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    self.dropped += 1
+                    return
+            elif len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Devuelve el siguiente elemento o None si vence el timeout o la cola se cerró."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()  # Despertar a un productor bloqueado (modo sin pérdidas)
+            return item
+
+    def get_nowait(self):
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def exhausted(self):
+        """Cerrada y vacía: no llegará nada más."""
+        with self._cond:
+            return self._closed and not self._items
+
+
+class FrameRing:
+    """Anillo de buffers de frame preasignados que se reciclan en orden.
+
+    La captura escribe cada frame en el siguiente buffer en lugar de reservar
+    uno nuevo. Como un buffer se sobrescribe al dar la vuelta, quien lo lea
+    tarde copia o recorta lo que necesita y después comprueba con `valid(slot)`
+    que no se haya reciclado mientras tanto (si no, descarta el resultado).
+    """
+
+    def __init__(self, size, shape, dtype=np.uint8):
+        self.buffers = [np.empty(shape, dtype=dtype) for _ in range(size)]
+        self.shape = tuple(shape)
+        self.recycled = 0   # Lecturas descartadas porque el buffer ya se había reciclado
+        self._generation = [0] * size
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Reserva el siguiente buffer. Devuelve el slot (índice, generación)."""
+        with self._lock:
+            index = self._next
+            self._next = (index + 1) % len(self.buffers)
+            self._generation[index] += 1
+            return index, self._generation[index]
+
+    def valid(self, slot):
+        index, generation = slot
+        if self._generation[index] == generation:
+            return True
+        self.recycled += 1
+        return False
+
+
+class StageStats:
+    """Contadores de una etapa: FPS en ventana deslizante, duración media y percentiles.
+
+    Con `track_latency=False` (contadores de eventos sin duración) no se guardan muestras.
+    """
+
+    def __init__(self, name, window=1.0, track_latency=True, latency_samples=LATENCY_WINDOW):
+        self.name = name
+        self.window = window
+        self.latency = LatencyStats(name, latency_samples) if track_latency else None
+        self.count = 0
+        self.fps = 0.0
+        self.last_duration = 0.0
+        self.mean_duration = 0.0
+        self._window_start = time.perf_counter()
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def tick(self, duration=0.0):
+        now = time.perf_counter()
+        if self.latency is not None:
+            self.latency.record(duration)
+        with self._lock:
+            self.count += 1
+            self._window_count += 1
+            self.last_duration = duration
+            # Media exponencial para no guardar historial
+            self.mean_duration = duration if self.count == 1 else 0.9 * self.mean_duration + 0.1 * duration
+            elapsed = now - self._window_start
+            if elapsed >= self.window:
+                self.fps = self._window_count / elapsed
+                self._window_start = now
+                self._window_count = 0
+
+    def snapshot(self):
+        now = time.perf_counter()
+        with self._lock:
+            fps = self.fps
+            elapsed = now - self._window_start
+            if elapsed >= self.window:
+                # Ningún tick cerró la ventana (etapa parada, o nada que contar): se usa lo
+                # contado desde su inicio, que baja a 0 en vez de quedarse en el último valor
+                fps = self._window_count / elapsed
+            return {
+                "fps": round(fps, 1),
+                "procesados": self.count,
+                "ms_medio": round(self.mean_duration * 1000, 2),
+            }
+
+
+class PipelineStage(threading.Thread):
+    """Hilo que aplica `func` a cada elemento de la cola de entrada.
+
+    Si `input_queue` es None la etapa es una fuente: `func()` se llama sin
+    argumentos y devolver None indica fin del stream. `feeds` son colas a las
+    que `func` escribe por su cuenta; se cierran junto a las de salida.
+    """
+
+    def __init__(self, name, func, input_queue, output_queues, stop_event, feeds=(),
+                 latency_samples=LATENCY_WINDOW):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queues = output_queues
+        self.feeds = list(feeds)
+        self.stop_event = stop_event
+        self.stats = StageStats(name, latency_samples=latency_samples)
+        self.finished = False
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.input_queue is None:
+                item = None
+            else:
+                item = self.input_queue.get(timeout=0.1)
+                if item is None:
+                    if self.input_queue.exhausted:
+                        self._finish()  # La etapa anterior terminó y ya no queda nada
+                        return
+                    continue
+
+            start = time.perf_counter()
+            try:
+                result = self.func() if self.input_queue is None else self.func(item)
+            except Exception as e:
+                print(f"❌ Error en etapa '{self.name}': {e}")
+                continue
+            self.stats.tick(time.perf_counter() - start)
+
+            if result is None:
+                if self.input_queue is None:
+                    # La fuente se agotó (cámara desconectada, fin de video): las
+                    # etapas siguientes vacían sus colas y terminan en cadena
+                    self._finish()
+                    return
+                continue
+            for queue in self.output_queues:
+                queue.put(result)
+
+    def _finish(self):
+        self.finished = True
+        for queue in self.output_queues + self.feeds:
+            queue.close()
+
+
+class Pipeline:
+    """Agrupa colas y etapas, y expone sus contadores.
+
+    `latency_samples` acota las muestras de latencia de cada etapa (None = todas,
+    para que los percentiles de una reproducción cubran el stream entero).
+    """
+
+    def __init__(self, lossless=False, latency_samples=LATENCY_WINDOW):
+        self.lossless = lossless
+        self.latency_samples = latency_samples
+        self.stop_event = threading.Event()
+        self.queues = {}
+        self.stages = []
+        self.extra_stats = {}
+
+    def add_queue(self, name, maxsize=2):
+        queue = DropOldestQueue(name, maxsize, self.lossless)
+        self.queues[name] = queue
+        return queue
+
+    def add_stage(self, name, func, input_queue, output_queues, feeds=()):
+        stage = PipelineStage(name, func, input_queue, output_queues, self.stop_event, feeds,
+                              self.latency_samples)
+        self.stages.append(stage)
+        return stage
+
+    def add_stats(self, name, track_latency=True):
+        """Contadores para etapas que corren fuera del pipeline (p. ej. el render en el hilo principal)."""
+        stats = StageStats(name, track_latency=track_latency, latency_samples=self.latency_samples)
+        self.extra_stats[name] = stats
+        return stats
+
+    @property
+    def finished(self):
+        return any(stage.finished for stage in self.stages)
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        for queue in self.queues.values():
+            queue.close()
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def snapshot(self):
+        """Devuelve FPS por etapa y profundidad/descartes por cola."""
+        stages = {stage.name: stage.stats.snapshot() for stage in self.stages}
+        stages.update({name: stats.snapshot() for name, stats in self.extra_stats.items()})
+        queues = {
+            name: {"profundidad": queue.qsize(), "max": queue.maxsize, "descartados": queue.dropped}
+            for name, queue in self.queues.items()
+        }
+        return {"etapas": stages, "colas": queues}
+
+    def latency_report(self):
+        """Percentiles e histograma de la duración de cada etapa (las que la registran)."""
+        stats = [stage.stats for stage in self.stages] + list(self.extra_stats.values())
+        return {s.name: dict(s.latency.summary(), histograma=s.latency.histogram())
+                for s in stats if s.latency is not None}
+
+    def format_stats(self):
+        """Resumen compacto en una línea para overlay o consola."""
+        snap = self.snapshot()
+        fps = " ".join(f"{name}:{s['fps']:.0f}" for name, s in snap["etapas"].items())
+        depth = " ".join(f"{name}:{q['profundidad']}/{q['max']}" for name, q in snap["colas"].items())
+        return f"FPS {fps} | Colas {depth}"
@@ -1,15 +1,47 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Referencia del timeline de arranque
+
+import argparse
 import json
 import os
 import cv2
-import mediapipe as mp
 import numpy as np
-import pyautogui
-import win32gui
-import win32con
-import keyboard
-import time
-import tensorflow as tf
 import random
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from command_registry import CommandGate, merge_command_profiles
+from config_watcher import ConfigWatcher
+from cursor import CursorController
+from decision import GestureStabilizer, MotionGate
+from dispatcher import CommandDispatcher
+from engine_ipc import ENGINE_AUTHKEY_ENV, EngineServer, authkey_from_env
+# MediaPipe y TensorFlow se importan en segundo plano dentro de startup()
+from inference import create_backend, warm_up
+from hand_tracking import HandDetector
+from landmarks import FEATURE_SIZE, normalize_landmarks
+from metrics import LATENCY_WINDOW, AllocationMeter, LatencyStats, StartupTimeline
+from pipeline import FrameRing, Pipeline
+from replay import ActionRecorder, HeadlessSink, LandmarkRecorder, RecordedHands, WindowSink, open_source
+
+# Dependencias de escritorio: sin ellas (Linux/CI, --headless) las acciones se registran en vez de ejecutarse
+try:
+    import pyautogui
+except Exception:  # Sin servidor gráfico pyautogui falla al importarse
+    pyautogui = None
+try:
+    import win32gui
+    import win32con
+except ImportError:
+    win32gui = win32con = None
+try:
+    import keyboard
+except Exception:  # En Linux exige permisos de root
+    keyboard = None
+
+def launch(command):
+    """Lanza un programa sin esperar a que termine (os.system bloquea hasta que se cierra)."""
+    subprocess.Popen(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 # --- Configuración de las acciones del teclado ---
 actions = {
@@ -26,19 +58,28 @@ actions = {
     "Subir Volumen": lambda: keyboard.send("volume up"),       # 10
     "Bajar Volumen": lambda: keyboard.send("volume down"),     # 11
     "Silenciar": lambda: keyboard.send("volume mute"),         # 12
-    "Abrir Bloc": lambda: os.system("notepad"),                # 13
-    "Abrir Calculadora": lambda: os.system("calc"),            # 14
-    "Abrir Explorador": lambda: os.system("explorer"),         # 15
+    "Abrir Bloc": lambda: launch("notepad"),                # 13
+    "Abrir Calculadora": lambda: launch("calc"),            # 14
+    "Abrir Explorador": lambda: launch("explorer"),         # 15
     "Escribir Texto": lambda: pyautogui.typewrite("Hola desde IA!"), # 16
     "Refrescar": lambda: pyautogui.press("f5"),                # 17
     "Borrar": lambda: pyautogui.press("delete"),               # 18
     "Scroll Arriba": lambda: pyautogui.scroll(500),            # 19
     "Scroll Abajo": lambda: pyautogui.scroll(-500),            # 20
-    "Abrir Chrome": lambda: os.system("start chrome"),         # 21
-    "Abrir Excel": lambda: os.system("start excel"),           # 22
+    "Abrir Chrome": lambda: launch("start chrome"),         # 21
+    "Abrir Excel": lambda: launch("start excel"),           # 22
     "Presionar ESC": lambda: pyautogui.press('escape'),        # 23
-    "Abrir Word": lambda: os.system("start winword")           # 24
+    "Abrir Word": lambda: launch("start winword")           # 24
 }
+# Solo estas pueden ejecutarse en paralelo y fuera de orden: no tocan teclado ni ratón
+LAUNCH_ACTIONS = frozenset({"Abrir Bloc", "Abrir Calculadora", "Abrir Explorador",
+                            "Abrir Chrome", "Abrir Excel", "Abrir Word"})
+
+COMMAND_WORKERS = 2        # Hilos que lanzan programas; teclado y ratón van en un solo hilo, en orden
+COMMAND_QUEUE_SIZE = 8     # Acciones pendientes como máximo (las nuevas se descartan)
+COMMAND_TIMEOUT = 5.0      # Segundos por acción antes de abandonarla
+command_dispatcher = None  # CommandDispatcher; sin él las acciones se ejecutan en el hilo que llama
+action_recorder = None     # ActionRecorder en modo --headless: sustituye a las acciones y al cursor
 
 # --- Cargar configuración desde archivo JSON ----
 def load_gesture_config():
@@ -108,6 +149,56 @@ def load_gesture_config():
 # Cargar la configuración
 config = load_gesture_config()
 
+# --- Recarga en caliente de la configuración ---
+CONFIG_FILE = "configuracion_gestos.json"
+CONFIG_POLL_INTERVAL = 1.0  # Segundos entre consultas del mtime (en el hilo del watcher)
+config_watcher = None       # ConfigWatcher, creado en main()
+
+def validate_gesture_config(mapping):
+    """Devuelve la lista de problemas del mapping número → comando (vacía si es válido)."""
+    errors = []
+    for num_str, comando in mapping.items():
+        if not (isinstance(num_str, str) and num_str.isdigit() and 0 <= int(num_str) <= 25):
+            errors.append(f"clase inválida '{num_str}'")
+        elif comando not in actions:
+            errors.append(f"acción desconocida '{comando}' para {chr(int(num_str) + ord('A'))}")
+    return errors
+
+def read_gesture_config(file_path=CONFIG_FILE):
+    """Lee y valida los mappings del JSON (formato detallado o básico). Lanza ValueError si no son válidos."""
+    with open(file_path, "r", encoding='utf-8') as f:
+        data = json.load(f)
+    mapping = data['comandos'] if isinstance(data, dict) and 'comandos' in data else data
+    if not isinstance(mapping, dict):
+        raise ValueError("la sección 'comandos' no es un objeto")
+    mapping = dict(mapping)
+    mapping["23"] = "Presionar ESC"  # ESC siempre protegido
+    errors = validate_gesture_config(mapping)
+    if errors:
+        raise ValueError("; ".join(errors))
+    return mapping
+
+def read_command_profiles(file_path=CONFIG_FILE):
+    """Perfiles de disparo (sección 'perfiles') sobre los de command_registry.py. Lanza ValueError si no son válidos."""
+    with open(file_path, "r", encoding='utf-8') as f:
+        data = json.load(f)
+    overrides = data.get('perfiles') if isinstance(data, dict) else None
+    return merge_command_profiles(overrides, known_actions=actions)
+
+def load_command_profiles():
+    """Como read_command_profiles, pero sin fallar al arrancar: ante cualquier problema, los perfiles por defecto."""
+    try:
+        return read_command_profiles()
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"⚠️  Perfiles de comandos ignorados: {e}")
+    return merge_command_profiles()
+
+# Registro de comandos: `actions` dice qué hace cada uno y `command_profiles` cuándo se dispara
+command_profiles = load_command_profiles()
+
+
 # --- Variables globales para recomendaciones ---
 recommendation_windows = []
 current_recommendations = []
@@ -115,17 +206,57 @@ last_recommendation_update = 0
 RECOMMENDATION_UPDATE_INTERVAL = 5  # Actualizar cada 5 segundos
 last_detected_gesture = None  # Para rastrear cuando cambia la seña detectada
 
+# Atlas de paneles en memoria: las imágenes de Sign_Images se decodifican una vez y
+# cada panel se renderiza una vez por (letra, comando). Cambiar de recomendación es
+# solo buscar en el diccionario; el atlas se rehace únicamente al recargar la configuración.
+SIGNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Sign_Images")
+sign_images = {}          # letra → imagen 120×120 ya redimensionada (None si no existe)
+panel_atlas = {}          # (letra, comando) → panel renderizado (None si no hay imagen)
+panel_atlas_config = None # Configuración con la que se construyó el atlas
+
+
+def load_sign_image(letter):
+    """Imagen de la seña decodificada y redimensionada, leída del disco solo la primera vez."""
+    if letter not in sign_images:
+        image_path = os.path.join(SIGNS_DIR, f"{letter}.jpeg")
+        sign_image = cv2.imread(image_path) if os.path.exists(image_path) else None
+        if sign_image is not None:
+            # Redimensionar imagen para que sea más compacta horizontalmente
+            sign_image = cv2.resize(sign_image, (120, 120))
+        sign_images[letter] = sign_image
+    return sign_images[letter]
+
+
+def build_panel_atlas(mapping):
+    """Pre-renderiza los paneles de todas las clases configuradas.
+
+    Los paneles cuyo (letra, comando) no cambia se conservan; el atlas nuevo
+    sustituye al anterior de una vez.
+    """
+    global panel_atlas, panel_atlas_config
+    atlas = {}
+    for class_id, command in mapping.items():
+        key = (chr(int(class_id) + ord('A')), command)
+        atlas[key] = panel_atlas[key] if key in panel_atlas else render_recommendation_panel(*key)
+    panel_atlas = atlas
+    panel_atlas_config = mapping
+
+
 def create_recommendation_panels():
     """Crear paneles de recomendaciones con imágenes ASL"""
     global current_recommendations
     
+    mapping = config  # Una sola lectura: la configuración puede recargarse en otro hilo
+    if mapping is not panel_atlas_config:
+        build_panel_atlas(mapping)
+
     # Obtener 2 comandos aleatorios de la configuración
-    if len(config) >= 2:
-        available_configs = list(config.items())
+    if len(mapping) >= 2:
+        available_configs = list(mapping.items())
         selected = random.sample(available_configs, 2)
         current_recommendations = selected
         
-        # Crear paneles de recomendaciones
+        # Tomar los paneles del atlas
         recommendation_windows.clear()
         for i, (class_id, command) in enumerate(selected):
             letter = chr(int(class_id) + ord('A'))
@@ -134,24 +265,19 @@ def create_recommendation_panels():
                 recommendation_windows.append(panel)
 
 def create_recommendation_panel(letter, command, index):
-    """Crear un panel individual de recomendación"""
+    """Panel de recomendación desde el atlas; se renderiza y guarda si aún no estaba."""
+    key = (letter, command)
+    if key not in panel_atlas:
+        panel_atlas[key] = render_recommendation_panel(letter, command)
+    return panel_atlas[key]
+
+def render_recommendation_panel(letter, command):
+    """Renderizar un panel individual de recomendación"""
     try:
-        # Cargar imagen de la seña
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        signs_dir = os.path.join(current_dir, "Sign_Images")
-        image_path = os.path.join(signs_dir, f"{letter}.jpeg")
-        
-        if not os.path.exists(image_path):
-            return None
-            
-        # Cargar y redimensionar imagen
-        sign_image = cv2.imread(image_path)
+        sign_image = load_sign_image(letter)
         if sign_image is None:
             return None
             
-        # Redimensionar imagen para que sea más compacta horizontalmente
-        sign_image = cv2.resize(sign_image, (120, 120))
-        
         # Crear panel más estrecho para disposición horizontal
         panel_height = 180
         panel_width = 160
@@ -209,37 +335,247 @@ def update_recommendation_panels_on_gesture(detected_gesture):
         create_recommendation_panels()
         last_detected_gesture = detected_gesture
 
-def show_recommendation_panels():
+def show_recommendation_panels(sink):
     """Mostrar los paneles de recomendaciones en pantalla horizontalmente"""
     if len(recommendation_windows) >= 2:
         # Posición horizontal: cámara (420px) → recomendación 1 → recomendación 2
         
         # Mostrar primer panel (inmediatamente al lado de la cámara)
-        cv2.imshow('Recomendacion 1', recommendation_windows[0])
-        cv2.moveWindow('Recomendacion 1', 430, 0)  # Al lado de la cámara
+        sink.show('Recomendacion 1', recommendation_windows[0], 430, 0)
         
         # Mostrar segundo panel (al lado de la primera recomendación)
-        cv2.imshow('Recomendacion 2', recommendation_windows[1])
-        cv2.moveWindow('Recomendacion 2', 600, 0)  # Al lado de la recomendación 1
-        
-        # Mantener ventanas al frente
-        set_window_always_on_top('Recomendacion 1')
-        set_window_always_on_top('Recomendacion 2')
+        sink.show('Recomendacion 2', recommendation_windows[1], 600, 0)
+
+# --- Configuración del motor (sección "motor" de configuracion_gestos.json) ---
+DEFAULT_ENGINE_CONFIG = {
+    "backend": "tf_function",   # keras | tf_function | tflite | landmarks
+    "modelo": "models/EfficientNetB5_gesture_classifier.keras",
+    "modelo_landmarks": "models/landmark_mlp.npz",
+    "modelo_tflite": None,      # Artefacto .tflite ya optimizado (p. ej. int8 de optimize_model.py)
+    "hilos_tflite": 4,
+    # Capa de decisión temporal (decision.py)
+    "confianza_minima": 0.7,    # Confianza suavizada para aceptar un gesto
+    "confianza_liberacion": 0.45,  # Histéresis: por debajo el gesto se suelta y puede repetirse
+    "sostener_s": 0.4,          # Segundos que el gesto debe mantenerse estable
+    "ventana_votos": 8,         # Últimas N predicciones que votan
+    "suavizado_s": 0.25,        # Constante de tiempo de la media exponencial
+    # Compuerta de movimiento: no clasificar mientras la mano izquierda esté quieta
+    "umbral_movimiento": 0.03,  # Desplazamiento medio de landmarks (fracción del tamaño de la mano)
+    "reclasificar_s": 0.5,      # Reclasificar aunque no haya movimiento tras estos segundos
+    # Detección de manos (MediaPipe)
+    "ancho_deteccion": 320,     # Ancho en px de la copia que se pasa a MediaPipe (0 = frame completo)
+    "roi_seguimiento": True,    # Con mano vista, detectar solo en un recorte alrededor de ella
+    "redeteccion_frames": 15,   # Cada N frames en ROI, detección en el frame completo
+    "complejidad_deteccion": 1, # 0 = modelo lite de MediaPipe (más rápido), 1 = completo
+    "confianza_deteccion": 0.5,
+    "confianza_seguimiento": 0.5,
+    "max_manos": 2,             # Manos por frame; todas las de gesto se clasifican en un solo batch
+    # Cursor con la mano derecha (cursor.py)
+    "cursor_hz": 120,           # Movimientos por segundo del hilo del cursor (interpola entre frames)
+    "cursor_corte_min": 1.0,    # Filtro One-Euro: corte en reposo (Hz); menos = menos temblor
+    "cursor_beta": 0.005,       # Filtro One-Euro: cuánto se reduce el suavizado con la velocidad
+}
 
-# --- Cargar modelo entrenado ---
-gesture_model = tf.keras.models.load_model('models/EfficientNetB5_gesture_classifier.keras')
-print("Modelo EfficientNetB5 cargado exitosamente")
+def load_engine_config(file_path=CONFIG_FILE):
+    """Carga la sección 'motor' del JSON sobre los valores por defecto"""
+    engine_config = dict(DEFAULT_ENGINE_CONFIG)
+    try:
+        with open(file_path, "r", encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get('motor'), dict):
+            engine_config.update(data['motor'])
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    print(f"⚙️  Motor: backend={engine_config['backend']} modelo={engine_config['modelo']}")
+    return engine_config
 
+engine_config = load_engine_config()
+# Claves cuyo cambio obliga a recargar el modelo
+MODEL_CONFIG_KEYS = ("backend", "modelo", "modelo_landmarks", "modelo_tflite", "hilos_tflite")
+
+# --- Modelo entrenado (se carga en startup(), no al importar) ---
+gesture_model = None
 
 # --- Configuración ---
 RECT_WIDTH = 160
 RECT_HEIGHT = 100
 COLOR_MOUSE_POINTER = (255, 0, 255)
 
-mp_drawing = mp.solutions.drawing_utils
-mp_hands = mp.solutions.hands
+mp_hands = None  # mediapipe.solutions.hands, asignado en create_hands()
+
+GESTURE_HAND = 'Left'         # Mano que hace señas (la derecha mueve el cursor)
+PREDICTION_MAX_AGE = 1.0      # Segundos que se sigue mostrando la última predicción
+STATS_PRINT_INTERVAL = 10.0   # Segundos entre resúmenes de FPS/colas en consola
+STARTUP_LOG = "startup_timeline.jsonl"  # Un timeline de arranque por línea
+FRAME_RING_SIZE = 16          # Buffers de frame preasignados (cubre colas + etapas en vuelo)
+MODEL_INPUT_SIZE = (128, 128) # Lado del recorte de la mano para los modelos de imagen
+
+# --- Secuencia de arranque ---
+def load_gesture_model(engine_config):
+    """Crea el backend configurado. Devuelve None si el modelo no se puede cargar."""
+    # El backend "landmarks" usa el MLP de train_landmark_model.py en lugar de la CNN
+    model_path = engine_config["modelo_landmarks"] if engine_config["backend"] == "landmarks" else engine_config["modelo"]
+    try:
+        model = create_backend(engine_config["backend"], model_path,
+                               num_threads=engine_config["hilos_tflite"],
+                               tflite_path=engine_config["modelo_tflite"])
+        print(f"Modelo cargado exitosamente (backend: {model.name})")
+        return model
+    except Exception as e:
+        print(f"❌ Error cargando el modelo ({model_path}): {e}")
+        return None
+
 
-EXEC_COOLDOWN = 5.0
+def create_hands(engine_config):
+    """Importa MediaPipe (lo más lento tras TensorFlow) y crea el detector de manos."""
+    global mp_hands
+    import mediapipe as mp
+    mp_hands = mp.solutions.hands
+    # Una instancia por tipo de imagen (frame completo y ROI), ver hand_tracking.py
+    new_hands = lambda: mp_hands.Hands(static_image_mode=False, max_num_hands=engine_config["max_manos"],
+                                       model_complexity=engine_config["complejidad_deteccion"],
+                                       min_detection_confidence=engine_config["confianza_deteccion"],
+                                       min_tracking_confidence=engine_config["confianza_seguimiento"])
+    return HandDetector(new_hands,
+                        detection_width=engine_config["ancho_deteccion"],
+                        track_roi=engine_config["roi_seguimiento"],
+                        redetect_every=engine_config["redeteccion_frames"])
+
+
+def open_camera():
+    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 420)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 340)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # No acumular frames viejos en el driver
+    return cap
+
+
+def startup(timeline, open_cap=open_camera, recorded_hands=False):
+    """Carga modelo y MediaPipe en paralelo mientras se abre la fuente; después calienta el modelo.
+
+    `open_cap` abre la fuente de frames (la webcam por defecto); con None no se
+    abre ninguna y `cap` es None. Con `recorded_hands` los landmarks vienen de la
+    fuente y no se carga MediaPipe. Devuelve (cap, hands); el modelo queda en la
+    global `gesture_model`.
+    """
+    global gesture_model
+
+    def load_model_task():
+        model = load_gesture_model(engine_config)
+        timeline.mark("modelo cargado")
+        return model
+
+    def load_hands_task():
+        hands = RecordedHands() if recorded_hands else create_hands(engine_config)
+        timeline.mark("mediapipe listo")
+        return hands
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="arranque") as executor:
+        model_future = executor.submit(load_model_task)
+        hands_future = executor.submit(load_hands_task)
+
+        # Mientras tanto, en el hilo principal: cámara y paneles de recomendaciones
+        cap = None
+        if open_cap is not None:
+            cap = open_cap()
+            timeline.mark("cámara abierta")
+        # Las 26 imágenes se decodifican aquí, no en el hilo de frames
+        for class_idx in range(26):
+            load_sign_image(chr(class_idx + ord('A')))
+        create_recommendation_panels()
+
+        hands = hands_future.result()
+        gesture_model = model_future.result()
+
+    if gesture_model is not None:
+        # La primera llamada traza el grafo / reserva tensores: que no la pague el primer gesto
+        warm_up(gesture_model, batch_sizes=range(1, engine_config["max_manos"] + 1))
+        timeline.mark("warm-up")
+    return cap, hands
+
+
+def reload_configuration(file_path=CONFIG_FILE):
+    """Relee el JSON: mappings de gestos y, si cambió la sección 'motor', también el modelo.
+
+    Corre en el hilo del watcher. Si los mappings no son válidos lanza ValueError
+    y se mantiene la configuración anterior.
+    """
+    global config, engine_config, gesture_model, command_profiles
+    new_config = read_gesture_config(file_path)
+    new_profiles = read_command_profiles(file_path)
+    if new_profiles != command_profiles:
+        command_profiles = new_profiles
+        print("🔄 Perfiles de comandos recargados")
+    if new_config != config:
+        changed = [k for k in set(config) | set(new_config) if config.get(k) != new_config.get(k)]
+        # Intercambio atómico: quien lea `config` ve el dict anterior o el nuevo, nunca uno a medias
+        config = new_config
+        print(f"🔄 Configuración recargada: {len(new_config)} comandos, {len(changed)} cambios")
+
+    new_engine_config = load_engine_config(file_path)
+    if new_engine_config == engine_config:
+        return
+    if any(new_engine_config[k] != engine_config[k] for k in MODEL_CONFIG_KEYS):
+        model = load_gesture_model(new_engine_config)
+        if model is None:
+            print("⚠️  Se mantiene el modelo anterior")
+            return
+        warm_up(model, batch_sizes=range(1, new_engine_config["max_manos"] + 1))
+        gesture_model = model
+    # Los umbrales de decisión se aplican sin recargar el modelo
+    engine_config = new_engine_config
+
+
+def create_stabilizer(engine_config):
+    """Estabilizador temporal de una mano con los umbrales de la sección 'motor'."""
+    return GestureStabilizer(window=engine_config["ventana_votos"],
+                             time_constant=engine_config["suavizado_s"],
+                             min_confidence=engine_config["confianza_minima"],
+                             hold_time=engine_config["sostener_s"],
+                             release_confidence=engine_config["confianza_liberacion"])
+
+
+def assign_hand_keys(found):
+    """(clave, etiqueta, puntos) por mano. La clave es la etiqueta, con sufijo si se repite
+    (varias personas en cuadro), numerando de izquierda a derecha para que sea estable."""
+    counts = {}
+    keyed = []
+    for label, points in sorted(found, key=lambda hand: hand[1][0, 0]):
+        counts[label] = counts.get(label, 0) + 1
+        keyed.append((label if counts[label] == 1 else f"{label}{counts[label]}", label, points))
+    return keyed
+
+
+def create_cursor(engine_config):
+    """Controlador del cursor; mueve y hace click sin la pausa que pyautogui añade a cada llamada."""
+    if action_recorder is not None:
+        # Sin escritorio: los clicks se registran y los movimientos solo se cuentan
+        return CursorController(move_fn=action_recorder.stub("Mover cursor", log=False),
+                                click_fn=action_recorder.stub("Click"),
+                                screen_size=(1920, 1080),
+                                rate_hz=engine_config["cursor_hz"],
+                                min_cutoff=engine_config["cursor_corte_min"],
+                                beta=engine_config["cursor_beta"])
+    return CursorController(move_fn=lambda x, y: pyautogui.moveTo(x, y, _pause=False),
+                            click_fn=lambda: pyautogui.click(_pause=False),
+                            screen_size=tuple(pyautogui.size()),
+                            rate_hz=engine_config["cursor_hz"],
+                            min_cutoff=engine_config["cursor_corte_min"],
+                            beta=engine_config["cursor_beta"])
+
+def create_motion_gate(engine_config):
+    return MotionGate(threshold=engine_config["umbral_movimiento"], max_age=engine_config["reclasificar_s"])
+
+
+def request_config_reload():
+    """Pide la recarga al watcher para no bloquear el bucle de frames (carga síncrona si no hay watcher)."""
+    if config_watcher is not None:
+        config_watcher.trigger()
+    else:
+        try:
+            reload_configuration()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Recarga de {CONFIG_FILE} descartada: {e}")
 
 # --- Funciones auxiliares ---
 def calculate_distance(x1, y1, x2, y2):
@@ -247,15 +583,21 @@ def calculate_distance(x1, y1, x2, y2):
     return np.linalg.norm(p1 - p2)
 
 
-def detect_finger_down(hand_landmarks, width, height, output):
+def to_pixels(points, width, height):
+    """Landmarks (21, 3) normalizados → array (21, 2) de enteros en píxeles."""
+    return (points[:, :2] * (width, height)).astype(np.int32)
+
+
+def detect_finger_down(points, width, height, output):
     """Detecta si el dedo índice está abajo (para click)."""
     finger_down = False
     color_base, color_index = (255, 0, 112), (255, 198, 82)
 
     # Coordenadas base y dedo índice
-    x_base1, y_base1 = int(hand_landmarks.landmark[0].x * width), int(hand_landmarks.landmark[0].y * height)
-    x_base2, y_base2 = int(hand_landmarks.landmark[9].x * width), int(hand_landmarks.landmark[9].y * height)
-    x_index, y_index = int(hand_landmarks.landmark[8].x * width), int(hand_landmarks.landmark[8].y * height)
+    pixels = to_pixels(points, width, height)
+    x_base1, y_base1 = (int(v) for v in pixels[0])
+    x_base2, y_base2 = (int(v) for v in pixels[9])
+    x_index, y_index = (int(v) for v in pixels[8])
 
     # Distancias
     d_base = calculate_distance(x_base1, y_base1, x_base2, y_base2)
@@ -275,26 +617,27 @@ def detect_finger_down(hand_landmarks, width, height, output):
     return finger_down
 
 
-def process_hand_right(hand_landmarks, frame, width, height):
-    """Controla el mouse si es la derecha."""
-    output = frame.copy()
+def process_hand_right(points, output, width, height, cursor, timestamp):
+    """Controla el mouse si es la derecha. Dibuja sobre `output` en su sitio.
+
+    Solo calcula el objetivo en pantalla y el estado del índice: el filtrado,
+    el movimiento y el click los hace el hilo de `cursor`.
+    """
 
     # Rectángulo de control
     x_ini, y_ini = width - RECT_WIDTH - 50, height - RECT_HEIGHT - 50
     cv2.rectangle(output, (x_ini, y_ini), (x_ini + RECT_WIDTH, y_ini + RECT_HEIGHT), (255, 0, 0), 2)
 
     # Coordenadas de la mano
-    x, y = int(hand_landmarks.landmark[9].x * width), int(hand_landmarks.landmark[9].y * height)
+    x, y = int(points[9, 0] * width), int(points[9, 1] * height)
 
-    # Mapeo a pantalla
-    screen_w, screen_h = pyautogui.size()
+    # Mapeo a pantalla (tamaño de pantalla consultado una sola vez)
+    screen_w, screen_h = cursor.screen_size
     xm = np.interp(x, (x_ini, x_ini + RECT_WIDTH), (5, screen_w - 5))
     ym = np.interp(y, (y_ini, y_ini + RECT_HEIGHT), (5, screen_h - 5))
-    pyautogui.moveTo(int(xm), int(ym))
 
-    # Click si índice abajo
-    if detect_finger_down(hand_landmarks, width, height, output):
-        pyautogui.click()
+    # Click en el flanco de bajada del índice (con antirrebote, en el hilo del cursor)
+    cursor.update(xm, ym, timestamp, detect_finger_down(points, width, height, output))
 
     # Marcador en la mano
     cv2.circle(output, (x, y), 10, COLOR_MOUSE_POINTER, 3)
@@ -302,76 +645,100 @@ def process_hand_right(hand_landmarks, frame, width, height):
 
     return output
 
-def process_hand_left(hand_landmarks, frame, width, height, model):
-    output = frame.copy()
+def hand_bbox(points, width, height, margin=20):
+    """Bounding box en píxeles de los 21 landmarks, con margen y recortado al frame."""
+    pixels = to_pixels(points, width, height)
+    x_min, y_min = np.maximum(pixels.min(axis=0) - margin, 0)
+    x_max, y_max = np.minimum(pixels.max(axis=0) + margin, (width, height))
+    return int(x_min), int(y_min), int(x_max), int(y_max)
+
+
+def hand_model_input(points, frame, width, height, model, out=None, resize_buf=None):
+    """Entrada del modelo para una mano (sin dimensión de batch), o None si el recorte sale vacío.
+
+    Con `out` (una fila del tensor de entrada preasignado) y `resize_buf` (uint8
+    128×128×3) se rellena en su sitio, sin reservar arrays nuevos.
+    """
+    if model.input_kind == "landmarks":
+        # Clasificador ligero: vector de 63 floats normalizado a la muñeca, sin recorte
+        features = normalize_landmarks(points, aspect=width / height, mirror=True)
+        if out is None:
+            return features
+        out[...] = features
+        return out
 
-    # Bounding box de la mano
-    x_coords = [int(lm.x * width) for lm in hand_landmarks.landmark]
-    y_coords = [int(lm.y * height) for lm in hand_landmarks.landmark]
-    x_min, x_max = max(min(x_coords)-20, 0), min(max(x_coords)+20, width)
-    y_min, y_max = max(min(y_coords)-20, 0), min(max(y_coords)+20, height)
+    x_min, y_min, x_max, y_max = hand_bbox(points, width, height)
 
     # Recorte y preprocesamiento
     hand_roi = frame[y_min:y_max, x_min:x_max]
     if hand_roi.size == 0:
-        return output, None  # si el ROI sale vacío
+        return None
+
+    hand_resized = cv2.resize(hand_roi, MODEL_INPUT_SIZE, dst=resize_buf)
+    if out is None:
+        return hand_resized.astype("float32")  # (128,128,3)
+    np.copyto(out, hand_resized)  # uint8 → float32 directamente en el tensor de entrada
+    return out
 
-    # Si no hay modelo disponible, solo mostrar el bounding box
-    if model is None:
-        cv2.rectangle(output, (x_min, y_min), (x_max, y_max), (0, 255, 255), 2)
-        cv2.putText(output, "Modelo no disponible",
-                    (x_min, y_min - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        return output, None
 
-    hand_resized = cv2.resize(hand_roi, (128, 128))
-    hand_array = hand_resized.astype("float32")
-    hand_array = np.expand_dims(hand_array, axis=0)  # (1,128,128,3)
+def predict_batch(model_inputs, model):
+    """Clasifica varias manos en UNA llamada al modelo. Devuelve (N, clases) o None.
 
+    `model_inputs` es una lista de entradas o un array (N, ...) ya apilado.
+    """
     try:
-        # Predicción
-        preds = model.predict(hand_array, verbose=0)
-        class_idx = np.argmax(preds)
-        pred_conf = preds[0][class_idx]
-        
-        # Convertir clase a letra para mostrar
-        letter = chr(int(class_idx) + ord('A'))
-        
-        # Verificar si hay comando configurado
-        class_str = str(int(class_idx))
-        command_text = "Sin configurar"
-        text_color = (0, 0, 255)  # Rojo por defecto
-        
-        if class_str in config:
-            command_text = config[class_str]
-            text_color = (0, 255, 0)  # Verde si está configurado
+        if isinstance(model_inputs, np.ndarray):
+            return model.predict(model_inputs)
+        return model.predict(np.stack(model_inputs))
+    except Exception as e:
+        print(f"Error en predicción: {e}")
+        return None
 
-        print(f"Predicción: Letra {letter} (clase {class_idx}) con confianza {pred_conf:.2f} → {command_text}")
 
-        # Mostrar resultado en pantalla con más información
-        cv2.rectangle(output, (x_min, y_min), (x_max, y_max), text_color, 2)
-        
-        # Línea 1: Letra y confianza
-        cv2.putText(output, f"Letra {letter} ({pred_conf:.2f})",
-                    (x_min, y_min - 35),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, text_color, 2)
-        
-        # Línea 2: Comando configurado
-        cv2.putText(output, f"Cmd: {command_text}",
-                    (x_min, y_min - 15),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, text_color, 1)
+def draw_hand_left(output, bbox, class_idx, pred_conf, message=None, color=(0, 255, 255)):
+    """Dibuja el bounding box de la mano izquierda con la letra y el comando."""
+    x_min, y_min, x_max, y_max = bbox
 
-        return output, class_idx
-    except Exception as e:
-        print(f"Error en predicción: {e}")
-        cv2.rectangle(output, (x_min, y_min), (x_max, y_max), (0, 0, 255), 2)
-        cv2.putText(output, f"Error predicción",
+    if message is not None:
+        # Estado sin predicción (modelo no disponible, error, clasificando...)
+        cv2.rectangle(output, (x_min, y_min), (x_max, y_max), color, 2)
+        cv2.putText(output, message,
                     (x_min, y_min - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        return output, None
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        return output
+
+    # Convertir clase a letra para mostrar
+    letter = chr(int(class_idx) + ord('A'))
+
+    # Verificar si hay comando configurado
+    class_str = str(int(class_idx))
+    command_text = "Sin configurar"
+    text_color = (0, 0, 255)  # Rojo por defecto
+
+    configured = config.get(class_str)  # Una sola lectura: la configuración puede recargarse en otro hilo
+    if configured is not None:
+        command_text = configured
+        text_color = (0, 255, 0)  # Verde si está configurado
+
+    # Mostrar resultado en pantalla con más información
+    cv2.rectangle(output, (x_min, y_min), (x_max, y_max), text_color, 2)
+
+    # Línea 1: Letra y confianza
+    cv2.putText(output, f"Letra {letter} ({pred_conf:.2f})",
+                (x_min, y_min - 35),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, text_color, 2)
+
+    # Línea 2: Comando configurado
+    cv2.putText(output, f"Cmd: {command_text}",
+                (x_min, y_min - 15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.5, text_color, 1)
+    return output
+
 
 def set_window_always_on_top(window_title):
     """Establece la ventana con el título dado como siempre en la parte superior."""
+    if win32gui is None:
+        return
     hwnd = win32gui.FindWindow(None, window_title)
     if hwnd:
         win32gui.SetWindowPos(hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0,
@@ -380,107 +747,550 @@ def set_window_always_on_top(window_title):
         print(f"No se encontró la ventana con el título: {window_title}")
     
 def executive_command(class_id):
+    """Dispara la acción configurada para la clase. Una sola línea de log por disparo:
+    los continuos se repiten a 10 Hz y el bucle de frames no debe ir llenando la consola."""
     if class_id is None:
         return
     
-    class_str = str(int(class_id))  # Convertir a int y luego a string
     letter = chr(int(class_id) + ord('A'))  # Convertir número a letra
-    
-    print(f"\n🔍 DETECTADO: Letra {letter} (clase {class_id})")
-    
-    if class_str in config:
-        action = config[class_str]
-        print(f"📋 CONFIGURADO: {action}")
-        
-        if action in actions:
-            print(f"✅ EJECUTANDO: '{action}' para letra {letter}")
-            try:
-                actions[action]()
-                print(f"✅ ÉXITO: Comando '{action}' ejecutado correctamente")
-            except Exception as e:
-                print(f"❌ ERROR ejecutando '{action}': {e}")
-        else:
-            print(f"❌ ERROR: Acción '{action}' no está definida en el diccionario de acciones")
-            print(f"📝 Acciones disponibles: {list(actions.keys())}")
-    else:
+    current_config = config  # Instantánea: la recarga en caliente puede cambiar la global
+    action = current_config.get(str(int(class_id)))
+    if action is None:
         print(f"⚠️  NO CONFIGURADO: No hay comando para letra {letter} (clase {class_id})")
-        print(f"📝 Clases configuradas: {list(config.keys())}")
-    print("-" * 50)
+    elif action not in actions:
+        print(f"❌ ERROR: Acción '{action}' (letra {letter}) no está definida en el diccionario de acciones")
+    elif command_dispatcher is not None and action_recorder is None:
+        # El bucle de frames no espera a la acción: la ejecuta el despachador, en
+        # serie salvo los lanzamientos de programas. Las continuas pendientes se
+        # fusionan; las idempotentes no se duplican. Los errores los imprime el worker.
+        profile = command_profiles[action]
+        if command_dispatcher.submit(action, actions[action], coalesce=profile["modo"] == "continuo",
+                                     dedupe=profile["idempotente"], serial=action not in LAUNCH_ACTIONS):
+            print(f"✅ {letter} → '{action}'")
+    else:
+        # Sin despachador, o con las acciones registradas (--headless, benchmark.py): aquí
+        # mismo y en serie, así el registro lleva el tiempo del frame que las disparó
+        try:
+            actions[action]()
+            print(f"✅ {letter} → '{action}'")
+        except Exception as e:
+            print(f"❌ ERROR ejecutando '{action}': {e}")
 
 # --- Función principal ---
-def main():
-    last_exec_time = time.time()
+def run_session(cap, hands, timeline, control=None, memory=None, sink=None, landmark_log=None, report=None):
+    """Bucle de control gestual sobre una fuente de frames (webcam, video, imágenes o landmarks).
+
+    Termina con ESC, al acabarse la fuente o con una orden 'pause'/'shutdown'
+    del canal de control; devuelve "esc", "fin" o esa orden. Con `memory`
+    (AllocationMeter) mide la memoria reservada en cada frame. `sink` decide
+    dónde se muestra el resultado (ventanas por defecto, HeadlessSink sin
+    ellas) y con `landmark_log` se graban las manos detectadas de cada frame.
+    Si se pasa el dict `report`, al terminar se rellena con frames, duración,
+    latencias por etapa y de extremo a extremo (lo usa benchmark.py).
+
+    Las fuentes de archivo se procesan a máxima velocidad y sin descartar
+    frames; sus decisiones usan el tiempo del propio stream.
+    """
     last_command = "Ninguno"
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 420)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 340)
+    end_reason = "fin"
+    hands.reset()  # La ROI de una sesión anterior ya no vale
+    sink = sink if sink is not None else WindowSink(set_window_always_on_top)
+    lossless = not getattr(cap, "realtime", True)
+
+    # Con `report` (benchmark) las latencias guardan todas las muestras: sus percentiles e
+    # histogramas tienen que cubrir el clip entero y cuadrar con el número de frames
+    latency_samples = None if report is not None else LATENCY_WINDOW
+    pipeline = Pipeline(lossless=lossless, latency_samples=latency_samples)
+    frames_q = pipeline.add_queue("frames", 2)
+    landmarks_q = pipeline.add_queue("landmarks", 2)
+    classify_q = pipeline.add_queue("clasificar", 1)
+    predictions_q = pipeline.add_queue("predicciones", 1)
+
+    # Etapa 1: captura (hilo propio, a la velocidad de la cámara). Cada frame se lee
+    # directamente en un buffer del anillo y se voltea en su sitio: sin reservas por frame.
+    # Las etapas posteriores comprueban con ring.valid(slot) que el buffer no se reciclara.
+    frame_ring = None
+
+    def capture():
+        nonlocal frame_ring
+        slot = frame_ring.acquire() if frame_ring is not None else None
+        buffer = frame_ring.buffers[slot[0]] if slot is not None else None
+        ret, frame = cap.read(buffer) if buffer is not None else cap.read()
+        if not ret:
+            return None
+        if frame is not buffer:
+            # Primer frame o cambio de resolución: el anillo toma la forma real de la cámara
+            frame_ring = FrameRing(FRAME_RING_SIZE, frame.shape)
+            slot = frame_ring.acquire()
+            buffer = frame_ring.buffers[slot[0]]
+            np.copyto(buffer, frame)
+        cv2.flip(buffer, 1, dst=buffer)
+        t_capture = time.perf_counter()
+        # "t" es el tiempo del stream (decisión temporal); "t_captura", el reloj real (latencias)
+        stream_t = getattr(cap, "timestamp", None)
+        return {"frame": buffer, "ring": frame_ring, "slot": slot, "t_captura": t_capture,
+                "t": t_capture if stream_t is None else stream_t,
+                "manos_grabadas": list(cap.hands) if hasattr(cap, "hands") else None}
+
+    # Etapa 2: landmarks con MediaPipe (frame reducido / ROI seguida, ver hand_tracking.py).
+    # Cada mano es (clave, etiqueta, puntos) con puntos (21, 3) normalizados al frame completo.
+    detector_config = None
+    recorder = None
+
+    def detect(packet):
+        nonlocal detector_config, recorder
+        if engine_config is not detector_config:
+            # Resolución y ROI se aplican en caliente; umbrales y complejidad de MediaPipe al reiniciar
+            detector_config = engine_config
+            hands.detection_width = engine_config["ancho_deteccion"]
+            hands.track_roi = engine_config["roi_seguimiento"]
+            hands.redetect_every = engine_config["redeteccion_frames"]
+        found = packet["manos_grabadas"]
+        if found is None:
+            found = hands.process(packet["frame"])
+            # Como en classify: si el buffer se recicló durante la detección, los landmarks
+            # pueden venir de otro frame. Se descarta el paquete (el render lo saltaría igual)
+            if not packet["ring"].valid(packet["slot"]):
+                return None
+        if landmark_log is not None:
+            if recorder is None:
+                height, width = packet["frame"].shape[:2]
+                recorder = LandmarkRecorder(landmark_log, width, height, getattr(cap, "fps", 30.0))
+            recorder.write(packet["t"], found)
+        packet["manos"] = assign_hand_keys(found)
+        if any(label == GESTURE_HAND for _, label, _ in packet["manos"]):
+            packet["clasificar"] = True
+            classify_q.put(packet)
+        return packet
+
+    # Etapa 3: clasificador (corre a la velocidad que pueda sostener). Las manos de
+    # gesto que se movieron se clasifican juntas en un solo batch; las que siguen
+    # quietas reutilizan su última predicción (compuerta de movimiento por mano).
+    motion_gates = {}
+    gate_config = engine_config
+    # Tensor de entrada (max_manos, ...) float32 y buffer del recorte reutilizados entre frames
+    input_batch = None
+    resize_buf = np.empty(MODEL_INPUT_SIZE[::-1] + (3,), dtype=np.uint8)
+
+    def hand_prediction(key, probs, reused):
+        class_idx = int(np.argmax(probs))
+        return {"clave": key, "probs": probs, "clase": class_idx, "confianza": float(probs[class_idx]),
+                "reutilizada": reused}
+
+    def empty_prediction(packet):
+        # Sin pérdidas, el render espera una respuesta por cada paquete (aunque venga vacía)
+        return {"manos": [], "t": packet["t"], "t_captura": packet["t_captura"],
+                "t_prediccion": time.perf_counter()} if lossless else None
+
+    def classify(packet):
+        try:
+            return classify_hands(packet)
+        except Exception as e:
+            # También con error: sin respuesta, el render emparejaría cada frame
+            # siguiente con la predicción del anterior
+            print(f"❌ Error en etapa 'clasificador': {e}")
+            return empty_prediction(packet)
+
+    def classify_hands(packet):
+        nonlocal motion_gates, gate_config, input_batch
+        if engine_config is not gate_config:
+            gate_config = engine_config
+            motion_gates = {}
+        empty = empty_prediction(packet)
+        if gesture_model is None:
+            return empty
+        input_shape = (FEATURE_SIZE,) if gesture_model.input_kind == "landmarks" else \
+            MODEL_INPUT_SIZE[::-1] + (3,)
+        max_hands = max(engine_config["max_manos"], 1)
+        if input_batch is None or input_batch.shape != (max_hands,) + input_shape:
+            input_batch = np.empty((max_hands,) + input_shape, dtype=np.float32)
+        frame = packet["frame"]
+        height, width, _ = frame.shape
+        t_stream = packet["t"]
+
+        predictions, pending = [], []
+        for key, label, points in packet["manos"]:
+            if label != GESTURE_HAND:
+                continue
+            gate = motion_gates.get(key)
+            if gate is None:
+                gate = motion_gates[key] = create_motion_gate(engine_config)
+            probs = gate.check(points, t_stream, aspect=width / height)
+            if probs is not None:
+                saved_stats.tick()
+                predictions.append(hand_prediction(key, probs, True))
+                continue
+            if len(pending) == len(input_batch):
+                continue
+            if hand_model_input(points, frame, width, height, gesture_model,
+                                out=input_batch[len(pending)], resize_buf=resize_buf) is not None:
+                pending.append((key, points))
 
-    # Crear recomendaciones iniciales
-    create_recommendation_panels()
+        # Los recortes ya están copiados: si el buffer se recicló mientras tanto, están corruptos
+        if pending and not packet["ring"].valid(packet["slot"]):
+            return empty
 
-    with mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5) as hands:
+        if pending:
+            batch_probs = predict_batch(input_batch[:len(pending)], gesture_model)
+            if batch_probs is not None:
+                for (key, points), probs in zip(pending, batch_probs):
+                    motion_gates[key].record(points, probs, t_stream)
+                    predictions.append(hand_prediction(key, probs, False))
+
+        if not predictions:
+            return empty
+        return {"manos": predictions, "t": t_stream, "t_captura": packet["t_captura"],
+                "t_prediccion": time.perf_counter()}
+
+    pipeline.add_stage("captura", capture, None, [frames_q])
+    pipeline.add_stage("landmarks", detect, frames_q, [landmarks_q], feeds=[classify_q])
+    pipeline.add_stage("clasificador", classify, classify_q, [predictions_q])
+    render_stats = pipeline.add_stats("render")
+    saved_stats = pipeline.add_stats("ahorradas", track_latency=False)  # Inferencias evitadas por segundo
+    end_to_end = LatencyStats("captura→render", latency_samples)  # Frame capturado → mostrado y despachado
+    to_prediction = LatencyStats("captura→predicción", latency_samples)
+    cursor = create_cursor(engine_config).start()
+    pipeline.start()
+    session_start = time.perf_counter()
+
+    latest_prediction = None
+    last_stats_print = time.time()
+    canvas = None  # Lienzo único para el overlay, reutilizado en cada frame
+    panels_config = config
+    # Un estabilizador por mano de gesto (por clave); se rehacen si cambia la sección 'motor'
+    stabilizers_config = engine_config
+    stabilizers = {}
+    command_gate = CommandGate()  # Cooldown y auto-repetición de cada comando según su perfil
+
+    def wait_prediction():
+        """Sin pérdidas: la predicción del paquete actual (classify siempre responde)."""
+        prediction = None
+        while prediction is None and not predictions_q.exhausted:
+            prediction = predictions_q.get(timeout=0.5)
+        return prediction
+
+    # Etapa 4: render y despacho en el hilo principal (imshow/waitKey lo requieren)
+    try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+            # Órdenes de app.py (modo residente) sin bloquear el frame
+            if control is not None:
+                command = control.next_command(timeout=0)
+                if command == "reload-config":
+                    request_config_reload()
+                elif command in ("pause", "shutdown"):
+                    end_reason = command
+                    break
+
+            packet = landmarks_q.get(timeout=0.5)
+            if packet is None:
+                if landmarks_q.exhausted:
+                    break  # La fuente se agotó y el pipeline ya se vació
+                continue
 
+            render_start = time.perf_counter()
+            if memory is not None:
+                memory.begin()
+            timeline.mark("primer frame")
+            if action_recorder is not None:
+                action_recorder.set_time(packet["t"])  # Comandos y clicks de este frame
+            frame = packet["frame"]
             height, width, _ = frame.shape
-            frame = cv2.flip(frame, 1)
-            output = frame.copy()
+            # El overlay se dibuja en un lienzo propio: el frame del anillo puede estar
+            # recortándose a la vez en el clasificador
+            if canvas is None or canvas.shape != frame.shape:
+                canvas = np.empty_like(frame)
+            np.copyto(canvas, frame)
+            if not packet["ring"].valid(packet["slot"]):
+                # Buffer reciclado durante la copia: no se dibuja, pero el frame se cierra
+                # igual (su predicción, contadores, medida de memoria y teclado)
+                if lossless and packet.get("clasificar"):
+                    wait_prediction()
+                render_stats.tick(time.perf_counter() - render_start)
+                if memory is not None:
+                    memory.end()
+                if sink.poll_key() == 27:
+                    end_reason = "esc"
+                    break
+                continue
+            output = canvas
+
+            if engine_config is not stabilizers_config:
+                stabilizers_config = engine_config
+                stabilizers = {}
+                cursor.rate_hz = engine_config["cursor_hz"]
+                cursor.filter.min_cutoff = engine_config["cursor_corte_min"]
+                cursor.filter.beta = engine_config["cursor_beta"]
+
+            # Recoger la predicción más reciente sin bloquear y pasar cada mano por la decisión
+            # temporal: `gestures` solo tiene algo el frame en que un gesto se estabiliza
+            gestures, emitted_keys = [], set()
+            if lossless and packet.get("clasificar"):
+                # Reproducción: esperar la predicción de este mismo frame (resultado reproducible)
+                new_prediction = wait_prediction()
+            else:
+                new_prediction = predictions_q.get_nowait()
+            if new_prediction is not None:
+                latest_prediction = new_prediction
+                to_prediction.record(new_prediction["t_prediccion"] - new_prediction["t_captura"])
+                for hand in new_prediction["manos"]:
+                    stabilizer = stabilizers.get(hand["clave"])
+                    if stabilizer is None:
+                        stabilizer = stabilizers[hand["clave"]] = create_stabilizer(engine_config)
+                    emitted = stabilizer.update(hand["probs"], new_prediction["t"])
+                    if emitted is not None:
+                        gestures.append(emitted)
+                        emitted_keys.add(hand["clave"])
+                if not timeline.has("primera predicción"):
+                    timeline.mark("primera predicción")
+                    timeline.save(STARTUP_LOG)
+            present = {key for key, _, _ in packet["manos"]}
+            for key, stabilizer in stabilizers.items():
+                if key not in present:
+                    stabilizer.expire(packet["t"])  # Mano fuera: el gesto se suelta
+
+            # Qué se dispara este frame según el perfil de cada comando: los gestos nuevos
+            # salvo cooldown y, mientras siguen sostenidos, los continuos a su intervalo
+            current_config, profiles = config, command_profiles
+            commands = []
+            for gesture in gestures:
+                action = current_config.get(str(gesture))
+                if action not in profiles or command_gate.press(action, profiles[action], packet["t"]):
+                    commands.append(gesture)
+            for key, stabilizer in stabilizers.items():
+                # Una mano que salió del frame no repite aunque su gesto siga activo hasta max_gap
+                if key not in present or stabilizer.active is None or key in emitted_keys:
+                    continue
+                action = current_config.get(str(stabilizer.active))
+                if action in profiles and command_gate.hold(action, profiles[action], packet["t"]):
+                    commands.append(stabilizer.active)
 
             # Agregar información de estado en la parte superior
             cv2.putText(output, f"Configuraciones: {len(config)}", (10, 25), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             cv2.putText(output, f"Ultimo comando: {last_command}", (10, 50), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            # Mostrar tiempo restante de cooldown
-            time_left = max(0, EXEC_COOLDOWN - (time.time() - last_exec_time))
-            if time_left > 0:
-                cv2.putText(output, f"Cooldown: {time_left:.1f}s", (10, 75), 
+        
+            # Estado de la decisión: gesto activo o progreso del tiempo sostenido
+            left_stabilizer = stabilizers.get(GESTURE_HAND)
+            hold_progress = left_stabilizer.hold_progress(packet["t"]) if left_stabilizer else 0.0
+            if left_stabilizer is not None and left_stabilizer.active is not None:
+                cv2.putText(output, f"Gesto activo: {chr(left_stabilizer.active + ord('A'))}", (10, 75),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+            elif hold_progress > 0:
+                cv2.putText(output, f"Sosteniendo: {hold_progress:.0%}", (10, 75),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
 
-            # Procesar manos
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(frame_rgb)
-            pred = None
+            # Procesar manos (el cursor va a la velocidad de la cámara)
+            if 'Right' not in present:
+                cursor.release()
+            for key, label, points in packet["manos"]:
+                if key == 'Right':
+                    # Solo la primera mano derecha controla el cursor
+                    process_hand_right(points, output, width, height, cursor, packet["t_captura"])
+                if label == GESTURE_HAND:
+                    bbox = hand_bbox(points, width, height)
+                    stabilizer = stabilizers.get(key)
+                    if gesture_model is None:
+                        draw_hand_left(output, bbox, None, None, "Modelo no disponible")
+                    elif stabilizer is not None and stabilizer.smoothed[0] is not None and \
+                            latest_prediction is not None and \
+                            packet["t"] - latest_prediction["t"] < PREDICTION_MAX_AGE:
+                        # Se muestra la predicción suavizada, no la del último frame
+                        class_idx, smoothed_conf = stabilizer.smoothed
+                        draw_hand_left(output, bbox, class_idx, smoothed_conf)
+                    else:
+                        draw_hand_left(output, bbox, None, None, "Clasificando...")
+
+            # Contadores del pipeline
+            cv2.putText(output, pipeline.format_stats(), (5, height - 8),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, (255, 255, 255), 1)
+            if time.time() - last_stats_print > STATS_PRINT_INTERVAL:
+                print(f"📈 {pipeline.format_stats()}")
+                last_stats_print = time.time()
 
-            if results.multi_hand_landmarks:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    if handedness.classification[0].label == 'Right':
-                        output = process_hand_right(hand_landmarks, frame, width, height)
-                    if handedness.classification[0].label == 'Left':
-                        output, pred = process_hand_left(hand_landmarks, frame, width, height, gesture_model)
+            # Rehacer las recomendaciones si la configuración se recargó en caliente
+            if config is not panels_config:
+                panels_config = config
+                create_recommendation_panels()
 
             # Actualizar recomendaciones solo cuando se detecta una nueva seña
-            if pred is not None:
-                update_recommendation_panels_on_gesture(pred)
-            
+            if gestures:
+                update_recommendation_panels_on_gesture(gestures[-1])
+        
             # Mostrar paneles de recomendaciones
-            show_recommendation_panels()
-
-            cv2.imshow('Hand Control', output)
-            cv2.moveWindow('Hand Control', 0, 0)
-            set_window_always_on_top('Hand Control')
-
-            if pred is not None:
-                now = time.time()
-                if now - last_exec_time > EXEC_COOLDOWN:
-                    # Actualizar último comando ejecutado
-                    class_str = str(int(pred))
-                    if class_str in config:
-                        last_command = config[class_str]
-                    else:
-                        last_command = f"Letra {chr(int(pred) + ord('A'))} (no config)"
-                    
-                    executive_command(pred)
-                    last_exec_time = now  
+            show_recommendation_panels(sink)
+
+            sink.show('Hand Control', output, 0, 0)
 
-            if cv2.waitKey(1) & 0xFF == 27:
+            for gesture in commands:
+                # Actualizar último comando ejecutado
+                class_str = str(int(gesture))
+                last_command = config.get(class_str, f"Letra {chr(int(gesture) + ord('A'))} (no config)")
+            
+                executive_command(gesture)
+
+            render_stats.tick(time.perf_counter() - render_start)
+            end_to_end.record(time.perf_counter() - packet["t_captura"])
+            if memory is not None:
+                memory.end()
+
+            if sink.poll_key() == 27:
+                end_reason = "esc"
                 break
+    finally:
+        # También si el bucle lanza una excepción: que no queden vivos los hilos de etapas y cursor
+        pipeline.stop()
+        cursor.stop()
+    sink.close()
+    if recorder is not None:
+        recorder.close()
+        print(f"💾 {recorder.frames} frames de landmarks grabados en {landmark_log}")
+    elapsed = time.perf_counter() - session_start
+    print(f"🏁 {render_stats.count} frames en {elapsed:.1f} s ({render_stats.count / max(elapsed, 1e-9):.1f} FPS"
+          f"{', sin descartes' if lossless else ''})")
+    print(f"⏱️  {end_to_end.format()}")
+    print(f"🖱️  {cursor.format_stats()}")
+    print(f"✋ {hands.format_stats()}")
+    inferences = sum(gate.inferences for gate in motion_gates.values())
+    reused = sum(gate.reused for gate in motion_gates.values())
+    print(f"💤 Compuerta de movimiento: {inferences} inferencias, "
+          f"{reused} reutilizadas ({reused / max(inferences + reused, 1):.0%} ahorrado)")
+    if frame_ring is not None and frame_ring.recycled:
+        print(f"♻️  {frame_ring.recycled} frames descartados por buffer reciclado")
+    if memory is not None:
+        print(f"🧠 {memory.format()}")
+    if report is not None:
+        report.update({
+            "frames": render_stats.count,
+            "segundos": round(elapsed, 3),
+            "fps": round(render_stats.count / max(elapsed, 1e-9), 2),
+            "sin_descartes": lossless,
+            "etapas": pipeline.latency_report(),
+            "extremo_a_extremo": dict(end_to_end.summary(), histograma=end_to_end.histogram()),
+            "captura_prediccion": dict(to_prediction.summary(), histograma=to_prediction.histogram()),
+            "colas": pipeline.snapshot()["colas"],
+            "inferencias": inferences,
+            "reutilizadas": reused,
+        })
+    return end_reason
+
+
+def serve_engine(control, cap, hands, timeline, memory=None):
+    """Modo residente: el modelo y MediaPipe siguen cargados y app.py alterna entre activo y pausa."""
+    command = "start" if cap is not None else None
+    control.set_state("pausado")
+    while True:
+        if command in ("start", "resume"):
+            if cap is None:
+                cap = open_camera()
+            control.set_state("activo")
+            print("▶️  Control gestual activo")
+            command = run_session(cap, hands, timeline, control, memory)
+            # La cámara se libera en pausa; reabrirla es mucho más barato que recargar el modelo
+            cap.release()
+            cap = None
+            if command in ("esc", "fin"):
+                command = "pause"
+            continue
+        if command == "pause":
+            control.set_state("pausado")
+            print("⏸️  Control gestual en pausa (modelo residente)")
+        elif command == "reload-config":
+            request_config_reload()
+        elif command == "shutdown":
+            break
+        command = control.next_command(timeout=0.5)
+
+    control.set_state("detenido")
+    control.close()
+    print("⏹️  Motor detenido")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Control gestual ASL con cámara")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Quedar residente y recibir órdenes de app.py (start/pause/resume/reload-config/shutdown)")
+    parser.add_argument("--iniciar", action="store_true",
+                        help="Con --daemon, empezar capturando sin esperar la orden 'start'")
+    parser.add_argument("--perfil-memoria", action="store_true",
+                        help="Medir con tracemalloc la memoria reservada por frame (ralentiza el bucle)")
+    parser.add_argument("--fuente", default=None,
+                        help="Reproducir un video, un directorio de imágenes o un .jsonl de landmarks "
+                             "en lugar de la webcam (a máxima velocidad, sin descartar frames)")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="FPS del stream para un directorio de imágenes")
+    parser.add_argument("--headless", action="store_true",
+                        help="Sin ventanas ni teclado/ratón: las acciones se registran en lugar de ejecutarse")
+    parser.add_argument("--acciones-log", default="acciones_registradas.jsonl",
+                        help="Con --headless, archivo JSONL con las acciones registradas")
+    parser.add_argument("--grabar-landmarks", default=None,
+                        help="Grabar las manos detectadas de cada frame en un .jsonl reproducible con --fuente")
+    args = parser.parse_args()
+    if args.daemon and args.fuente:
+        parser.error("--fuente no se puede usar con --daemon")
+    if args.daemon and authkey_from_env() is None:
+        parser.error(f"--daemon necesita la authkey del canal de control en {ENGINE_AUTHKEY_ENV} (la pone app.py)")
+    return args
+
+
+def enable_action_recording():
+    """Sustituye las acciones reales (teclado, ratón, programas) por un registro. Devuelve el ActionRecorder."""
+    global action_recorder, actions
+    if action_recorder is None:
+        action_recorder = ActionRecorder()
+        actions = action_recorder.wrap(actions)
+    return action_recorder
+
+
+def main():
+    global config_watcher, command_dispatcher
+    args = parse_args()
+    timeline = StartupTimeline(STARTUP_T0)
+    timeline.mark("imports")
+
+    if args.headless or pyautogui is None:
+        if not args.headless:
+            print("⚠️  pyautogui no disponible: las acciones se registrarán en lugar de ejecutarse")
+        enable_action_recording()
+
+    # Recarga en caliente de configuracion_gestos.json, fuera del bucle de frames
+    config_watcher = ConfigWatcher(CONFIG_FILE, reload_configuration, CONFIG_POLL_INTERVAL)
+    config_watcher.start()
+    command_dispatcher = CommandDispatcher(COMMAND_WORKERS, COMMAND_QUEUE_SIZE, COMMAND_TIMEOUT).start()
+
+    # El canal de control se abre antes de cargar nada: las órdenes quedan en cola mientras tanto
+    control = EngineServer(authkey_from_env()).start() if args.daemon else None
+
+    # Fuente de frames, modelo, MediaPipe y recomendaciones iniciales
+    if args.fuente:
+        open_cap = lambda: open_source(args.fuente, args.fps)
+    elif not args.daemon or args.iniciar:
+        open_cap = open_camera
+    else:
+        open_cap = None
+    recorded_hands = bool(args.fuente) and args.fuente.lower().endswith(".jsonl")
+    cap, hands = startup(timeline, open_cap, recorded_hands=recorded_hands)
+
+    memory = AllocationMeter().start() if args.perfil_memoria else None
+    sink = HeadlessSink() if args.headless else None
+    with hands:
+        if control is None:
+            run_session(cap, hands, timeline, memory=memory, sink=sink, landmark_log=args.grabar_landmarks)
+            cap.release()
+        else:
+            serve_engine(control, cap, hands, timeline, memory)
 
-    cap.release()
-    cv2.destroyAllWindows()
+    config_watcher.stop()
+    command_dispatcher.drain()
+    command_dispatcher.stop()
+    print(f"⌨️  {command_dispatcher.format_stats()}")
+    if action_recorder is not None:
+        action_recorder.save(args.acciones_log)
+        print(f"📼 {action_recorder.format()} → {args.acciones_log}")
+    if not timeline.has("primera predicción"):
+        timeline.save(STARTUP_LOG)
+    if gesture_model is not None:
+        print(f"⏱️  Latencia del clasificador → {gesture_model.latency.format()}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
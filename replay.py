@@ -0,0 +1,253 @@
+import collections
+import json
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+# --- Fuentes de frames y salidas intercambiables ---
+# run_session solo necesita de la fuente `read(image=None) -> (ok, frame)`,
+# `release()` y, opcionalmente, `timestamp` (segundos del propio stream) y
+# `hands` (landmarks grabados del último frame). La webcam es un
+# cv2.VideoCapture tal cual; los archivos permiten reproducir y medir el
+# pipeline sin cámara ni escritorio, a máxima velocidad.
+#
+# Las salidas (sinks) sustituyen a las ventanas de OpenCV: HeadlessSink no
+# muestra nada y ActionRecorder registra los comandos en lugar de ejecutarlos.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class VideoSource:
+    """Archivo de video. El tiempo del stream sale del número de frame y los FPS del archivo."""
+
+    realtime = False
+
+    def __init__(self, path):
+        self.path = path
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise ValueError(f"No se pudo abrir el video {path}")
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.timestamp = None
+        self._index = 0
+
+    def read(self, image=None):
+        ret, frame = self._cap.read(image) if image is not None else self._cap.read()
+        if ret:
+            self.timestamp = self._index / self.fps
+            self._index += 1
+        return ret, frame
+
+    def release(self):
+        self._cap.release()
+
+
+class ImageDirSource:
+    """Directorio de imágenes, en orden alfabético, a `fps` frames por segundo de stream."""
+
+    realtime = False
+
+    def __init__(self, path, fps=30.0):
+        self.path = path
+        self.fps = fps
+        self.files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.files:
+            raise ValueError(f"No hay imágenes en {path}")
+        self.timestamp = None
+        self._index = 0
+
+    def read(self, image=None):
+        while self._index < len(self.files):
+            frame = cv2.imread(self.files[self._index])
+            self.timestamp = self._index / self.fps
+            self._index += 1
+            if frame is None:
+                print(f"⚠️  Imagen ilegible, se omite: {self.files[self._index - 1]}")
+                continue
+            if image is not None and image.shape == frame.shape:
+                np.copyto(image, frame)
+                return True, image
+            return True, frame
+        return False, None
+
+    def release(self):
+        pass
+
+
+class LandmarkSource:
+    """Stream de landmarks grabado con --grabar-landmarks (JSONL). Sin imágenes ni MediaPipe.
+
+    Cada frame es un lienzo negro del tamaño original y `hands` trae las manos
+    grabadas. Sirve para el backend 'landmarks', la capa de decisión y el
+    despacho; los backends de imagen solo verían recortes negros.
+    """
+
+    realtime = False
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "r", encoding="utf-8")
+        header = json.loads(self._file.readline())
+        self.width, self.height = header["ancho"], header["alto"]
+        self.fps = header.get("fps", 30.0)
+        self.timestamp = None
+        self.hands = []
+
+    def read(self, image=None):
+        line = self._file.readline()
+        while line and not line.strip():
+            line = self._file.readline()
+        if not line:
+            return False, None
+        record = json.loads(line)
+        self.timestamp = record["t"]
+        self.hands = [(hand["etiqueta"], np.asarray(hand["puntos"], dtype=np.float32).reshape(NUM_LANDMARKS, 3))
+                      for hand in record["manos"]]
+        shape = (self.height, self.width, 3)
+        if image is None or image.shape != shape:
+            image = np.zeros(shape, dtype=np.uint8)
+        return True, image
+
+    def release(self):
+        self._file.close()
+
+
+def open_source(path, fps=30.0):
+    """Fuente según la ruta: directorio de imágenes, .jsonl de landmarks o archivo de video."""
+    if os.path.isdir(path):
+        return ImageDirSource(path, fps)
+    if path.lower().endswith(".jsonl"):
+        return LandmarkSource(path)
+    return VideoSource(path)
+
+
+class RecordedHands:
+    """Sustituye a HandDetector con una LandmarkSource: las manos ya vienen en cada paquete."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def process(self, frame_bgr):
+        return []
+
+    def format_stats(self):
+        return "detección: landmarks grabados (sin MediaPipe)"
+
+
+class LandmarkRecorder:
+    """Graba las manos detectadas de cada frame en el formato que lee LandmarkSource."""
+
+    def __init__(self, path, width, height, fps=30.0):
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"ancho": width, "alto": height, "fps": fps}) + "\n")
+        self.frames = 0
+
+    def write(self, timestamp, found):
+        record = {"t": round(timestamp, 4),
+                  "manos": [{"etiqueta": label, "puntos": np.round(points, 5).tolist()} for label, points in found]}
+        self._file.write(json.dumps(record) + "\n")
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+
+class WindowSink:
+    """Ventanas de OpenCV. Cada ventana se coloca (y se fija encima) solo la primera vez."""
+
+    headless = False
+
+    def __init__(self, topmost_fn=None):
+        self.topmost_fn = topmost_fn
+        self._placed = set()
+
+    def show(self, name, image, x, y):
+        cv2.imshow(name, image)
+        if name not in self._placed:
+            self._placed.add(name)
+            cv2.moveWindow(name, x, y)
+            if self.topmost_fn is not None:
+                self.topmost_fn(name)
+
+    def poll_key(self):
+        return cv2.waitKey(1) & 0xFF
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class HeadlessSink:
+    """Sin ventanas ni teclado: solo cuenta los frames que se habrían mostrado."""
+
+    headless = True
+
+    def __init__(self):
+        self.frames = collections.Counter()
+
+    def show(self, name, image, x, y):
+        self.frames[name] += 1
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        pass
+
+
+class ActionRecorder:
+    """Sustituye las acciones reales por stubs que registran qué se habría ejecutado.
+
+    Cada evento lleva el tiempo del stream del frame que lo disparó (`set_time`),
+    no el del reloj: dos reproducciones del mismo archivo dan el mismo registro.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.counts = collections.Counter()
+        self.stream_time = None
+        self._lock = threading.Lock()
+
+    def set_time(self, timestamp):
+        """Tiempo del stream del frame en curso; lo llama el bucle de frames."""
+        self.stream_time = timestamp
+
+    def stub(self, name, log=True):
+        """Callable que registra `name` (y sus argumentos) cada vez que se llama."""
+        def run(*args):
+            with self._lock:
+                self.counts[name] += 1
+                if log:
+                    t = None if self.stream_time is None else round(self.stream_time, 4)
+                    self.events.append({"t": t, "accion": name, "args": list(args)})
+        return run
+
+    def wrap(self, actions):
+        return {name: self.stub(name) for name in actions}
+
+    def save(self, path):
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def format(self):
+        with self._lock:
+            counts = dict(self.counts)
+        if not counts:
+            return "acciones registradas: ninguna"
+        return "acciones registradas: " + ", ".join(f"{name} ×{n}" for name, n in sorted(counts.items()))
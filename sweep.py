@@ -0,0 +1,221 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# ==========================
+# Barrido paralelo de backbones e hiperparámetros
+# ==========================
+# Cada combinación (backbone, dropout, unidades densas, learning rate) se
+# entrena en su propio proceso con un presupuesto fijo de hilos, y el resultado
+# de todas se escribe en un manifiesto JSON. Cuando terminan todas, la latencia
+# de cada modelo se mide en serie en un único proceso. TensorFlow NO se importa
+# en este proceso: cada worker lo importa después de fijar sus variables de entorno.
+
+BACKBONE_NAMES = ("EfficientNetB5", "ResNet50", "InceptionV3")
+PRECISIONS = ("float32", "mixed_float16", "mixed_bfloat16")  # Las de create_models.PRECISIONS
+
+
+def run_name_for(job):
+    """Nombre único del modelo guardado para una combinación."""
+    return f"{job['backbone']}_d{job['dropout']}_u{job['dense_units']}_lr{job['learning_rate']:g}"
+
+
+def limit_threads(threads):
+    """Fija el presupuesto de hilos del proceso e importa TensorFlow con él."""
+    # Debe hacerse antes de importar TensorFlow
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "2"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+    return tf
+
+
+def worker(job, threads, dataset_path, cache_dir, input_options, precision, jit):
+    """Entrena una combinación en un proceso nuevo y devuelve su fila del manifiesto."""
+    row = dict(job, nombre=run_name_for(job), hilos=threads)
+    if input_options.get("cache") not in (None, "memoria"):
+        # Los workers corren a la vez: cada ejecución escribe su caché de tf.data en su
+        # propio subdirectorio, o se pisarían los mismos archivos y sus locks
+        input_options = dict(input_options, cache=os.path.join(input_options["cache"], row["nombre"]))
+    try:
+        tf = limit_threads(threads)
+        for gpu in tf.config.list_physical_devices("GPU"):
+            # Varios workers pueden compartir la GPU
+            tf.config.experimental.set_memory_growth(gpu, True)
+
+        import create_models
+
+        train_ds, val_ds, test_ds, class_names = create_models.load_datasets(dataset_path, cache_dir)
+
+        start = time.time()
+        result = create_models.run_backbone(
+            job["backbone"], (train_ds, val_ds, test_ds), class_names,
+            jit_compile=True if jit else "auto",
+            input_options=input_options,
+            hyperparams={
+                "dropout": job["dropout"],
+                "dense_units": job["dense_units"],
+                "learning_rate": job["learning_rate"],
+            },
+            run_name=row["nombre"],
+            precision=precision
+        )
+        row["tiempo_entrenamiento_s"] = round(time.time() - start, 1)
+        row.update(result)
+        row["tamano_mb"] = round(os.path.getsize(result["archivo"]) / 1e6, 2)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def latency_worker(files, threads):
+    """Mide la latencia de cada modelo, uno tras otro, en un proceso con la máquina libre.
+
+    Se ejecuta cuando ya han terminado todos los entrenamientos: medir dentro de cada
+    worker mientras los demás siguen entrenando en los mismos núcleos haría que la
+    selección dependiera del reparto de CPU y no del modelo.
+    """
+    limit_threads(threads)
+    from inference import benchmark_backend, create_backend
+
+    latencies = {}
+    for path in files:
+        try:
+            # Latencia de inferencia de un frame con el mismo camino que usa program.py
+            backend = create_backend("tf_function", path)
+            latencies[path] = benchmark_backend(backend, iterations=100)
+        except Exception as e:
+            latencies[path] = {"error": f"{type(e).__name__}: {e}"}
+    return latencies
+
+
+def measure_latencies(runs, threads, context):
+    """Añade a cada ejecución correcta su latencia, medida en serie tras el barrido."""
+    trained = [r for r in runs if "error" not in r]
+    if not trained:
+        return
+    print(f"⏱️  Midiendo la latencia de {len(trained)} modelos en serie ({threads} hilos)")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        try:
+            latencies = pool.submit(latency_worker, [r["archivo"] for r in trained], threads).result()
+        except BrokenProcessPool as e:
+            latencies = {r["archivo"]: {"error": f"BrokenProcessPool: {e}"} for r in trained}
+    for row in trained:
+        latency = latencies[row["archivo"]]
+        if "error" in latency:
+            row["error"] = f"latencia: {latency['error']}"
+        else:
+            row["latencia"] = latency
+
+
+def select_best(runs, min_accuracy):
+    """La ejecución con menor latencia p50 entre las que alcanzan la accuracy mínima."""
+    candidates = [r for r in runs if "error" not in r and r.get("accuracy", 0) >= min_accuracy]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: r["latencia"]["p50_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido paralelo de backbones e hiperparámetros")
+    parser.add_argument("--dataset", default='/kaggle/input/asl-data/asl_alphabet_structured')
+    parser.add_argument("--cache", default=None, help="Directorio creado con dataset_cache.py (recomendado)")
+    parser.add_argument("--modelos", nargs="+", choices=BACKBONE_NAMES, default=list(BACKBONE_NAMES))
+    parser.add_argument("--dropout", nargs="+", type=float, default=[0.5])
+    parser.add_argument("--unidades", nargs="+", type=int, default=[128])
+    parser.add_argument("--lr", nargs="+", type=float, default=[0.0001])
+    parser.add_argument("--workers", type=int, default=2, help="Procesos en paralelo")
+    parser.add_argument("--hilos", type=int, default=None,
+                        help="Hilos por worker (por defecto núcleos / workers)")
+    parser.add_argument("--hilos-latencia", type=int, default=None,
+                        help="Hilos para medir la latencia tras el barrido (por defecto los de un worker)")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float32")
+    parser.add_argument("--jit", action="store_true")
+    parser.add_argument("--cache-tfdata", default=None,
+                        help="Caché de tf.data: 'memoria' o un directorio (un subdirectorio por ejecución)")
+    parser.add_argument("--augment", action="store_true", help="Augmentación aleatoria en paralelo")
+    parser.add_argument("--no-determinista", action="store_true",
+                        help="Permite que los map paralelos entreguen elementos fuera de orden")
+    parser.add_argument("--accuracy-minima", type=float, default=0.9)
+    parser.add_argument("--manifiesto", default="sweep_manifest.json")
+    args = parser.parse_args()
+
+    threads = args.hilos or max(1, (os.cpu_count() or 1) // args.workers)
+    input_options = {
+        "cache": args.cache_tfdata,
+        "augment": args.augment,
+        "deterministic": not args.no_determinista,
+    }
+    jobs = [
+        {"backbone": b, "dropout": d, "dense_units": u, "learning_rate": lr}
+        for b, d, u, lr in itertools.product(args.modelos, args.dropout, args.unidades, args.lr)
+    ]
+    print(f"🚀 {len(jobs)} ejecuciones | {args.workers} workers x {threads} hilos")
+
+    runs = []
+    # spawn + un proceso por tarea: cada ejecución empieza con memoria limpia
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(worker, job, threads, args.dataset, args.cache, input_options, args.precision, args.jit): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except BrokenProcessPool as e:
+                # Un worker murió (p. ej. el sistema lo mató por memoria): el pool queda roto y
+                # todas las pendientes fallan, pero el resto del manifiesto se escribe igual
+                job = futures[future]
+                row = dict(job, nombre=run_name_for(job), hilos=threads,
+                           error=f"BrokenProcessPool: el proceso del worker terminó de forma abrupta ({e})")
+            runs.append(row)
+            if "error" in row:
+                print(f"❌ {row['nombre']}: {row['error']}")
+            else:
+                print(f"✅ {row['nombre']}: accuracy {row['accuracy']:.4f} | {row['tiempo_entrenamiento_s']:.0f}s")
+
+    latency_threads = args.hilos_latencia or threads
+    measure_latencies(runs, latency_threads, context)
+    for row in sorted(runs, key=lambda r: r["nombre"]):
+        if "latencia" in row:
+            print(f"   {row['nombre']}: p50 {row['latencia']['p50_ms']:.1f} ms")
+        elif row.get("error", "").startswith("latencia"):
+            print(f"❌ {row['nombre']}: {row['error']}")
+
+    best = select_best(runs, args.accuracy_minima)
+    manifest = {
+        "fecha_creacion": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "configuracion": {
+            "workers": args.workers,
+            "hilos_por_worker": threads,
+            "hilos_latencia": latency_threads,
+            "precision": args.precision,
+            "jit": args.jit,
+            "augment": args.augment,
+            "determinista": not args.no_determinista,
+            "accuracy_minima": args.accuracy_minima,
+        },
+        "ejecuciones": sorted(runs, key=lambda r: r["nombre"]),
+        "seleccionado": best["nombre"] if best else None,
+    }
+    with open(args.manifiesto, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+
+    print(f"\n📄 Manifiesto escrito en {args.manifiesto}")
+    if best:
+        print(f"🏆 Más rápido con accuracy >= {args.accuracy_minima}: {best['nombre']} ({best['archivo']})")
+    else:
+        print(f"⚠️  Ninguna ejecución alcanzó accuracy >= {args.accuracy_minima}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from command_registry import COMMAND_PROFILES, CommandGate
+
+
+def frames(fps, seconds, start=0.0):
+    """Instantes de un stream a `fps`, calculados como i / fps (igual que el reloj del pipeline)."""
+    first = round(start * fps)
+    return [i / fps for i in range(first, first + round(seconds * fps))]
+
+
+def test_press_is_blocked_during_cooldown():
+    gate = CommandGate()
+    profile = COMMAND_PROFILES["Pegar"]  # cooldown 1.0 s
+    assert gate.press("Pegar", profile, 10.0)
+    assert not gate.press("Pegar", profile, 10.5)
+    assert gate.blocked == 1
+    assert gate.press("Pegar", profile, 11.0)
+
+
+def test_cooldown_is_per_action():
+    gate = CommandGate()
+    assert gate.press("Pegar", COMMAND_PROFILES["Pegar"], 1.0)
+    assert gate.press("Copiar", COMMAND_PROFILES["Copiar"], 1.1)
+    assert gate.blocked == 0
+
+
+def test_hold_never_repeats_one_shot_commands():
+    gate = CommandGate()
+    profile = COMMAND_PROFILES["Copiar"]
+    assert gate.press("Copiar", profile, 0.0)
+    assert not any(gate.hold("Copiar", profile, t) for t in frames(30, 2.0, start=0.1))
+
+
+def test_hold_needs_a_previous_press():
+    gate = CommandGate()
+    assert not gate.hold("Subir Volumen", COMMAND_PROFILES["Subir Volumen"], 1.0)
+
+
+def test_continuous_repeats_at_10_hz_at_30_fps():
+    gate = CommandGate()
+    profile = COMMAND_PROFILES["Subir Volumen"]  # repeticion_s 0.1
+    press_t = 12 / 30
+    assert gate.press("Subir Volumen", profile, press_t)
+    held = frames(30, 1.0, start=13 / 30)
+    fired = [t for t in held if gate.hold("Subir Volumen", profile, t)]
+    assert len(fired) == 10
+    # Cada 3 frames exactos, sin que la coma flotante añada un frame de espera
+    assert [round(t * 30) for t in fired] == list(range(15, 45, 3))
+
+
+def test_jitter_does_not_push_back_later_repeats():
+    gate = CommandGate()
+    profile = COMMAND_PROFILES["Subir Volumen"]
+    assert gate.press("Subir Volumen", profile, 0.0)
+    # Un frame llega tarde (0.13 en vez de 0.10); el siguiente disparo sigue siendo a 0.20
+    assert gate.hold("Subir Volumen", profile, 0.13)
+    assert not gate.hold("Subir Volumen", profile, 0.17)
+    assert gate.hold("Subir Volumen", profile, 0.20)
+
+
+def test_hold_reanchors_after_a_long_gap():
+    gate = CommandGate()
+    profile = COMMAND_PROFILES["Subir Volumen"]
+    assert gate.press("Subir Volumen", profile, 0.0)
+    # Tras un parón de 1 s no se recuperan los disparos perdidos de golpe
+    assert gate.hold("Subir Volumen", profile, 1.0)
+    assert not gate.hold("Subir Volumen", profile, 1.05)
+    assert gate.hold("Subir Volumen", profile, 1.1)
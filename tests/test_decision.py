@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from decision import GestureStabilizer, MotionGate  # noqa: E402
+
+B = 1  # Clase usada en las pruebas
+STRONG_B = [0.05, 0.9, 0.05]
+
+
+def instant_stabilizer(**kwargs):
+    # Constante de tiempo ínfima: la media exponencial sigue a cada predicción y los
+    # umbrales se prueban con probabilidades exactas
+    return GestureStabilizer(time_constant=1e-3, **kwargs)
+
+
+def hand(offset=0.0):
+    """21 landmarks (x, y, z) de una mano de 0.4 de alto, desplazada `offset` en x."""
+    return [[0.3 + offset + i * 0.01, 0.2 + i * 0.02, 0.0] for i in range(21)]
+
+
+def test_emits_only_after_hold_time():
+    stabilizer = GestureStabilizer(hold_time=0.4)
+    outputs = [stabilizer.update(STRONG_B, t) for t in (0.0, 0.1, 0.2, 0.3, 0.35)]
+    assert outputs == [None] * 5
+    assert stabilizer.hold_progress(0.35) == pytest.approx(0.35 / 0.4)
+    assert stabilizer.update(STRONG_B, 0.45) == B
+    assert stabilizer.emitted == 1
+
+
+def test_held_gesture_is_emitted_once():
+    stabilizer = GestureStabilizer(hold_time=0.4)
+    outputs = [stabilizer.update(STRONG_B, i * 0.1) for i in range(20)]
+    assert outputs.count(B) == 1
+    assert stabilizer.active == B
+
+
+def test_low_confidence_never_becomes_a_candidate():
+    stabilizer = instant_stabilizer(min_confidence=0.7, hold_time=0.2)
+    outputs = [stabilizer.update([0.35, 0.6, 0.05], i * 0.1) for i in range(10)]
+    assert outputs == [None] * 10
+    assert stabilizer.hold_progress(0.9) == 0.0
+
+
+def test_release_only_below_lower_threshold():
+    stabilizer = instant_stabilizer(min_confidence=0.7, release_confidence=0.45, hold_time=0.2)
+    assert [stabilizer.update(STRONG_B, t) for t in (0.0, 0.1, 0.2)] == [None, None, B]
+
+    # Entre los dos umbrales: ni se suelta ni se vuelve a emitir
+    assert stabilizer.update([0.05, 0.55, 0.4], 0.3) is None
+    assert stabilizer.active == B
+
+    # Por debajo del umbral de liberación: se suelta
+    assert stabilizer.update([0.05, 0.4, 0.55], 0.4) is None
+    assert stabilizer.active is None
+
+    # Volver a la seña exige sostenerla otra vez
+    assert stabilizer.update(STRONG_B, 0.5) is None
+    assert stabilizer.update(STRONG_B, 0.6) is None
+    assert stabilizer.update(STRONG_B, 0.75) == B
+    assert stabilizer.emitted == 2
+
+
+def test_gap_longer_than_max_gap_resets():
+    stabilizer = instant_stabilizer(hold_time=0.2, max_gap=0.5)
+    assert [stabilizer.update(STRONG_B, t) for t in (0.0, 0.1, 0.2)] == [None, None, B]
+    # La mano desaparece más de max_gap: el gesto se suelta y puede volver a emitirse
+    assert stabilizer.update(STRONG_B, 1.0) is None
+    assert stabilizer.active is None
+    assert stabilizer.update(STRONG_B, 1.25) == B
+
+
+def test_still_hand_reuses_prediction_until_max_age():
+    gate = MotionGate(threshold=0.03, max_age=0.5)
+    probs = [0.1, 0.8, 0.1]
+    assert gate.check(hand(), 0.0) is None  # Nada que reutilizar aún
+    gate.record(hand(), probs, 0.0)
+    assert gate.check(hand(), 0.2) is probs
+    assert gate.check(hand(), 0.5) is probs
+    assert gate.check(hand(), 0.6) is None  # Caducada aunque la mano siga quieta
+    assert (gate.inferences, gate.reused) == (1, 2)
+
+
+def test_moving_hand_is_reclassified():
+    gate = MotionGate(threshold=0.03, max_age=0.5)
+    gate.record(hand(), [0.1, 0.8, 0.1], 0.0)
+    # 0.02 de 0.4 = 5% del tamaño de la mano
+    assert gate.check(hand(offset=0.02), 0.1) is None
+
+
+def test_slow_drift_is_measured_from_last_classification():
+    gate = MotionGate(threshold=0.03, max_age=5.0)
+    probs = [0.1, 0.8, 0.1]
+    gate.record(hand(), probs, 0.0)
+    # Cada paso mueve un 2% (bajo el umbral), pero el acumulado desde la última clasificación no
+    assert gate.check(hand(offset=0.008), 0.1) is probs
+    assert gate.check(hand(offset=0.016), 0.2) is None
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from dispatcher import CommandDispatcher
+
+
+def recorder(log, name, delay=0.0):
+    def run():
+        time.sleep(delay)
+        log.append(name)
+    return run
+
+
+def test_serial_actions_keep_submission_order():
+    # Copiar tarda más que Pegar: con varios workers Pegar terminaría primero
+    dispatcher = CommandDispatcher(workers=2).start()
+    log = []
+    dispatcher.submit("Copiar", recorder(log, "Copiar", delay=0.05))
+    dispatcher.submit("Pegar", recorder(log, "Pegar"))
+    dispatcher.submit("Borrar", recorder(log, "Borrar"))
+    assert dispatcher.drain(timeout=2.0)
+    dispatcher.stop()
+    assert log == ["Copiar", "Pegar", "Borrar"]
+
+
+def test_serial_coalesce_does_not_overtake():
+    dispatcher = CommandDispatcher(workers=1)
+    log = []
+    # Sin start(): todo queda pendiente y se ve cómo se fusiona
+    dispatcher.submit("Subir Volumen", recorder(log, "Subir Volumen"), coalesce=True)
+    dispatcher.submit("Copiar", recorder(log, "Copiar"))
+    dispatcher.submit("Subir Volumen", recorder(log, "Subir Volumen"), coalesce=True)
+    dispatcher.submit("Subir Volumen", recorder(log, "Subir Volumen"), coalesce=True)
+    dispatcher.start()
+    assert dispatcher.drain(timeout=2.0)
+    dispatcher.stop()
+    assert log == ["Subir Volumen", "Copiar", "Subir Volumen", "Subir Volumen"]
+    assert dispatcher.coalesced == 1
+
+
+def test_pool_actions_do_not_block_serial_ones():
+    dispatcher = CommandDispatcher(workers=2).start()
+    release = threading.Event()
+    log = []
+    dispatcher.submit("Abrir Bloc", release.wait, serial=False)
+    dispatcher.submit("Copiar", recorder(log, "Copiar"))
+    deadline = time.perf_counter() + 2.0
+    while not log and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    release.set()
+    assert dispatcher.drain(timeout=2.0)
+    dispatcher.stop()
+    assert log == ["Copiar"]
@@ -0,0 +1,160 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+from landmarks import FEATURE_SIZE, landmarks_to_array, normalize_landmarks
+
+# ==========================
+# Clasificador ligero sobre landmarks de MediaPipe
+# ==========================
+# Recorre el mismo dataset que create_models.py, extrae los 21 landmarks de
+# cada imagen con MediaPipe (una sola vez, offline) y entrena un MLP pequeño
+# sobre el vector normalizado de 63 floats. Los pesos se exportan a .npz para
+# que program.py los ejecute en NumPy con el backend "landmarks".
+
+DATASET_PATH = '/kaggle/input/asl-data/asl_alphabet_structured'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+# ==========================
+# 1. Extracción de landmarks
+# ==========================
+def extract_features(dataset_path, max_per_class=None):
+    """Ejecuta MediaPipe sobre cada imagen y devuelve (X, y, class_names).
+
+    Las clases siguen el orden alfabético de las carpetas, igual que
+    image_dataset_from_directory, para que los índices coincidan con la CNN.
+    Las imágenes donde no se detecta mano se descartan.
+    """
+    import mediapipe as mp
+
+    class_names = sorted(d for d in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, d)))
+    features, labels = [], []
+    skipped = 0
+
+    with mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5) as hands:
+        for class_idx, class_name in enumerate(class_names):
+            class_dir = os.path.join(dataset_path, class_name)
+            files = sorted(f for f in os.listdir(class_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+            if max_per_class:
+                files = files[:max_per_class]
+
+            start = len(labels)
+            for file_name in files:
+                image = cv2.imread(os.path.join(class_dir, file_name))
+                if image is None:
+                    skipped += 1
+                    continue
+                features_vec = image_to_features(hands, image)
+                if features_vec is None:
+                    skipped += 1
+                    continue
+                features.append(features_vec)
+                labels.append(class_idx)
+
+            print(f"   🔤 {class_name}: {len(labels) - start} muestras")
+
+    print(f"Imágenes descartadas (sin mano detectada o ilegibles): {skipped}")
+    return np.array(features, dtype=np.float32), np.array(labels, dtype=np.int32), class_names
+
+
+def image_to_features(hands, image_bgr):
+    """Landmarks normalizados de la primera mano detectada, o None."""
+    height, width = image_bgr.shape[:2]
+    results = hands.process(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+    if not results.multi_hand_landmarks:
+        return None
+    label = results.multi_handedness[0].classification[0].label
+    points = landmarks_to_array(results.multi_hand_landmarks[0])
+    return normalize_landmarks(points, aspect=width / height, mirror=(label == 'Left'))
+
+
+# ==========================
+# 2. Modelo
+# ==========================
+def build_landmark_model(num_classes):
+    import tensorflow as tf
+    from tensorflow.keras.layers import Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
+    model = Sequential([
+        Input(shape=(FEATURE_SIZE,)),
+        Dense(128, activation="relu"),
+        Dropout(0.2),
+        Dense(64, activation="relu"),
+        Dense(num_classes, activation="softmax")
+    ])
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+    return model
+
+
+def export_weights(model, path, class_names):
+    """Guarda kernel/bias de cada capa Dense como W0, b0, W1, b1, ... para el backend NumPy."""
+    arrays = {}
+    dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    for i, layer in enumerate(dense_layers):
+        kernel, bias = layer.get_weights()
+        arrays[f"W{i}"] = kernel.astype(np.float32)
+        arrays[f"b{i}"] = bias.astype(np.float32)
+    np.savez(path, class_names=np.array(class_names), **arrays)
+    print(f"💾 Pesos exportados para program.py: {path}")
+
+
+# ==========================
+# 3. Entrenamiento
+# ==========================
+def main():
+    parser = argparse.ArgumentParser(description="Entrena el clasificador ligero de landmarks")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--cache", default=None,
+                        help="Caché de dataset_cache.py creada con --landmarks (evita correr MediaPipe)")
+    parser.add_argument("--features", default="models/landmark_features.npz",
+                        help="Caché de landmarks extraídos; se reutiliza si existe")
+    parser.add_argument("--salida", default="models/landmark_mlp",
+                        help="Prefijo de salida (.keras y .npz)")
+    parser.add_argument("--epocas", type=int, default=40)
+    parser.add_argument("--max-por-clase", type=int, default=None)
+    args = parser.parse_args()
+
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+
+    os.makedirs(os.path.dirname(args.salida) or ".", exist_ok=True)
+
+    if args.cache:
+        from dataset_cache import load_cached_landmarks
+        print(f"Usando landmarks de la caché del dataset: {args.cache}")
+        X, y, class_names = load_cached_landmarks(args.cache)
+    elif os.path.exists(args.features):
+        print(f"Usando landmarks en caché: {args.features}")
+        data = np.load(args.features)
+        X, y, class_names = data["X"], data["y"], [str(c) for c in data["class_names"]]
+    else:
+        print("Extrayendo landmarks con MediaPipe...")
+        X, y, class_names = extract_features(args.dataset, args.max_por_clase)
+        np.savez(args.features, X=X, y=y, class_names=np.array(class_names))
+
+    # 80% entrenamiento, 20% test (estratificado)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=123, stratify=y)
+
+    model = build_landmark_model(len(class_names))
+    print(f"\nEntrenando MLP de landmarks ({len(X_train)} muestras)...")
+    model.fit(X_train, y_train, epochs=args.epocas, batch_size=64, validation_split=0.1, verbose=2)
+
+    loss, acc = model.evaluate(X_test, y_test, verbose=0)
+    print(f"Landmarks MLP - Test Loss: {loss:.4f} | Test Accuracy: {acc:.4f}")
+    y_pred = np.argmax(model.predict(X_test, verbose=0), axis=1)
+    print(classification_report(y_test, y_pred, labels=list(range(len(class_names))), target_names=class_names))
+
+    model.save(f"{args.salida}.keras")
+    export_weights(model, f"{args.salida}.npz", class_names)
+
+
+if __name__ == "__main__":
+    main()